@@ -0,0 +1,120 @@
+"""
+DjangoQandAPlatform/caching.py
+
+Read-through caching of model instances, shared by all workers through the
+Django cache.
+
+Models opt in with register(). get_cached() then looks instances up by
+primary key, or by another unique field that never changes (e.g. a
+profile's user_id), and only queries the database on a miss.
+
+Each cached row has a version token in the cache, replaced whenever the row
+is saved or deleted: by post_save/post_delete handlers, or by an explicit
+invalidate() after a queryset.update() that should be seen. An entry stores
+the token it was built for next to the instance and both are read with one
+get_many, so a lookup by primary key is a single cache round trip and an
+entry built before a write is never served after it. As with the tag
+catalogue, tokens are replaced again when the transaction commits, so an
+instance read from not-yet-committed data cannot outlive the commit. Misses
+are read from the primary database, never from a lagging replica.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import Http404
+
+DEFAULT_TIMEOUT = 300
+
+_registry = {}  # Model -> timeout of its entries
+
+
+def register(model, timeout=None):
+	"""Enable get_cached() for ``model`` and invalidate its entries when rows are saved or deleted."""
+	_registry[model] = timeout or getattr(settings, 'MODEL_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+	uid = f'caching:{model._meta.label_lower}'
+	post_save.connect(_row_changed, sender=model, dispatch_uid=uid)
+	post_delete.connect(_row_changed, sender=model, dispatch_uid=uid)
+
+
+def _row_changed(sender, instance, **kwargs):
+	invalidate(sender, instance.pk)
+
+
+def _keys(model, pk):
+	key = f'model:{model._meta.label_lower}:{pk}'
+	return f'{key}:version', key
+
+
+def _bump(model, pk):
+	cache.set(_keys(model, pk)[0], uuid.uuid4().hex, None)
+
+
+def invalidate(model, pk):
+	"""Drop the cached instance of ``model`` with primary key ``pk``, now and on commit."""
+	if model not in _registry:
+		return
+	_bump(model, pk)
+	transaction.on_commit(lambda: _bump(model, pk))
+
+
+def get_cached(model, pk=None, **lookup):
+	"""
+	The ``model`` instance with primary key ``pk``, or matching a single
+	``field=value`` lookup on a unique field that never changes. Reads through
+	the cache; raises model.DoesNotExist like objects.get().
+	"""
+	if model not in _registry:
+		raise ImproperlyConfigured(f"{model._meta.label} is not registered for caching.")
+	if lookup:
+		(field, value), = lookup.items()
+		index_key = f'model:{model._meta.label_lower}:{field}={value}'
+		pk = cache.get(index_key)
+		if pk is not None:
+			try:
+				return _get_by_pk(model, pk)
+			except model.DoesNotExist:  # Deleted, perhaps replaced by a new row
+				cache.delete(index_key)
+		instance = _primary(model).get(**lookup)
+		cache.set(index_key, instance.pk, _registry[model])
+		_store(model, instance)
+		return instance
+	return _get_by_pk(model, pk)
+
+
+def _primary(model):
+	# Never fill the cache from a replica, which may not have the write that
+	# set the current version yet (see db_routing.py).
+	return model._default_manager.db_manager(DEFAULT_DB_ALIAS)
+
+
+def _get_by_pk(model, pk):
+	version_key, data_key = _keys(model, pk)
+	found = cache.get_many([version_key, data_key])
+	version, entry = found.get(version_key), found.get(data_key)
+	if version is not None and entry is not None and entry[0] == version:
+		return entry[1]
+	instance = _primary(model).get(pk=pk)
+	_store(model, instance, version)
+	return instance
+
+
+def _store(model, instance, version=None):
+	version_key, data_key = _keys(model, instance.pk)
+	if version is None:
+		version = uuid.uuid4().hex
+		if not cache.add(version_key, version, None):
+			version = cache.get(version_key)
+	cache.set(data_key, (version, instance), _registry[model])
+
+
+def get_cached_or_404(model, pk=None, **lookup):
+	"""get_cached(), raising Http404 instead of DoesNotExist."""
+	try:
+		return get_cached(model, pk, **lookup)
+	except model.DoesNotExist:
+		raise Http404(f"No {model._meta.object_name} matches the given query.")
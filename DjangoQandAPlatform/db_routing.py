@@ -0,0 +1,187 @@
+"""
+DjangoQandAPlatform/db_routing.py
+
+Read-replica routing with read-your-writes stickiness.
+
+PrimaryReplicaRouter sends writes to the primary ("default") and, within
+requests marked by ReplicaRoutingMiddleware, reads to one of the healthy
+DATABASE_REPLICAS. Everything else reads from the primary: requests with
+unsafe methods, reads inside a transaction on the primary, and all work
+outside requests (management commands, background tasks), which often reads
+rows it has just written.
+
+Stickiness: once a request has written, its later reads go to the primary,
+and the response sets a cookie keeping the same browser's reads on the
+primary for REPLICA_PIN_SECONDS, long enough for the replicas to catch up,
+so a freshly posted answer shows up on the redirect that follows. Writes to
+the apps in UNPINNED_APPS (request metrics, profiles and the slow-query
+log, which pages never read back) do not count.
+
+Replica health is checked per process at most every
+REPLICA_HEALTH_CHECK_INTERVAL seconds: a replica that cannot be reached, or
+(on PostgreSQL) lags more than REPLICA_MAX_LAG seconds behind, gets no
+reads until a later check passes. With no healthy replica, reads go to the
+primary.
+"""
+
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = DEFAULT_DB_ALIAS
+PIN_COOKIE = 'db_primary_until'
+SAFE_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+UNPINNED_APPS = frozenset(('monitoring',))
+DEFAULT_PIN_SECONDS = 10
+DEFAULT_HEALTH_CHECK_INTERVAL = 30
+DEFAULT_MAX_LAG = 5.0
+
+# Replication delay in seconds; 0 when caught up or not a replica.
+POSTGRESQL_LAG_SQL = """
+	SELECT CASE
+		WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+		ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+	END
+"""
+
+
+class RoutingState:
+	"""How the current request may read; bound by ReplicaRoutingMiddleware."""
+	__slots__ = ('use_replicas', 'wrote')
+
+	def __init__(self, use_replicas):
+		self.use_replicas = use_replicas
+		self.wrote = False
+
+
+current_state = ContextVar('db_routing_state', default=None)
+
+
+def replica_aliases():
+	return getattr(settings, 'DATABASE_REPLICAS', ())
+
+
+def check_replica(alias):
+	"""Whether replica ``alias`` answers and, on PostgreSQL, is not lagging too far behind."""
+	connection = connections[alias]
+	try:
+		with connection.cursor() as cursor:
+			if connection.vendor == 'postgresql':
+				cursor.execute(POSTGRESQL_LAG_SQL)
+				lag = cursor.fetchone()[0] or 0
+				max_lag = getattr(settings, 'REPLICA_MAX_LAG', DEFAULT_MAX_LAG)
+				if lag > max_lag:
+					logger.warning("Replica %s lags %.1fs behind; reading from the primary.", alias, lag)
+					return False
+			else:
+				cursor.execute('SELECT 1')
+	except DatabaseError:
+		logger.warning("Replica %s is unreachable; reading from the primary.", alias, exc_info=True)
+		return False
+	return True
+
+
+class ReplicaHealth:
+	"""Per-process cache of replica health, refreshed every REPLICA_HEALTH_CHECK_INTERVAL seconds."""
+
+	def __init__(self, check=check_replica):
+		self.check = check
+		self._lock = threading.Lock()
+		self._status = {}  # Alias -> (healthy, checked at)
+
+	def is_healthy(self, alias):
+		interval = getattr(settings, 'REPLICA_HEALTH_CHECK_INTERVAL', DEFAULT_HEALTH_CHECK_INTERVAL)
+		now = time.monotonic()
+		with self._lock:
+			status = self._status.get(alias)
+			if status is not None and now - status[1] < interval:
+				return status[0]
+			# Other threads keep the previous verdict while this one checks.
+			self._status[alias] = (status[0] if status else False, now)
+		healthy = self.check(alias)
+		with self._lock:
+			self._status[alias] = (healthy, time.monotonic())
+		return healthy
+
+	def reset(self):
+		with self._lock:
+			self._status.clear()
+
+
+health = ReplicaHealth()
+
+
+class PrimaryReplicaRouter:
+	"""Database router; see the module docstring."""
+
+	def db_for_read(self, model, **hints):
+		state = current_state.get()
+		if state is None or not state.use_replicas or state.wrote:
+			return PRIMARY
+		instance = hints.get('instance')
+		if instance is not None and instance._state.db:
+			return instance._state.db  # Related objects come from the same database
+		if connections[PRIMARY].in_atomic_block:
+			return PRIMARY
+		healthy = [alias for alias in replica_aliases() if health.is_healthy(alias)]
+		return random.choice(healthy) if healthy else PRIMARY
+
+	def db_for_write(self, model, **hints):
+		state = current_state.get()
+		if state is not None and model._meta.app_label not in UNPINNED_APPS:
+			state.wrote = True
+		return PRIMARY
+
+	def allow_relation(self, obj1, obj2, **hints):
+		databases = {PRIMARY, *replica_aliases()}
+		if obj1._state.db in databases and obj2._state.db in databases:
+			return True
+		return None
+
+	def allow_migrate(self, db, app_label, model_name=None, **hints):
+		if db in replica_aliases():
+			return False  # Replicas get the schema by replication
+		return None
+
+
+def pinned_to_primary(request):
+	try:
+		return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+	except ValueError:
+		return False
+
+
+class ReplicaRoutingMiddleware:
+	"""
+	Lets PrimaryReplicaRouter read safe-method requests from replicas, unless
+	the browser wrote recently, and pins the browser to the primary after a
+	write.
+
+	Place it before SessionMiddleware, so that session writes count as writes.
+	"""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		state = RoutingState(
+			use_replicas=bool(replica_aliases()) and request.method in SAFE_METHODS and not pinned_to_primary(request),
+		)
+		token = current_state.set(state)
+		try:
+			response = self.get_response(request)
+		finally:
+			current_state.reset(token)
+		if state.wrote and replica_aliases():
+			seconds = getattr(settings, 'REPLICA_PIN_SECONDS', DEFAULT_PIN_SECONDS)
+			response.set_cookie(
+				PIN_COOKIE, str(int(time.time()) + seconds + 1), max_age=seconds, httponly=True, samesite='Lax',
+			)
+		return response
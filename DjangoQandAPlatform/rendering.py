@@ -0,0 +1,43 @@
+"""
+DjangoQandAPlatform/rendering.py
+
+Save-time rendering of user-entered text into display HTML.
+Models store the rendered markup next to the source text so templates
+can output it directly instead of re-running filters on every page view.
+"""
+
+from django.utils.html import linebreaks
+
+
+def render_text(text):
+	"""
+	Return escaped, paragraph-formatted HTML for plain text.
+	Output matches the ``linebreaks`` template filter with autoescaping on.
+	"""
+	return linebreaks(text or '', autoescape=True)
+
+
+class RenderedTextMixin:
+	"""
+	Model mixin that keeps pre-rendered HTML columns in sync on save.
+
+	``rendered_fields`` maps each source text field to the field holding its HTML.
+	"""
+	rendered_fields = {}
+
+	def render_fields(self):
+		"""Re-render every configured HTML field from its source field."""
+		for source, target in self.rendered_fields.items():
+			setattr(self, target, render_text(getattr(self, source)))
+
+	def save(self, *args, **kwargs):
+		self.render_fields()
+		update_fields = kwargs.get('update_fields')
+		if update_fields is not None:
+			# Partial saves must persist the HTML of any source field they touch.
+			update_fields = set(update_fields)
+			update_fields.update(
+				target for source, target in self.rendered_fields.items() if source in update_fields
+			)
+			kwargs['update_fields'] = update_fields
+		super().save(*args, **kwargs)
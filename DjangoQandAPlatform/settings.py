@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.forms',  # Built-in widget templates for FORM_RENDERER below
     # Project-specific apps:
     'users.apps.UsersConfig',
     'questions.apps.QuestionsConfig',
@@ -46,6 +47,8 @@ INSTALLED_APPS = [
     'tags.apps.TagsConfig',
     'api.apps.ApiConfig',
     'badges.apps.BadgesConfig',
+    'uploads.apps.UploadsConfig',
+    'monitoring.apps.MonitoringConfig',
     # Third-party apps:
     'rest_framework',
     'django_filters',
@@ -67,10 +70,15 @@ REST_FRAMEWORK = {
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Must come right after SecurityMiddleware
+    'monitoring.middleware.MetricsMiddleware',  # Times everything below, static files excluded
+    'DjangoQandAPlatform.db_routing.ReplicaRoutingMiddleware',  # Must come before SessionMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'uploads.middleware.UploadLimitMiddleware',  # Must come before CsrfViewMiddleware
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'monitoring.middleware.ServerTimingMiddleware',  # Needs request.user and MetricsMiddleware
+    'monitoring.middleware.ProfilingMiddleware',  # Needs request.user; see monitoring/profiling.py
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -79,7 +87,9 @@ ROOT_URLCONF = 'DjangoQandAPlatform.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that also times rendering for monitoring/metrics.py
+        'BACKEND': 'monitoring.templates.InstrumentedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [BASE_DIR / 'templates'],  # Project template location.
         'APP_DIRS': True,
         'OPTIONS': {
@@ -92,6 +102,9 @@ TEMPLATES = [
     },
 ]
 
+# Render form widgets through TEMPLATES, so project templates can define widgets.
+FORM_RENDERER = 'django.forms.renderers.TemplatesSetting'
+
 WSGI_APPLICATION = 'DjangoQandAPlatform.wsgi.application'
 
 # Database
@@ -109,6 +122,43 @@ DATABASES = {
     }
 }
 
+# Read replicas (see DjangoQandAPlatform/db_routing.py): DB_REPLICA_HOSTS adds
+# one alias per host, replica1, replica2, ..., otherwise configured like
+# the primary. Tests run them as mirrors of the test database.
+DATABASE_REPLICAS = []
+for _number, _host in enumerate(env.list('DB_REPLICA_HOSTS', default=[]), 1):
+    DATABASES[f'replica{_number}'] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        'OPTIONS': {**DATABASES['default']['OPTIONS'], 'connect_timeout': 2},
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{_number}')
+DATABASE_ROUTERS = ['DjangoQandAPlatform.db_routing.PrimaryReplicaRouter']
+# Seconds a browser reads from the primary after writing
+REPLICA_PIN_SECONDS = env.int('REPLICA_PIN_SECONDS', default=10)
+# Seconds between replica health checks, and the replication lag that fails one
+REPLICA_HEALTH_CHECK_INTERVAL = env.int('REPLICA_HEALTH_CHECK_INTERVAL', default=30)
+REPLICA_MAX_LAG = env.float('REPLICA_MAX_LAG', default=5.0)
+
+# Cache, from a CACHE_URL shared by all workers in production, e.g.
+#   redis://127.0.0.1:6379/1         (needs the redis package)
+#   filecache:///var/tmp/django_cache
+#   locmemcache://                   (default; per process, not shared)
+# Calls are timed for the Server-Timing header (see monitoring/cache.py).
+_cache = env.cache_url('CACHE_URL', default='locmemcache://')
+CACHES = {
+    'default': {
+        **_cache,
+        'BACKEND': 'monitoring.cache.InstrumentedCache',
+        'WRAPPED_BACKEND': _cache['BACKEND'],
+        'KEY_PREFIX': env('CACHE_KEY_PREFIX', default='qanda'),
+    },
+}
+
+# Lifetime of model instances cached by DjangoQandAPlatform/caching.py
+MODEL_CACHE_TIMEOUT = env.int('MODEL_CACHE_TIMEOUT', default=300)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
@@ -137,7 +187,15 @@ STORAGES = {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
     },
     "default": {
-        "BACKEND": "cloudinary_storage.storage.MediaCloudinaryStorage",
+        # Stores each distinct upload once, staged locally and transferred
+        # to Cloudinary in the background; see uploads/storage.py
+        "BACKEND": "uploads.storage.ContentAddressedStorage",
+        "OPTIONS": {
+            "backend": "uploads.storage.StagedRemoteStorage",
+            "backend_options": {
+                "remote": "cloudinary_storage.storage.MediaCloudinaryStorage",
+            },
+        },
     },
 }
 
@@ -147,6 +205,41 @@ CLOUDINARY_STORAGE = {
     'API_SECRET': env('CLOUDINARY_API_SECRET'),
 }
 
+# Upload limits, enforced while the body streams (see uploads/handlers.py)
+FILE_UPLOAD_HANDLERS = [
+    'uploads.handlers.UploadLimitHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+UPLOAD_MAX_FILE_SIZE = 10 * 1024 * 1024
+UPLOAD_FIELD_SIZE_LIMITS = {
+    'avatar': 5 * 1024 * 1024,
+    'icon': 2 * 1024 * 1024,
+}
+UPLOAD_MAX_REQUEST_SIZE = 12 * 1024 * 1024
+
+# Background tasks (see DjangoQandAPlatform/tasks.py), e.g. image derivatives.
+# EAGER runs them inline on commit instead of in worker threads.
+BACKGROUND_TASK_WORKERS = env.int('BACKGROUND_TASK_WORKERS', default=2)
+BACKGROUND_TASKS_EAGER = env.bool('BACKGROUND_TASKS_EAGER', default=False)
+
+# Bearer token that lets a Prometheus scraper read /metrics; staff can always read it
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+
+# Queries slower than this are logged with their EXPLAIN plan (see
+# monitoring/slow_queries.py and the Slow queries admin)
+SLOW_QUERY_THRESHOLD_MS = env.float('SLOW_QUERY_THRESHOLD_MS', default=200)
+
+# Server-Timing header with database, cache, serializer and template time
+# for every response (staff users always get it)
+SERVER_TIMING = env.bool('SERVER_TIMING', default=False)
+
+# Request profiling (see monitoring/profiling.py): share of requests profiled
+# at random, seconds between stack samples, and lifetime of signed tokens
+PROFILE_SAMPLE_RATE = env.float('PROFILE_SAMPLE_RATE', default=0.0)
+PROFILE_INTERVAL = env.float('PROFILE_INTERVAL', default=0.005)
+PROFILE_TOKEN_MAX_AGE = env.int('PROFILE_TOKEN_MAX_AGE', default=24 * 3600)
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'in-v3.mailjet.com'
 EMAIL_PORT = 587
@@ -0,0 +1,75 @@
+"""
+DjangoQandAPlatform/tasks.py
+
+Minimal in-process background task runner.
+
+Tasks are handed to a small thread pool once the surrounding database
+transaction commits, so they never see uncommitted rows and never delay the
+response. Each task runs with its own database connection, closed when the
+task ends. Queued work is lost if the process exits, so work that matters
+must be recoverable by a management command (e.g. generate_image_derivatives).
+
+With the BACKGROUND_TASKS_EAGER setting, tasks run inline on commit (and
+delayed tasks run without delay) instead; tests use this to observe their
+effects synchronously.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+	"""Return the process-wide worker pool, creating it on first use."""
+	global _executor
+	with _executor_lock:
+		if _executor is None:
+			_executor = ThreadPoolExecutor(
+				max_workers=getattr(settings, 'BACKGROUND_TASK_WORKERS', 2),
+				thread_name_prefix='background-task',
+			)
+	return _executor
+
+
+def _run(func, args, kwargs):
+	try:
+		func(*args, **kwargs)
+	except Exception:
+		logger.exception("Background task %s failed", func.__qualname__)
+	finally:
+		connections.close_all()
+
+
+def run_in_background(func, *args, **kwargs):
+	"""
+	Schedule ``func(*args, **kwargs)`` to run in a worker thread after the
+	current transaction commits (immediately when there is none).
+	"""
+	def submit():
+		if getattr(settings, 'BACKGROUND_TASKS_EAGER', False):
+			func(*args, **kwargs)
+		else:
+			get_executor().submit(_run, func, args, kwargs)
+
+	transaction.on_commit(submit)
+
+
+def run_later(delay, func, *args, **kwargs):
+	"""
+	Run ``func(*args, **kwargs)`` in a worker thread after ``delay`` seconds,
+	e.g. to retry a failed task. Not tied to any transaction.
+	"""
+	if getattr(settings, 'BACKGROUND_TASKS_EAGER', False):
+		func(*args, **kwargs)
+		return
+	timer = threading.Timer(delay, lambda: get_executor().submit(_run, func, args, kwargs))
+	timer.daemon = True
+	timer.start()
@@ -0,0 +1,63 @@
+"""
+DjangoQandAPlatform/testing.py
+
+Helpers shared by the apps' test suites.
+
+QueryBudgetMixin checks how many queries a view runs, and that the number
+does not grow with the amount of data the view shows, which is how N+1
+regressions (a missing select_related or prefetch) show up.
+"""
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+	"""
+	TestCase mixin with assertQueryBudget(). Budgets are for the steady state:
+	each measured request follows an unmeasured one, so warm caches (tag
+	catalogue, content types, sessions) are not counted.
+	"""
+	data_sizes = (1, 10, 100)
+
+	def count_queries(self, request):
+		"""Run ``request()`` and return the queries it executed."""
+		with CaptureQueriesContext(connection) as captured:
+			response = request()
+		if response is not None:
+			self.assertLess(response.status_code, 400, "Budgeted request failed.")
+		return captured.captured_queries
+
+	def assertQueryBudget(self, budget, request, populate=None, sizes=None):
+		"""
+		Assert that ``request()`` runs at most ``budget`` queries.
+
+		With ``populate``, the request is measured once per data size:
+		``populate(size)`` adds that many rows (answers, comments, ...) inside
+		a savepoint that is rolled back afterwards, and the count must be the
+		same for every size.
+		"""
+		counts = {}
+		queries = []
+		for size in (sizes or self.data_sizes) if populate else (None,):
+			with self.subTest(size=size), transaction.atomic():
+				cache.clear()
+				if populate:
+					populate(size)
+				request()
+				queries = self.count_queries(request)
+				counts[size] = len(queries)
+				transaction.set_rollback(True)
+			cache.clear()
+
+		sql = '\n'.join(f"{i}. {query['sql']}" for i, query in enumerate(queries, 1))
+		summary = ', '.join(f'{size}: {count}' for size, count in counts.items())
+		self.assertLessEqual(
+			max(counts.values()), budget,
+			f"Query budget of {budget} exceeded ({summary}). Queries of the last run:\n{sql}",
+		)
+		self.assertEqual(
+			len(set(counts.values())), 1,
+			f"Query count grows with data size ({summary}). Queries of the last run:\n{sql}",
+		)
@@ -0,0 +1,183 @@
+"""
+DjangoQandAPlatform/tests.py
+
+Tests for the project-level modules shared by the apps: read-through model
+caching and read-replica routing.
+"""
+
+import time
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from DjangoQandAPlatform.caching import get_cached
+from DjangoQandAPlatform.db_routing import (
+	PIN_COOKIE, PrimaryReplicaRouter, ReplicaRoutingMiddleware, check_replica, health,
+)
+from answers.models import Answer
+from monitoring.models import RequestProfile
+from questions.hotness import ANSWER_POINTS
+from questions.models import Question
+from tags.models import Tag
+
+User = get_user_model()
+
+
+class ModelCacheTest(TestCase):
+	"""
+	Tests for read-through caching of model instances (DjangoQandAPlatform/caching.py).
+	"""
+
+	def setUp(self):
+		cache.clear()
+		self.user = User.objects.create_user(username='cached', password='1234')
+		self.question = Question.objects.create(title="Cached", body="Body", author=self.user)
+
+	def test_second_lookup_hits_cache(self):
+		with self.assertNumQueries(1):
+			self.assertEqual(get_cached(Question, self.question.pk).title, "Cached")
+		with self.assertNumQueries(0):
+			self.assertEqual(get_cached(Question, self.question.pk), self.question)
+
+	def test_save_and_activity_invalidate(self):
+		get_cached(Question, self.question.pk)
+		self.question.title = "Renamed"
+		self.question.save()
+		self.assertEqual(get_cached(Question, self.question.pk).title, "Renamed")
+
+		Answer.objects.create(question=self.question, author=self.user, content="Answer")  # Bulk-updates points
+		self.assertEqual(get_cached(Question, self.question.pk).activity_points, ANSWER_POINTS)
+
+	def test_delete_invalidates(self):
+		pk = self.question.pk
+		get_cached(Question, pk)
+		self.question.delete()
+		with self.assertRaises(Question.DoesNotExist):
+			get_cached(Question, pk)
+
+	def test_unregistered_model(self):
+		with self.assertRaises(ImproperlyConfigured):
+			get_cached(Tag, 1)
+
+	def test_answer_form_uses_cached_question(self):
+		self.client.force_login(self.user)
+		url = reverse('create-answer', args=[self.question.pk])
+		self.client.get(url)
+		with self.assertNumQueries(2):  # Session and user
+			self.assertEqual(self.client.get(url).status_code, 200)
+		self.assertEqual(self.client.get(reverse('create-answer', args=[self.question.pk + 1])).status_code, 404)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRoutingTest(TestCase):
+	"""
+	Tests for read-replica routing and read-your-writes stickiness.
+	"""
+
+	def setUp(self):
+		self.router = PrimaryReplicaRouter()
+		self.factory = RequestFactory()
+		self.healthy = {'replica1': True, 'replica2': True}
+		checks = mock.patch.object(health, 'check', side_effect=lambda alias: self.healthy[alias])
+		self.check = checks.start()
+		self.addCleanup(checks.stop)
+		health.reset()
+		self.addCleanup(health.reset)
+		# TestCase runs each test in a transaction, which would keep reads on the primary.
+		atomic = mock.patch.object(connections['default'], 'in_atomic_block', False)
+		atomic.start()
+		self.addCleanup(atomic.stop)
+
+	def serve(self, request):
+		"""Run ``request`` through the middleware; the response holds the database a read went to."""
+		return ReplicaRoutingMiddleware(lambda request: HttpResponse(self.router.db_for_read(Question)))(request)
+
+	def read_databases(self, count=30):
+		return {self.serve(self.factory.get('/')).content.decode() for _ in range(count)}
+
+	def test_reads_outside_requests_use_primary(self):
+		self.assertEqual(self.router.db_for_read(Question), 'default')
+		self.assertEqual(self.router.db_for_write(Question), 'default')
+
+	def test_safe_requests_read_from_healthy_replicas(self):
+		self.assertEqual(self.read_databases(), {'replica1', 'replica2'})
+		self.healthy['replica2'] = False
+		health.reset()
+		self.assertEqual(self.read_databases(), {'replica1'})
+		self.healthy['replica1'] = False
+		health.reset()
+		self.assertEqual(self.read_databases(), {'default'})
+
+	def test_unsafe_requests_read_from_primary(self):
+		self.assertEqual(self.serve(self.factory.post('/')).content, b'default')
+
+	def test_write_pins_request_and_browser(self):
+		def view(request):
+			self.router.db_for_write(Question)
+			return HttpResponse(self.router.db_for_read(Question))
+
+		response = ReplicaRoutingMiddleware(view)(self.factory.get('/'))
+		self.assertEqual(response.content, b'default')
+		cookie = response.cookies[PIN_COOKIE]
+		self.assertEqual(cookie['max-age'], 10)
+
+		request = self.factory.get('/')
+		request.COOKIES[PIN_COOKIE] = cookie.value
+		self.assertEqual(self.serve(request).content, b'default')
+		request.COOKIES[PIN_COOKIE] = str(int(time.time()) - 1)
+		self.assertNotEqual(self.serve(request).content, b'default')
+		self.assertNotIn(PIN_COOKIE, self.serve(self.factory.get('/')).cookies)
+
+	def test_monitoring_writes_do_not_pin(self):
+		def view(request):
+			self.router.db_for_write(RequestProfile)
+			return HttpResponse(self.router.db_for_read(Question))
+
+		response = ReplicaRoutingMiddleware(view)(self.factory.get('/'))
+		self.assertIn(response.content, (b'replica1', b'replica2'))
+		self.assertNotIn(PIN_COOKIE, response.cookies)
+
+	def test_health_checked_once_per_interval(self):
+		self.read_databases()
+		self.assertEqual(self.check.call_count, 2)
+		with override_settings(REPLICA_HEALTH_CHECK_INTERVAL=0):
+			health.is_healthy('replica1')
+		self.assertEqual(self.check.call_count, 3)
+
+	def test_check_replica_and_migrations(self):
+		self.assertTrue(check_replica('default'))
+		self.assertIs(self.router.allow_migrate('replica1', 'questions'), False)
+		self.assertIsNone(self.router.allow_migrate('default', 'questions'))
+
+
+@skipUnless('replica1' in settings.DATABASE_REPLICAS, "Needs a replica1 database alias (DB_REPLICA_HOSTS).")
+class ReplicaIntegrationTest(TransactionTestCase):
+	"""
+	End-to-end routing against a real replica alias (a mirror of the test database).
+	"""
+	databases = {'default', *settings.DATABASE_REPLICAS}
+
+	def setUp(self):
+		health.reset()
+		self.user = User.objects.create_user(username='replicated', email='replicated@example.com', password='1234')
+		self.question = Question.objects.create(title="Replicated", body="Body", author=self.user)
+
+	def test_list_reads_replica_until_a_write(self):
+		with CaptureQueriesContext(connections['replica1']) as replica:
+			self.assertContains(self.client.get(reverse('questions-list')), "Replicated")
+		self.assertTrue(replica.captured_queries)
+
+		self.client.force_login(self.user)
+		response = self.client.post(
+			reverse('create-answer', args=[self.question.pk]), {'content': 'Fresh answer'}, follow=True,
+		)
+		self.assertContains(response, 'Fresh answer')
+		self.assertIn(PIN_COOKIE, self.client.cookies)
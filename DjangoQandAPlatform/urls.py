@@ -4,7 +4,7 @@ DjangoQandAPlatform/urls.py
 Top-level URL routing for the DjangoQandAPlatform project.
 
 - Redirects the root ('') to the main questions list.
-- Includes URLs for the API, admin, user auth, answers, questions, comments, and badges apps.
+- Includes URLs for the API, admin, user auth, answers, questions, comments, badges, tags, uploads, and monitoring apps.
 - Serves uploaded media files during development if DEBUG is True.
 """
 
@@ -42,6 +42,15 @@ urlpatterns = [
     # Badges app (view earned badges and badge catalog)
     path('badges/', include('badges.urls')),
 
+    # Tags app (tag index and per-tag question pages)
+    path('tags/', include('tags.urls')),
+
+    # Uploads app (staged media not yet transferred to remote storage)
+    path('uploads/', include('uploads.urls')),
+
+    # Monitoring app (per-view metrics for Prometheus at /metrics)
+    path('', include('monitoring.urls')),
+
     # Password reset urls
     path('password-reset/',
          auth_views.PasswordResetView.as_view(
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('answers', '0005_answer_content_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='media_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated image derivatives; see uploads/derivatives.py.'),
+        ),
+    ]
@@ -9,11 +9,13 @@ from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
 from django.utils.text import Truncator
 
+from DjangoQandAPlatform.rendering import RenderedTextMixin
 from DjangoQandAPlatform.validators import SizeValidator
+from uploads.derivatives import ImageDerivativesMixin
 
 UserModel = get_user_model()
 
-class Answer(models.Model):
+class Answer(RenderedTextMixin, ImageDerivativesMixin, models.Model):
 	"""
 	Represents an answer posted by a user to a specific question.
 
@@ -36,6 +38,11 @@ class Answer(models.Model):
 	content = models.TextField(
 		help_text="Main body of the answer."
 	)
+	content_html = models.TextField(
+		blank=True,
+		editable=False,
+		help_text="Pre-rendered HTML of the content, refreshed on save."
+	)
 	created_at = models.DateTimeField(
 		auto_now_add=True,
 		help_text="Timestamp when the answer was created."
@@ -50,6 +57,15 @@ class Answer(models.Model):
 		validators=[SizeValidator(10)],
 		help_text="Optional image for context.",
 	)
+	media_meta = models.JSONField(
+		default=dict,
+		blank=True,
+		editable=False,
+		help_text="Generated image derivatives; see uploads/derivatives.py."
+	)
+
+	rendered_fields = {'content': 'content_html'}
+	image_fields = {'media': 'media_meta'}
 
 	def __str__(self):
 		"""
@@ -9,6 +9,8 @@ Uses Django's TestCase for database-backed checks.
 
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.urls import reverse
+from DjangoQandAPlatform.testing import QueryBudgetMixin
 from questions.models import Question
 from answers.models import Answer
 from comments.models import Comment
@@ -102,3 +104,32 @@ class AnswerIntegrationTest(TestCase):
 		self.assertIn(self.answer, self.question.answers.all())
 		self.assertEqual(self.question.answers.count(), 1)
 
+
+class AnswerQueryBudgetTest(QueryBudgetMixin, TestCase):
+	"""
+	Query budgets for the answer views, over growing numbers of answers and comments.
+	"""
+
+	def setUp(self):
+		self.user = User.objects.create_user(username='budgeter', password='1234')
+		self.question = Question.objects.create(title="Budget", body="Body", author=self.user)
+		self.answer = Answer.objects.create(question=self.question, author=self.user, content="Answer")
+		self.client.force_login(self.user)
+
+	def add_thread(self, size):
+		for i in range(size):
+			answer = Answer.objects.create(question=self.question, author=self.user, content=f"A{i}")
+			Comment.objects.create(author=self.user, content="On answer", content_object=answer)
+			Comment.objects.create(author=self.user, content="On this answer", content_object=self.answer)
+
+	def test_create_form(self):
+		url = reverse('create-answer', args=[self.question.pk])
+		self.assertQueryBudget(2, lambda: self.client.get(url), self.add_thread)
+
+	def test_edit_form(self):
+		url = reverse('edit-answer', args=[self.answer.pk])
+		self.assertQueryBudget(5, lambda: self.client.get(url), self.add_thread)
+
+	def test_delete_confirmation(self):
+		url = reverse('delete-answer', args=[self.answer.pk])
+		self.assertQueryBudget(6, lambda: self.client.get(url), self.add_thread)
@@ -9,6 +9,7 @@ from django.views.generic import UpdateView, CreateView, DeleteView
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 
+from DjangoQandAPlatform.caching import get_cached_or_404
 from DjangoQandAPlatform.mixins import UserIsAuthorMixin
 from .models import Answer
 from .forms import AnswerCreateForm, AnswerEditForm
@@ -26,7 +27,7 @@ class AnswerCreateView(LoginRequiredMixin, CreateView):
 
 	def dispatch(self, request, *args, **kwargs):
 		# Attach the current Question object to the view instance
-		self.question = get_object_or_404(Question, id=kwargs['question_id'])
+		self.question = get_cached_or_404(Question, kwargs['question_id'])
 		return super().dispatch(request, *args, **kwargs)
 
 	def form_valid(self, form):
@@ -60,8 +61,8 @@ class AnswerEditView(LoginRequiredMixin, UserIsAuthorMixin, UpdateView):
 
 	def dispatch(self, request, *args, **kwargs):
 		# Fetch and attach associated Question
-		question_id = Answer.objects.get(id=kwargs['answer_id']).question.id
-		self.question = get_object_or_404(Question, id=question_id)
+		question_id = get_object_or_404(Answer.objects.values_list('question_id', flat=True), id=kwargs['answer_id'])
+		self.question = get_cached_or_404(Question, question_id)
 		return super().dispatch(request, *args, **kwargs)
 
 	def get_success_url(self):
@@ -6,10 +6,11 @@ for use in REST API endpoints.
 """
 
 from rest_framework import serializers
+from monitoring.serializers import InstrumentedSerializerMixin
 from questions.models import Question
 from tags.models import Tag
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
 	"""
 	Serializer for the Tag model.
 	Used to represent tags attached to questions as simple JSON objects.
@@ -19,7 +20,17 @@ class TagSerializer(serializers.ModelSerializer):
 		fields = ['name']
 		read_only_fields = fields
 
-class QuestionSerializer(serializers.ModelSerializer):
+class TagCatalogueSerializer(InstrumentedSerializerMixin, serializers.Serializer):
+	"""
+	Serializer for tag catalogue entries (see tags/catalogue.py).
+	Used for search facets; includes how many questions carry each tag.
+	"""
+	id = serializers.IntegerField(read_only=True)
+	name = serializers.CharField(read_only=True)
+	slug = serializers.CharField(read_only=True)
+	question_count = serializers.IntegerField(read_only=True)
+
+class QuestionSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
 	"""
 	Serializer for the Question model (with related tags and author).
 	Exposes all fields required for client-side search/list/detail use.
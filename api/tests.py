@@ -10,6 +10,7 @@ from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
+from DjangoQandAPlatform.testing import QueryBudgetMixin
 from questions.models import Question
 from tags.models import Tag
 
@@ -101,3 +102,36 @@ class QuestionSearchApiTest(TestCase):
 			self.assertIn('DjangoT', tag_names)
 			self.assertIn('Django', q['title'])
 
+
+class ApiQueryBudgetTest(QueryBudgetMixin, TestCase):
+	"""
+	Query budgets for the API endpoints, over growing numbers of questions and tags.
+	"""
+
+	def setUp(self):
+		self.client = APIClient()
+		self.user = User.objects.create_user(username='budgeter', password='pass')
+		self.tag = Tag.objects.create(name='BudgetT')
+		self.tag.questions.add(Question.objects.create(title='Seed', body='Body', author=self.user))
+
+	def add_questions(self, size):
+		tags = [Tag.objects.create(name=f'BudgetT{i}') for i in range(3)]
+		for i in range(size):
+			question = Question.objects.create(title=f'Q{i}', body='Body', author=self.user)
+			question.tags.add(self.tag, *tags)
+
+	def test_question_search(self):
+		url = reverse('question-search-api')
+		self.assertQueryBudget(3, lambda: self.client.get(url), self.add_questions)
+		self.assertQueryBudget(3, lambda: self.client.get(url, {'tag': self.tag.id, 'search': 'Q'}), self.add_questions)
+
+	def test_tag_endpoints(self):
+		for url in (
+			reverse('tag-catalogue-api'),
+			reverse('tag-autocomplete-api') + '?q=bud',
+			reverse('related-tags-api', args=[self.tag.pk]),
+			reverse('trending-tags-api'),
+		):
+			with self.subTest(url=url):
+				# Served from the cached tag catalogue and precomputed tables
+				self.assertQueryBudget(0, lambda: self.client.get(url), self.add_questions)
@@ -5,9 +5,23 @@ Defines URLs for the API endpoints provided by this app.
 """
 
 from django.urls import path
-from .views import QuestionSearchAPIView
+from .views import (
+	QuestionSearchAPIView,
+	TagCatalogueAPIView,
+	TagAutocompleteAPIView,
+	RelatedTagsAPIView,
+	TrendingTagsAPIView,
+)
 
 urlpatterns = [
 	# Endpoint to search and filter questions
 	path('questions/search/', QuestionSearchAPIView.as_view(), name='question-search-api'),
+	# All tags with question counts, for search facets
+	path('tags/', TagCatalogueAPIView.as_view(), name='tag-catalogue-api'),
+	# Tag name suggestions for the tag picker
+	path('tags/autocomplete/', TagAutocompleteAPIView.as_view(), name='tag-autocomplete-api'),
+	# Tags most often used together with the given tag
+	path('tags/<int:pk>/related/', RelatedTagsAPIView.as_view(), name='related-tags-api'),
+	# Tags with the most recent activity
+	path('tags/trending/', TrendingTagsAPIView.as_view(), name='trending-tags-api'),
 ]
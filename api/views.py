@@ -1,15 +1,23 @@
 """
 api/views.py
 
-Defines API endpoints for question search and retrieval.
+Defines API endpoints for question search and retrieval, and tag facets.
 Provides pagination, searching, and tag-based filtering via DRF.
 """
 
 from rest_framework import generics, filters
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from questions.models import Question
+from tags.autocomplete import autocomplete_tags
+from tags.catalogue import get_tag_catalogue
+from tags.related import get_related_tags
+from tags.trending import get_trending_tags
 from .pagination import QuestionApiPagination
-from .serializers import QuestionSerializer
+from .serializers import QuestionSerializer, TagCatalogueSerializer
 
 class QuestionSearchAPIView(generics.ListAPIView):
 	"""
@@ -18,9 +26,12 @@ class QuestionSearchAPIView(generics.ListAPIView):
 	Supports:
 	- Text search on question title and body via the 'search' query parameter.
 	- Filtering by tag(s) using 'tag' query parameter(s).
+	- 'ordering=hot' to sort by the precomputed hot score instead of newest first.
 	- Pagination (with page size set in pagination.py).
+
+	Tags are prefetched, so a page costs the same number of queries whatever its size.
 	"""
-	queryset = Question.objects.all()
+	queryset = Question.objects.prefetch_related('tags')
 	serializer_class = QuestionSerializer
 	filter_backends = [filters.SearchFilter, DjangoFilterBackend]
 	search_fields = ['title', 'body']
@@ -30,10 +41,96 @@ class QuestionSearchAPIView(generics.ListAPIView):
 	def get_queryset(self):
 		"""
 		Optionally filters queryset by tag(s) if tag filters are present in query params.
-		Tags can be passed as multiple 'tag' parameters.
+		Tags can be passed as multiple 'tag' parameters; values that are not tag ids
+		are ignored. 'ordering=hot' sorts by hot score.
 		"""
 		queryset = super().get_queryset()
-		tag_ids = self.request.query_params.getlist('tag')
+		tag_ids = [value for value in self.request.query_params.getlist('tag') if value.isdecimal()]
 		if tag_ids:
 			queryset = queryset.filter(tags__id__in=tag_ids).distinct()
+		if self.request.query_params.get('ordering') == 'hot':
+			queryset = queryset.order_by('-hot_score', '-created_at')
 		return queryset
+
+
+class TagCatalogueAPIView(APIView):
+	"""
+	API endpoint listing all tags with their question counts (search facets).
+
+	Served from the cached tag catalogue, so it costs no queries in steady state.
+	"""
+	permission_classes = [AllowAny]
+
+	def get(self, request, *args, **kwargs):
+		serializer = TagCatalogueSerializer(get_tag_catalogue().tags, many=True)
+		return Response(serializer.data)
+
+
+class RelatedTagsAPIView(APIView):
+	"""
+	API endpoint returning the tags most often used together with a given tag.
+
+	Reads the batch-built co-occurrence matrix (see tags/related.py); responses
+	are cached until the matrix is rebuilt. Accepts ?limit= (default 10, max 50).
+	"""
+	permission_classes = [AllowAny]
+	default_limit = 10
+	max_limit = 50
+
+	def get(self, request, pk, *args, **kwargs):
+		if not any(tag.id == pk for tag in get_tag_catalogue().tags):
+			raise NotFound("Tag not found.")
+		try:
+			limit = int(request.query_params.get('limit', self.default_limit))
+		except ValueError:
+			limit = self.default_limit
+		limit = max(1, min(limit, self.max_limit))
+		return Response(get_related_tags(pk, limit))
+
+
+class TrendingTagsAPIView(APIView):
+	"""
+	API endpoint listing currently trending tags, highest decayed score first.
+
+	Scores come from hourly activity buckets (see tags/trending.py) and are cached briefly.
+	"""
+	permission_classes = [AllowAny]
+
+	def get(self, request, *args, **kwargs):
+		return Response(get_trending_tags())
+
+
+class TagAutocompleteAPIView(APIView):
+	"""
+	API endpoint suggesting tags whose name starts with ?q=, most used first.
+
+	Answered from an in-memory prefix index over the tag catalogue (see
+	tags/autocomplete.py), so it costs no queries in steady state.
+	Accepts ?limit= (default 10, max 50).
+	"""
+	permission_classes = [AllowAny]
+	default_limit = 10
+	max_limit = 50
+
+	def get(self, request, *args, **kwargs):
+		try:
+			limit = int(request.query_params.get('limit', self.default_limit))
+		except ValueError:
+			limit = self.default_limit
+		limit = max(1, min(limit, self.max_limit))
+		tags = autocomplete_tags(request.query_params.get('q', ''), limit)
+		return Response(TagCatalogueSerializer(tags, many=True).data)
+
+
+def search_questions_payload(request):
+	"""
+	Run QuestionSearchAPIView in-process for the given request and return its JSON payload.
+
+	Lets HTML views embed the first page of results using exactly the same
+	queryset, filters, pagination and serializer as the API. Returns None when
+	the API would not answer with 200 (for example an out-of-range page).
+	"""
+	response = QuestionSearchAPIView.as_view()(request)
+	if response.status_code != 200:
+		return None
+	return response.data
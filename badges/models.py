@@ -7,8 +7,10 @@ with image, auto-generated slug, and unique naming.
 from django.db import models
 from django.utils.text import slugify
 
+from uploads.derivatives import ImageDerivativesMixin
 
-class Badge(models.Model):
+
+class Badge(ImageDerivativesMixin, models.Model):
 	"""
 	Represents a unique achievement badge for rewarding user activity.
 	- Each badge has a name, description, optional icon, and slug.
@@ -26,12 +28,20 @@ class Badge(models.Model):
 		blank=True, null=True,
 		help_text="Optional badge icon image"
 	)
+	icon_meta = models.JSONField(
+		default=dict,
+		blank=True,
+		editable=False,
+		help_text="Generated image derivatives; see uploads/derivatives.py."
+	)
 	slug = models.SlugField(
 		max_length=40,
 		blank=True,
 		help_text="Always auto-generated from name"
 	)
 
+	image_fields = {'icon': 'icon_meta'}
+
 	def __str__(self):
 		"""String for admin and debug: badge name."""
 		return self.name
@@ -6,6 +6,9 @@ Covers creation, slug auto-generation, uniqueness, and optionals.
 """
 
 from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from DjangoQandAPlatform.testing import QueryBudgetMixin
 from badges.models import Badge
 
 class BadgeModelTest(TestCase):
@@ -48,3 +51,21 @@ class BadgeModelTest(TestCase):
 		)
 		self.assertFalse(badge.icon)
 
+
+class BadgeQueryBudgetTest(QueryBudgetMixin, TestCase):
+	"""
+	Query budget for the badge page, over growing numbers of holders.
+	"""
+
+	def setUp(self):
+		self.badge = Badge.objects.create(name="Budget Badge", description="Awarded for budgets.")
+
+	def award(self, size):
+		User = get_user_model()
+		for i in range(size):
+			user = User.objects.create(username=f'holder{i}', email=f'holder{i}@example.com')
+			user.profile.badges.add(self.badge)
+
+	def test_badge_details(self):
+		url = reverse('badge-details', args=[self.badge.slug])
+		self.assertQueryBudget(1, lambda: self.client.get(url), self.award)
@@ -10,11 +10,13 @@ from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.contenttypes.models import ContentType
 
+from DjangoQandAPlatform.rendering import RenderedTextMixin
 from DjangoQandAPlatform.validators import SizeValidator
+from uploads.derivatives import ImageDerivativesMixin
 
 UserModel = get_user_model()
 
-class Comment(models.Model):
+class Comment(RenderedTextMixin, ImageDerivativesMixin, models.Model):
 	"""
 	Represents a user comment, linked generically to either a Question,
 	Answer, or another Comment (for nested commenting).
@@ -27,6 +29,11 @@ class Comment(models.Model):
 	content = models.TextField(
 		help_text="Text content of the comment."
 	)
+	content_html = models.TextField(
+		blank=True,
+		editable=False,
+		help_text="Pre-rendered HTML of the content, refreshed on save."
+	)
 	created_at = models.DateTimeField(
 		auto_now_add=True,
 		help_text="Timestamp when the comment was created."
@@ -54,7 +61,15 @@ class Comment(models.Model):
 		validators=[SizeValidator(10)],
 		help_text="Optional image for context.",
 	)
+	media_meta = models.JSONField(
+		default=dict,
+		blank=True,
+		editable=False,
+		help_text="Generated image derivatives; see uploads/derivatives.py."
+	)
 
+	rendered_fields = {'content': 'content_html'}
+	image_fields = {'media': 'media_meta'}
 
 	def clean(self):
 		"""
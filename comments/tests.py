@@ -7,6 +7,8 @@ Test suite for the Comment model, including generic relation functionality.
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.urls import reverse
+from DjangoQandAPlatform.testing import QueryBudgetMixin
 from questions.models import Question
 from answers.models import Answer
 from comments.models import Comment
@@ -61,3 +63,40 @@ class CommentModelTest(TestCase):
 			object_id=self.q.pk
 		)
 		self.assertIn("Comment by", str(comment))
+
+
+class CommentQueryBudgetTest(QueryBudgetMixin, TestCase):
+	"""
+	Query budgets for the comment views, over growing numbers of comments.
+	"""
+
+	def setUp(self):
+		self.user = User.objects.create_user(username='budgeter', password='1234')
+		self.q = Question.objects.create(title='Q Title', body='Q Body', author=self.user)
+		self.a = Answer.objects.create(question=self.q, author=self.user, content='Answer Content')
+		self.on_question = Comment.objects.create(author=self.user, content='Top', content_object=self.q)
+		self.on_answer = Comment.objects.create(author=self.user, content='On answer', content_object=self.a)
+		self.client.force_login(self.user)
+
+	def add_comments(self, size):
+		for i in range(size):
+			Comment.objects.create(author=self.user, content=f'Q{i}', content_object=self.q)
+			Comment.objects.create(author=self.user, content=f'A{i}', content_object=self.a)
+			Comment.objects.create(author=self.user, content=f'R{i}', content_object=self.on_question)
+
+	def test_add_forms(self):
+		for url, budget in (
+			(reverse('add-comment-to-question', args=[self.q.pk]), 2),
+			(reverse('add-comment-to-answer', args=[self.a.pk]), 3),
+			(reverse('add-comment-to-comment', args=[self.on_question.pk]), 7),
+		):
+			with self.subTest(url=url):
+				self.assertQueryBudget(budget, lambda: self.client.get(url), self.add_comments)
+
+	def test_edit_form(self):
+		url = reverse('edit-comment-to-question', args=[self.q.pk, self.on_question.pk])
+		self.assertQueryBudget(5, lambda: self.client.get(url), self.add_comments)
+
+	def test_delete_confirmation(self):
+		url = reverse('delete-comment-to-answer', args=[self.a.pk, self.on_answer.pk])
+		self.assertQueryBudget(6, lambda: self.client.get(url), self.add_comments)
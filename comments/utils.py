@@ -1,4 +1,5 @@
 # utils.py
+from DjangoQandAPlatform.caching import get_cached
 from answers.models import Answer
 from comments.models import Comment
 from questions.models import Question
@@ -18,6 +19,13 @@ def get_root_question(obj):
 		else:
 			return None
 
+def get_cached_question(pk):
+	"""The question with primary key ``pk`` from the model cache, or None."""
+	try:
+		return get_cached(Question, pk)
+	except Question.DoesNotExist:
+		return None
+
 def get_comment_context(kwargs):
 	"""
 	Extract context data for templates from URL kwargs:
@@ -32,11 +40,11 @@ def get_comment_context(kwargs):
 	comment_id = kwargs.get('comment_id') or kwargs.get('parent_comment_id')
 
 	if question_id:
-		question = Question.objects.filter(pk=question_id).first()
+		question = get_cached_question(question_id)
 
 	elif answer_id:
 		answer = Answer.objects.filter(pk=answer_id).first()
-		question = answer.question if answer else None
+		question = get_cached_question(answer.question_id) if answer else None
 
 	elif comment_id:
 		# This is the immediate parent comment ID
@@ -0,0 +1,119 @@
+"""
+monitoring/admin.py
+
+Admin for stored request profiles (the hottest frames of each profile, and
+its collapsed stacks for download into a flame graph viewer) and for the
+slow-query log.
+"""
+
+from django.contrib import admin
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+from django.utils.text import Truncator
+
+from .models import RequestProfile, SlowQuery
+from .profiling import hot_frames
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+	"""
+	Profiles are recorded by ProfilingMiddleware and read-only here.
+	"""
+	list_display = ('created_at', 'method', 'path', 'view_name', 'status_code', 'duration_ms', 'samples', 'trigger')
+	list_filter = ('trigger', 'view_name')
+	search_fields = ('path', 'view_name')
+	date_hierarchy = 'created_at'
+	fields = (
+		'method', 'path', 'view_name', 'status_code', 'user', 'trigger', 'created_at',
+		'duration_ms', 'samples', 'interval', 'download', 'hot_frame_table',
+	)
+	readonly_fields = fields
+
+	def has_add_permission(self, request):
+		return False
+
+	def has_change_permission(self, request, obj=None):
+		return False
+
+	def get_urls(self):
+		return [
+			path(
+				'<int:pk>/collapsed/', self.admin_site.admin_view(self.collapsed_view),
+				name='monitoring_requestprofile_collapsed',
+			),
+		] + super().get_urls()
+
+	def collapsed_view(self, request, pk):
+		"""The profile's collapsed stacks as a text file (flamegraph.pl, speedscope)."""
+		if not self.has_view_permission(request):
+			return HttpResponse(status=403)
+		profile = get_object_or_404(RequestProfile, pk=pk)
+		response = HttpResponse(profile.collapsed, content_type='text/plain; charset=utf-8')
+		response['Content-Disposition'] = f'attachment; filename="profile-{profile.pk}.collapsed.txt"'
+		return response
+
+	def duration_ms(self, obj):
+		return round(obj.duration * 1000, 1)
+	duration_ms.short_description = 'Duration (ms)'
+
+	def download(self, obj):
+		url = reverse('admin:monitoring_requestprofile_collapsed', args=(obj.pk,))
+		return format_html('<a href="{}">Collapsed stacks</a> (open in speedscope or flamegraph.pl)', url)
+	download.short_description = 'Flame graph'
+
+	def hot_frame_table(self, obj):
+		rows = format_html_join(
+			'', '<tr><td>{}</td><td>{}</td><td>{}</td></tr>',
+			((own, total, label) for label, own, total in hot_frames(obj.collapsed)),
+		)
+		return format_html(
+			'<table><thead><tr><th>Self</th><th>Total</th><th>Frame</th></tr></thead><tbody>{}</tbody></table>',
+			rows,
+		) if rows else '-'
+	hot_frame_table.short_description = 'Hottest frames (samples)'
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+	"""
+	Slow-query fingerprints, most total time first; recorded by MetricsMiddleware.
+	"""
+	list_display = ('truncated_sql', 'count', 'total_ms', 'mean_ms', 'max_ms', 'view_name', 'last_seen')
+	list_filter = ('view_name',)
+	search_fields = ('sql', 'view_name', 'origin')
+	fields = (
+		'sql', 'count', 'total_ms', 'mean_ms', 'max_ms', 'view_name', 'origin',
+		'first_seen', 'last_seen', 'fingerprint', 'formatted_plan',
+	)
+	readonly_fields = fields
+
+	def has_add_permission(self, request):
+		return False
+
+	def has_change_permission(self, request, obj=None):
+		return False
+
+	def truncated_sql(self, obj):
+		return Truncator(obj.sql).chars(100)
+	truncated_sql.short_description = 'SQL'
+
+	def total_ms(self, obj):
+		return round(obj.total_time * 1000, 1)
+	total_ms.short_description = 'Total (ms)'
+	total_ms.admin_order_field = 'total_time'
+
+	def mean_ms(self, obj):
+		return round(obj.total_time * 1000 / obj.count, 1)
+	mean_ms.short_description = 'Mean (ms)'
+
+	def max_ms(self, obj):
+		return round(obj.max_time * 1000, 1)
+	max_ms.short_description = 'Max (ms)'
+	max_ms.admin_order_field = 'max_time'
+
+	def formatted_plan(self, obj):
+		return format_html('<pre>{}</pre>', obj.plan) if obj.plan else '-'
+	formatted_plan.short_description = 'Plan'
@@ -0,0 +1,14 @@
+"""
+monitoring/apps.py
+
+Django app configuration for the monitoring app.
+"""
+
+from django.apps import AppConfig
+
+class MonitoringConfig(AppConfig):
+    """
+    Config for the monitoring app (per-view request metrics and profiling).
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoring'
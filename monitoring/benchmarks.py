@@ -0,0 +1,255 @@
+"""
+monitoring/benchmarks.py
+
+Microbenchmarks of hot inner pieces, run in isolation by the run_benchmarks
+command: question serialization, question page rendering, comment-tree
+helpers and API pagination.
+
+Each benchmark is a setup function registered with @benchmark. It builds
+deterministic fixtures for one data size and returns the callable to time.
+The runner builds each fixture inside a transaction that is rolled back
+afterwards, warms the callable up, calibrates how many calls make a round of
+at least ``min_time`` seconds (as timeit does), and reports per-call
+statistics over ``repeat`` rounds. Results can be saved as a baseline and
+later runs compared with it; a median slower by more than the threshold is
+flagged as a regression.
+"""
+
+import gc
+import json
+import statistics
+import time
+from typing import Callable, NamedTuple
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from DjangoQandAPlatform.rendering import render_text
+from answers.models import Answer
+from api.pagination import QuestionApiPagination
+from api.serializers import QuestionSerializer
+from comments.models import Comment
+from comments.utils import get_comment_context, get_root_question
+from questions.models import Question
+from questions.views import QuestionDetailView
+from tags.models import Tag
+
+BENCHMARKS = {}
+
+
+class Benchmark(NamedTuple):
+	name: str
+	setup: Callable
+	sizes: tuple
+	description: str
+
+
+class Result(NamedTuple):
+	key: str  # "name[size]"
+	calls: int  # Calls per round
+	min: float  # Seconds per call
+	median: float
+	mean: float
+	stdev: float
+
+
+def benchmark(name, sizes=(None,)):
+	"""Register ``setup(size)`` as a benchmark run once per size in ``sizes``."""
+	def decorator(setup):
+		description = (setup.__doc__ or '').strip().split('\n')[0]
+		BENCHMARKS[name] = Benchmark(name, setup, tuple(sizes), description)
+		return setup
+	return decorator
+
+
+def benchmark_key(name, size):
+	return name if size is None else f'{name}[{size}]'
+
+
+# Fixtures. All content is fixed, so every run times the same work.
+
+def fixture_user():
+	user, _ = get_user_model().objects.get_or_create(
+		username='microbench', defaults={'email': 'microbench@example.com'},
+	)
+	return user
+
+
+def fixture_questions(count, tags_per_question=3):
+	"""``count`` questions, each carrying ``tags_per_question`` of five tags."""
+	user = fixture_user()
+	tags = [Tag.objects.get_or_create(name=f'microbench-{i}')[0] for i in range(5)]
+	body = 'How do I make this faster?\n\nIt takes a while to load.'
+	questions = Question.objects.bulk_create(
+		Question(title=f'Benchmark question {i}', body=body, body_html=render_text(body), author=user)
+		for i in range(count)
+	)
+	through = Question.tags.through
+	through.objects.bulk_create(
+		through(question_id=question.pk, tag_id=tags[(i + j) % len(tags)].pk)
+		for i, question in enumerate(questions) for j in range(tags_per_question)
+	)
+	return questions
+
+
+def fixture_thread(size):
+	"""
+	A question with ``size`` answers and ``size`` top-level comments; each
+	answer and comment carries one comment of its own. Returns the question
+	and the reply to its first comment (the deepest allowed nesting).
+	"""
+	question = fixture_questions(1)[0]
+	user = question.author
+	reply = None
+	for i in range(size):
+		answer = Answer.objects.create(question=question, author=user, content=f'Answer {i}')
+		Comment.objects.create(author=user, content='On the answer', content_object=answer)
+		comment = Comment.objects.create(author=user, content=f'Comment {i}', content_object=question)
+		child = Comment.objects.create(author=user, content='Reply', content_object=comment)
+		reply = reply or child
+	return question, reply
+
+
+def anonymous_request(path='/'):
+	request = RequestFactory().get(path)
+	request.user = AnonymousUser()
+	return request
+
+
+# Benchmarks
+
+@benchmark('question_serializer', sizes=(10, 100, 500))
+def bench_question_serializer(size):
+	"""QuestionSerializer over N questions with prefetched tags."""
+	questions = list(Question.objects.filter(pk__in=[q.pk for q in fixture_questions(size)]).prefetch_related('tags'))
+	return lambda: QuestionSerializer(questions, many=True).data
+
+
+@benchmark('question_details_template', sizes=(1, 10, 100))
+def bench_question_details_template(size):
+	"""Rendering question_details.html for a thread of N answers and comments (no queries)."""
+	question, _ = fixture_thread(size)
+	request = anonymous_request()
+	view = QuestionDetailView()
+	view.setup(request, pk=question.pk)
+	view.object = view.get_object()
+	prefetch_related_objects([view.object], 'tags')
+	context = view.get_context_data(object=view.object)
+	context['answers'] = list(context['answers'])
+	context['comments'] = list(context['comments'])
+	return lambda: render_to_string(QuestionDetailView.template_name, context, request)
+
+
+@benchmark('get_root_question')
+def bench_get_root_question():
+	"""get_root_question from a freshly loaded reply to a comment on a question."""
+	_, reply = fixture_thread(1)
+	return lambda: get_root_question(Comment.objects.get(pk=reply.pk))
+
+
+@benchmark('get_comment_context')
+def bench_get_comment_context():
+	"""get_comment_context for a question, an answer and a parent comment."""
+	question, reply = fixture_thread(1)
+	variants = (
+		{'question_id': question.pk},
+		{'answer_id': question.answers.values_list('pk', flat=True).first()},
+		{'parent_comment_id': reply.object_id},
+	)
+
+	def run():
+		for kwargs in variants:
+			get_comment_context(kwargs)
+	return run
+
+
+@benchmark('question_api_pagination', sizes=(100, 1000, 10000))
+def bench_question_api_pagination(size):
+	"""QuestionApiPagination: counting N questions and slicing page 2."""
+	fixture_questions(size, tags_per_question=0)
+	queryset = Question.objects.all()
+	request = Request(anonymous_request('/?page=2'))
+
+	def run():
+		paginator = QuestionApiPagination()
+		return list(paginator.paginate_queryset(queryset, request))
+	return run
+
+
+# Runner
+
+def _time_calls(func, number):
+	gc_enabled = gc.isenabled()
+	gc.disable()
+	try:
+		start = time.perf_counter()
+		for _ in range(number):
+			func()
+		return time.perf_counter() - start
+	finally:
+		if gc_enabled:
+			gc.enable()
+
+
+def measure(func, repeat=5, min_time=0.2, warmup=1):
+	"""Warm up, calibrate calls per round, and return per-call timings of ``repeat`` rounds."""
+	for _ in range(warmup):
+		func()
+	number = 1
+	while True:
+		elapsed = _time_calls(func, number)
+		if elapsed >= min_time or number >= 1_000_000:
+			break
+		number *= 10 if elapsed < min_time / 10 else 2
+	return number, [_time_calls(func, number) / number for _ in range(repeat)]
+
+
+def run_benchmarks(names=None, repeat=5, min_time=0.2, warmup=1, quick=False):
+	"""
+	Run the selected benchmarks (all by default); ``quick`` runs only the
+	smallest size of each. Yields a Result per benchmark and size.
+	"""
+	for name, bench in BENCHMARKS.items():
+		if names and not any(part in name for part in names):
+			continue
+		for size in bench.sizes[:1] if quick else bench.sizes:
+			with transaction.atomic():
+				func = bench.setup() if size is None else bench.setup(size)
+				calls, timings = measure(func, repeat, min_time, warmup)
+				transaction.set_rollback(True)
+			yield Result(
+				benchmark_key(name, size), calls, min(timings), statistics.median(timings),
+				statistics.fmean(timings), statistics.stdev(timings) if len(timings) > 1 else 0.0,
+			)
+
+
+def save_baseline(results, path):
+	with open(path, 'w') as f:
+		json.dump({'benchmarks': {result.key: result._asdict() for result in results}}, f, indent=2)
+		f.write('\n')
+
+
+def load_baseline(path):
+	with open(path) as f:
+		return json.load(f)['benchmarks']
+
+
+def compare(result, baseline, threshold):
+	"""
+	Compare a result's median with its baseline entry. Returns (ratio,
+	verdict), verdict being 'regression', 'improvement', 'ok' or 'new'.
+	"""
+	entry = baseline.get(result.key)
+	if not entry or not entry['median']:
+		return None, 'new'
+	ratio = result.median / entry['median']
+	if ratio > 1 + threshold:
+		return ratio, 'regression'
+	if ratio < 1 / (1 + threshold):
+		return ratio, 'improvement'
+	return ratio, 'ok'
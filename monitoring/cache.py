@@ -0,0 +1,68 @@
+"""
+monitoring/cache.py
+
+Cache backend that times the calls made to another backend, for the
+Server-Timing header (see ServerTimingMiddleware). Configure it with the
+real backend under WRAPPED_BACKEND; every other setting (LOCATION, TIMEOUT,
+OPTIONS, KEY_PREFIX, ...) is handed to that backend:
+
+	CACHES = {
+		'default': {
+			'BACKEND': 'monitoring.cache.InstrumentedCache',
+			'WRAPPED_BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+		},
+	}
+"""
+
+import time
+
+from django.core.cache.backends.base import BaseCache
+from django.utils.module_loading import import_string
+
+from .metrics import current_stats
+
+
+def _timed(name):
+	def method(self, *args, **kwargs):
+		stats = current_stats.get()
+		if stats is None:
+			return getattr(self.wrapped, name)(*args, **kwargs)
+		start = time.perf_counter()
+		try:
+			return getattr(self.wrapped, name)(*args, **kwargs)
+		finally:
+			stats.cache_calls += 1
+			stats.cache_time += time.perf_counter() - start
+	method.__name__ = name
+	return method
+
+
+class InstrumentedCache(BaseCache):
+	"""
+	Delegates to the WRAPPED_BACKEND cache, adding the number and duration of
+	its calls to the current request's stats. The async methods are BaseCache's,
+	which run these in a thread.
+	"""
+
+	def __init__(self, location, params):
+		params = dict(params)
+		self.wrapped = import_string(params.pop('WRAPPED_BACKEND'))(location, params)
+		super().__init__(params)
+
+	add = _timed('add')
+	get = _timed('get')
+	set = _timed('set')
+	touch = _timed('touch')
+	delete = _timed('delete')
+	get_many = _timed('get_many')
+	set_many = _timed('set_many')
+	delete_many = _timed('delete_many')
+	has_key = _timed('has_key')
+	incr = _timed('incr')
+	decr = _timed('decr')
+
+	def clear(self):
+		return self.wrapped.clear()
+
+	def close(self, **kwargs):
+		return self.wrapped.close(**kwargs)
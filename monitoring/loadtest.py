@@ -0,0 +1,261 @@
+"""
+monitoring/loadtest.py
+
+Self-contained HTTP load-testing harness (standard library only), run with
+the loadtest management command against a server on localhost: runserver,
+gunicorn or uvicorn.
+
+Virtual users run in threads, each with its own cookie jar. They repeatedly
+pick a scenario by weight, play it against the server and pause for a think
+time:
+
+	browse    anonymous questions-list, then question_details of a few questions
+	search    typing into the question search box: the search API is called
+	          for the prefixes the page's 300 ms debounce would send
+	username  typing a username on the sign-up page, with the same debounce,
+	          against check_username (bursts come from concurrent users)
+	post      a logged-in user answering a question and commenting on it
+
+Posting needs existing accounts: by default those made by seed_benchmark_data
+(bench-0, bench-1, ... with password "benchmark").
+
+Every request is recorded under its endpoint label; the report gives per
+endpoint request count, error rate, throughput and p50/p95/p99 latency, as a
+JSON-serialisable dict so that runs can be compared.
+"""
+
+import json
+import random
+import re
+import string
+import threading
+import time
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urljoin
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+DEBOUNCE = 0.3  # Seconds; matches the search box and sign-up page scripts
+PERCENTILES = (50, 95, 99)
+SEARCH_TERMS = ('django', 'query', 'template', 'migration', 'cache', 'slow', 'error', 'model')
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class NoRedirect(HTTPRedirectHandler):
+	"""Report redirects as responses instead of following them."""
+
+	def redirect_request(self, *args, **kwargs):
+		return None
+
+
+def percentile(sorted_values, pct):
+	"""Nearest-rank percentile of an ascending list."""
+	if not sorted_values:
+		return None
+	rank = max(1, -(-pct * len(sorted_values) // 100))  # Ceiling division
+	return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+	"""Thread-safe collector of (endpoint, seconds, ok) samples."""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self.samples = {}
+
+	def record(self, endpoint, seconds, ok):
+		with self._lock:
+			self.samples.setdefault(endpoint, []).append((seconds, ok))
+
+	def report(self, elapsed):
+		"""Per-endpoint and overall statistics for a run of ``elapsed`` seconds."""
+		with self._lock:
+			samples = {endpoint: list(values) for endpoint, values in self.samples.items()}
+		endpoints = {endpoint: self.summarise(values, elapsed) for endpoint, values in sorted(samples.items())}
+		everything = [sample for values in samples.values() for sample in values]
+		return {'duration': round(elapsed, 3), 'total': self.summarise(everything, elapsed), 'endpoints': endpoints}
+
+	@staticmethod
+	def summarise(values, elapsed):
+		latencies = sorted(seconds for seconds, _ in values)
+		errors = sum(not ok for _, ok in values)
+		summary = {
+			'requests': len(values),
+			'errors': errors,
+			'error_rate': round(errors / len(values), 4) if values else 0,
+			'throughput': round(len(values) / elapsed, 2) if elapsed else 0,
+			'mean_ms': round(1000 * sum(latencies) / len(latencies), 2) if latencies else None,
+		}
+		for pct in PERCENTILES:
+			value = percentile(latencies, pct)
+			summary[f'p{pct}_ms'] = round(1000 * value, 2) if value is not None else None
+		return summary
+
+
+class VirtualUser:
+	"""One simulated visitor: a cookie jar, a random generator and a recorder."""
+
+	def __init__(self, base_url, recorder, rng, timeout=30):
+		self.base_url = base_url
+		self.recorder = recorder
+		self.rng = rng
+		self.timeout = timeout
+		self.cookies = CookieJar()
+		self.opener = build_opener(HTTPCookieProcessor(self.cookies), NoRedirect)
+		self.logged_in = False
+
+	def request(self, endpoint, path, data=None, headers=None):
+		"""
+		Send one request and record it under ``endpoint``. Returns (status,
+		body); status is 0 when the connection failed. Redirects count as
+		success, since the app answers form posts with them.
+		"""
+		url = urljoin(self.base_url, path)
+		body = urlencode(data).encode() if data is not None else None
+		request = Request(url, data=body, headers={'Referer': url, **(headers or {})})
+		start = time.perf_counter()
+		try:
+			with self.opener.open(request, timeout=self.timeout) as response:
+				status, content = response.status, response.read()
+		except HTTPError as exc:
+			status, content = exc.code, exc.read()
+		except (URLError, OSError):
+			status, content = 0, b''
+		self.recorder.record(endpoint, time.perf_counter() - start, 0 < status < 400)
+		return status, content.decode('utf-8', 'replace')
+
+	def get_json(self, endpoint, path):
+		status, body = self.request(endpoint, path, headers={'Accept': 'application/json'})
+		if status != 200:
+			return None
+		try:
+			return json.loads(body)
+		except ValueError:
+			return None
+
+	def form_post(self, endpoint, path, data):
+		"""GET a form page for its CSRF token, then POST ``data`` to it."""
+		status, page = self.request(f'{endpoint} (form)', path)
+		match = CSRF_INPUT.search(page)
+		if status != 200 or not match:
+			return status
+		status, _ = self.request(endpoint, path, {**data, 'csrfmiddlewaretoken': match.group(1)})
+		return status
+
+	def login(self, username, password):
+		status = self.form_post('login', '/auth/login/', {'username': username, 'password': password})
+		self.logged_in = status == 302
+		return self.logged_in
+
+	def type_text(self, text, min_gap, max_gap):
+		"""
+		Simulate typing ``text`` with random gaps between keystrokes; return
+		the prefixes a DEBOUNCE-delayed input handler would act on.
+		"""
+		prefixes = []
+		for i in range(1, len(text) + 1):
+			gap = self.rng.uniform(min_gap, max_gap)
+			if i == len(text) or gap >= DEBOUNCE:
+				prefixes.append(text[:i])
+			time.sleep(min(gap, DEBOUNCE))
+		return prefixes
+
+
+def browse(user, context):
+	"""Anonymous visitor: the questions list, then a few question pages."""
+	user.request('questions-list', '/questions/')
+	for question_id in user.rng.sample(context['question_ids'], min(3, len(context['question_ids']))):
+		user.request('question_details', f'/questions/{question_id}/details/')
+
+
+def search(user, context):
+	"""Typing a search term into the question search box."""
+	term = user.rng.choice(SEARCH_TERMS)
+	for prefix in user.type_text(term, 0.05, 0.45):
+		user.request('question-search-api', '/api/questions/search/?' + urlencode({'search': prefix, 'page': 1}))
+
+
+def username(user, context):
+	"""Typing a username on the sign-up page, checked as the page would."""
+	name = ''.join(user.rng.choices(string.ascii_lowercase, k=user.rng.randint(5, 12)))
+	for prefix in user.type_text(name, 0.04, 0.4):
+		user.request('check-username', '/auth/ajax/check-username/?' + urlencode({'username': prefix}))
+
+
+def post(user, context):
+	"""A logged-in user answers a question and comments on it."""
+	if not user.logged_in:
+		account = user.rng.randrange(context['accounts'])
+		if not user.login(f"{context['username_prefix']}-{account}", context['password']):
+			return
+	question_id = user.rng.choice(context['question_ids'])
+	user.form_post('create-answer', f'/answers/answer-question/{question_id}/', {'content': 'Load test answer.'})
+	user.form_post('add-comment', f'/comments/question/{question_id}/add/', {'content': 'Load test comment.'})
+
+
+SCENARIOS = {
+	'browse': browse,
+	'search': search,
+	'username': username,
+	'post': post,
+}
+
+
+def discover_question_ids(base_url, recorder, pages=3):
+	"""Question ids to visit, read from the first pages of the search API."""
+	user = VirtualUser(base_url, recorder, random.Random(0))
+	ids = []
+	for page in range(1, pages + 1):
+		data = user.get_json('discovery', f'/api/questions/search/?page={page}&page_size=50')
+		if not data:
+			break
+		ids.extend(question['id'] for question in data['results'])
+		if not data.get('next'):
+			break
+	return ids
+
+
+def run_load_test(base_url, weights, users=10, duration=30.0, think_time=1.0, seed=0,
+		accounts=100, username_prefix='bench', password='benchmark'):
+	"""
+	Run ``users`` virtual users for ``duration`` seconds, each picking
+	scenarios from SCENARIOS by ``weights`` ({name: weight}), and return the report.
+	"""
+	recorder = Recorder()
+	question_ids = discover_question_ids(base_url, Recorder())
+	if not question_ids:
+		raise ValueError(f"No questions found at {base_url}; seed some data first.")
+	context = {
+		'question_ids': question_ids,
+		'accounts': accounts,
+		'username_prefix': username_prefix,
+		'password': password,
+	}
+	names = list(weights)
+	cumulative = []
+	total = 0
+	for name in names:
+		total += weights[name]
+		cumulative.append(total)
+	deadline = time.monotonic() + duration
+
+	def run_user(index):
+		rng = random.Random(seed * 10007 + index)
+		user = VirtualUser(base_url, recorder, rng)
+		while time.monotonic() < deadline:
+			scenario = rng.choices(names, cum_weights=cumulative)[0]
+			SCENARIOS[scenario](user, context)
+			time.sleep(rng.uniform(0, 2 * think_time))
+
+	threads = [threading.Thread(target=run_user, args=(i,), daemon=True) for i in range(users)]
+	started = time.monotonic()
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	report = recorder.report(time.monotonic() - started)
+	report['config'] = {
+		'base_url': base_url, 'users': users, 'duration': duration,
+		'think_time': think_time, 'seed': seed, 'weights': weights,
+	}
+	return report
@@ -0,0 +1,88 @@
+"""
+monitoring/management/commands/loadtest.py
+
+Runs the load-test scenarios of monitoring/loadtest.py against a running
+server and prints (or writes) the JSON report, e.g.:
+
+	python manage.py seed_benchmark_data
+	gunicorn DjangoQandAPlatform.wsgi -w 4 &
+	python manage.py loadtest --users 50 --duration 60 --output run.json
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.loadtest import SCENARIOS, run_load_test
+
+DEFAULT_MIX = 'browse=6,search=2,username=1,post=1'
+
+
+def parse_mix(value):
+	"""Parse 'name=weight,...' into {name: weight}."""
+	weights = {}
+	for item in value.split(','):
+		name, _, weight = item.partition('=')
+		name = name.strip()
+		if name not in SCENARIOS:
+			raise CommandError(f"Unknown scenario “{name}”; choose from {', '.join(SCENARIOS)}.")
+		try:
+			weights[name] = float(weight or 1)
+		except ValueError:
+			raise CommandError(f"Invalid weight for scenario “{name}”.")
+	if not any(weights.values()):
+		raise CommandError("At least one scenario needs a positive weight.")
+	return weights
+
+
+class Command(BaseCommand):
+	help = "Load-test a running server and report latency percentiles per endpoint as JSON."
+
+	def add_arguments(self, parser):
+		parser.add_argument('--url', default='http://127.0.0.1:8000/', help="Server base URL (default: %(default)s).")
+		parser.add_argument('--users', type=int, default=10, help="Concurrent virtual users (default: 10).")
+		parser.add_argument('--duration', type=float, default=30, help="Run time in seconds (default: 30).")
+		parser.add_argument(
+			'--think-time', type=float, default=1.0,
+			help="Mean pause between scenarios per user, in seconds (default: 1).",
+		)
+		parser.add_argument(
+			'--mix', default=DEFAULT_MIX,
+			help=f"Scenario weights as name=weight pairs (default: {DEFAULT_MIX}).",
+		)
+		parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0).")
+		parser.add_argument(
+			'--accounts', type=int, default=100,
+			help="Number of seeded accounts the post scenario logs in as (default: 100).",
+		)
+		parser.add_argument('--username-prefix', default='bench', help="Seeded account name prefix (default: bench).")
+		parser.add_argument('--password', default='benchmark', help="Seeded account password (default: benchmark).")
+		parser.add_argument('--output', help="Write the JSON report to this file instead of stdout.")
+
+	def handle(self, *args, **options):
+		try:
+			report = run_load_test(
+				options['url'],
+				parse_mix(options['mix']),
+				users=options['users'],
+				duration=options['duration'],
+				think_time=options['think_time'],
+				seed=options['seed'],
+				accounts=options['accounts'],
+				username_prefix=options['username_prefix'],
+				password=options['password'],
+			)
+		except ValueError as exc:
+			raise CommandError(str(exc))
+
+		output = json.dumps(report, indent=2)
+		if options['output']:
+			with open(options['output'], 'w') as f:
+				f.write(output + '\n')
+			total = report['total']
+			self.stdout.write(
+				f"{total['requests']} request(s), {total['throughput']}/s, p95 {total['p95_ms']} ms, "
+				f"error rate {total['error_rate']:.2%}. Report written to {options['output']}."
+			)
+		else:
+			self.stdout.write(output)
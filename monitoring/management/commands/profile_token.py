@@ -0,0 +1,19 @@
+"""
+monitoring/management/commands/profile_token.py
+
+Prints a signed X-Profile-Token header value: requests carrying it are
+profiled (see monitoring/profiling.py), e.g.
+
+	curl -H "X-Profile-Token: $(python manage.py profile_token)" https://.../questions/1/details/
+"""
+
+from django.core.management.base import BaseCommand
+
+from monitoring.profiling import make_profile_token
+
+
+class Command(BaseCommand):
+	help = "Print a signed X-Profile-Token header value that enables request profiling."
+
+	def handle(self, *args, **options):
+		self.stdout.write(make_profile_token())
@@ -0,0 +1,79 @@
+"""
+monitoring/management/commands/run_benchmarks.py
+
+Runs the microbenchmarks of monitoring/benchmarks.py. Fixtures are written
+inside transactions that are rolled back, so any database can be used, but
+a quiet machine gives the most stable numbers. Typical use:
+
+	python manage.py run_benchmarks --save baseline.json
+	... change code ...
+	python manage.py run_benchmarks --compare baseline.json
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.benchmarks import BENCHMARKS, compare, load_baseline, run_benchmarks, save_baseline
+
+
+def format_time(seconds):
+	for unit, scale in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+		if seconds >= scale:
+			return f'{seconds / scale:.3g} {unit}'
+	return f'{seconds / 1e-9:.3g} ns'
+
+
+class Command(BaseCommand):
+	help = "Run microbenchmarks, optionally saving or comparing with a baseline."
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			'names', nargs='*',
+			help=f"Only run benchmarks whose name contains one of these (available: {', '.join(BENCHMARKS)}).",
+		)
+		parser.add_argument('--repeat', type=int, default=5, help="Timed rounds per benchmark (default: 5).")
+		parser.add_argument(
+			'--min-time', type=float, default=0.2,
+			help="Minimum duration of one round in seconds (default: 0.2).",
+		)
+		parser.add_argument('--warmup', type=int, default=1, help="Untimed calls before measuring (default: 1).")
+		parser.add_argument('--quick', action='store_true', help="Only run the smallest data size of each benchmark.")
+		parser.add_argument('--list', action='store_true', dest='list_only', help="List the benchmarks and exit.")
+		parser.add_argument('--save', metavar='PATH', help="Save the results as a JSON baseline.")
+		parser.add_argument(
+			'--compare', metavar='PATH', dest='baseline',
+			help="Compare with a saved baseline; fail on regressions.",
+		)
+		parser.add_argument(
+			'--threshold', type=float, default=0.1,
+			help="Relative median slowdown counted as a regression (default: 0.1).",
+		)
+
+	def handle(self, *args, names, repeat, min_time, warmup, quick, list_only, save, baseline, threshold, **options):
+		if list_only:
+			for bench in BENCHMARKS.values():
+				sizes = ', '.join(str(size) for size in bench.sizes if size is not None)
+				self.stdout.write(f"{bench.name:<28} {bench.description}" + (f" (sizes: {sizes})" if sizes else ''))
+			return
+		baseline = load_baseline(baseline) if baseline else None
+		results = []
+		regressions = []
+		for result in run_benchmarks(names, repeat=repeat, min_time=min_time, warmup=warmup, quick=quick):
+			results.append(result)
+			line = (
+				f"{result.key:<40} median {format_time(result.median):>10}  "
+				f"min {format_time(result.min):>10}  ±{format_time(result.stdev):>10}  ({result.calls} calls/round)"
+			)
+			if baseline is not None:
+				ratio, verdict = compare(result, baseline, threshold)
+				if verdict == 'regression':
+					regressions.append(result.key)
+				line += f"  {verdict}" + (f" ({ratio:.2f}x)" if ratio else '')
+			self.stdout.write(line)
+
+		if not results:
+			raise CommandError("No benchmark matched.")
+		if save:
+			save_baseline(results, save)
+			self.stdout.write(f"Baseline saved to {save}.")
+		if regressions:
+			raise CommandError(f"{len(regressions)} regression(s): {', '.join(regressions)}.")
@@ -0,0 +1,179 @@
+"""
+monitoring/metrics.py
+
+Process-local per-view request metrics, exported in Prometheus text format.
+
+MetricsMiddleware (monitoring/middleware.py) measures every request: total
+latency, the number and duration of its database queries (through a
+connection.execute_wrapper) and the time spent rendering templates (through
+the template backend in monitoring/templates.py). Each request's figures are
+collected in a RequestStats bound to a context variable, then folded into the
+aggregates of the view that served it, keyed by URL name.
+
+Built to stay on in production: recording is a few additions under a lock,
+memory is fixed per view, and labels are URL names, HTTP methods and status
+classes, never paths, so their number stays bounded. Aggregates live in each
+worker process and start from zero when it starts; Prometheus handles the
+resets, but a load-balanced scrape sees one worker at a time.
+"""
+
+import bisect
+import threading
+from contextvars import ContextVar
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+UNRESOLVED = '<unresolved>'
+
+
+class RequestStats:
+	"""Figures collected while one request is served."""
+	__slots__ = (
+		'queries', 'query_time', 'template_time', 'template_depth',
+		'cache_calls', 'cache_time', 'serializer_time', 'serializer_depth', 'slow_queries',
+	)
+
+	def __init__(self):
+		self.queries = 0
+		self.query_time = 0.0
+		self.template_time = 0.0
+		self.template_depth = 0  # Nested renders (e.g. form widgets) are part of the outer one
+		self.cache_calls = 0
+		self.cache_time = 0.0
+		self.serializer_time = 0.0
+		self.serializer_depth = 0  # Nested serializers are part of the outer one
+		self.slow_queries = []  # See monitoring/slow_queries.py
+
+
+current_stats = ContextVar('monitoring_request_stats', default=None)
+
+
+class Histogram:
+	"""Fixed-bucket histogram; each observation lands in the first bucket it fits."""
+	__slots__ = ('buckets', 'counts', 'sum', 'count')
+
+	def __init__(self, buckets):
+		self.buckets = buckets
+		self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+		self.sum = 0.0
+		self.count = 0
+
+	def observe(self, value):
+		self.counts[bisect.bisect_left(self.buckets, value)] += 1
+		self.sum += value
+		self.count += 1
+
+	def copy(self):
+		other = Histogram(self.buckets)
+		other.counts = list(self.counts)
+		other.sum = self.sum
+		other.count = self.count
+		return other
+
+
+class ViewMetrics:
+	"""Aggregates for one view."""
+	__slots__ = ('requests', 'latency', 'queries', 'query_time', 'template_time')
+
+	def __init__(self):
+		self.requests = {}  # (method, status class) -> count
+		self.latency = Histogram(LATENCY_BUCKETS)
+		self.queries = Histogram(QUERY_COUNT_BUCKETS)
+		self.query_time = 0.0
+		self.template_time = 0.0
+
+	def copy(self):
+		other = ViewMetrics()
+		other.requests = dict(self.requests)
+		other.latency = self.latency.copy()
+		other.queries = self.queries.copy()
+		other.query_time = self.query_time
+		other.template_time = self.template_time
+		return other
+
+
+class MetricsRegistry:
+	"""Thread-safe per-view aggregates of the current process."""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._views = {}
+
+	def record(self, view, method, status, duration, stats):
+		"""Fold one finished request into the aggregates of ``view``."""
+		method = method if method in METHODS else 'other'
+		status_class = f'{status // 100}xx'
+		with self._lock:
+			metrics = self._views.get(view)
+			if metrics is None:
+				metrics = self._views[view] = ViewMetrics()
+			key = (method, status_class)
+			metrics.requests[key] = metrics.requests.get(key, 0) + 1
+			metrics.latency.observe(duration)
+			metrics.queries.observe(stats.queries)
+			metrics.query_time += stats.query_time
+			metrics.template_time += stats.template_time
+
+	def snapshot(self):
+		"""A consistent copy of the aggregates, as {view: ViewMetrics}."""
+		with self._lock:
+			return {view: metrics.copy() for view, metrics in self._views.items()}
+
+	def reset(self):
+		with self._lock:
+			self._views.clear()
+
+	def export(self):
+		"""The aggregates in Prometheus text exposition format."""
+		views = sorted(self.snapshot().items())
+		lines = []
+
+		def header(name, metric_type, help_text):
+			lines.append(f'# HELP {name} {help_text}')
+			lines.append(f'# TYPE {name} {metric_type}')
+
+		def histogram(name, view, hist):
+			cumulative = 0
+			for bound, count in zip(hist.buckets + ('+Inf',), hist.counts):
+				cumulative += count
+				lines.append(f'{name}_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+			lines.append(f'{name}_sum{{view="{view}"}} {hist.sum}')
+			lines.append(f'{name}_count{{view="{view}"}} {hist.count}')
+
+		header('django_http_requests_total', 'counter', 'Requests served, by view, method and status class.')
+		for view, metrics in views:
+			for (method, status_class), count in sorted(metrics.requests.items()):
+				lines.append(
+					f'django_http_requests_total{{view="{_escape(view)}",method="{method}",'
+					f'status="{status_class}"}} {count}'
+				)
+
+		header('django_http_request_duration_seconds', 'histogram', 'Time to produce the response, by view.')
+		for view, metrics in views:
+			histogram('django_http_request_duration_seconds', _escape(view), metrics.latency)
+
+		header('django_db_queries_per_request', 'histogram', 'Database queries per request, by view.')
+		for view, metrics in views:
+			histogram('django_db_queries_per_request', _escape(view), metrics.queries)
+
+		header('django_db_query_duration_seconds_total', 'counter', 'Time spent in database queries, by view.')
+		for view, metrics in views:
+			lines.append(f'django_db_query_duration_seconds_total{{view="{_escape(view)}"}} {metrics.query_time}')
+
+		header(
+			'django_template_render_duration_seconds_total', 'counter',
+			'Time spent rendering templates (including queries they run), by view.',
+		)
+		for view, metrics in views:
+			lines.append(
+				f'django_template_render_duration_seconds_total{{view="{_escape(view)}"}} {metrics.template_time}'
+			)
+		return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+	return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,147 @@
+"""
+monitoring/middleware.py
+
+Measures every request for the per-view metrics of monitoring/metrics.py
+and the slow-query log, reports the measurements in a Server-Timing header,
+and profiles the requests that ask for it.
+"""
+
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from DjangoQandAPlatform.tasks import run_in_background
+from .metrics import UNRESOLVED, RequestStats, current_stats, registry
+from .models import RequestProfile
+from .profiling import SamplingProfiler, profile_trigger
+from .slow_queries import query_origin, record_slow_queries, threshold as slow_query_threshold
+
+
+def instrument_query(execute, sql, params, many, context):
+	"""
+	connection.execute_wrapper counting queries and their time for the
+	current request, and noting the slow ones.
+	"""
+	stats = current_stats.get()
+	if stats is None:
+		return execute(sql, params, many, context)
+	start = time.perf_counter()
+	try:
+		return execute(sql, params, many, context)
+	finally:
+		duration = time.perf_counter() - start
+		stats.queries += 1
+		stats.query_time += duration
+		if duration >= slow_query_threshold():
+			stats.slow_queries.append((context['connection'].alias, sql, params, many, duration, query_origin()))
+
+
+class MetricsMiddleware:
+	"""
+	Records latency, query count, query time and template time of each request
+	under the URL name of the view that served it, and logs its slow queries.
+
+	Place it early, right after WhiteNoiseMiddleware, so the timing covers the
+	other middleware but static files stay out of the metrics.
+	"""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		stats = RequestStats()
+		token = current_stats.set(stats)
+		start = time.perf_counter()
+		try:
+			with ExitStack() as stack:
+				for connection in connections.all():
+					stack.enter_context(connection.execute_wrapper(instrument_query))
+				response = self.get_response(request)
+		finally:
+			current_stats.reset(token)
+		duration = time.perf_counter() - start
+
+		match = getattr(request, 'resolver_match', None)
+		view = (match.view_name if match else None) or UNRESOLVED
+		registry.record(view, request.method, response.status_code, duration, stats)
+		if stats.slow_queries:
+			# EXPLAIN and the upserts stay off the response path.
+			run_in_background(record_slow_queries, stats.slow_queries, view)
+		return response
+
+
+class ProfilingMiddleware:
+	"""
+	Profiles the requests that opt in (see monitoring/profiling.py) and stores
+	a RequestProfile for each; staff and header-triggered responses name it
+	in an X-Request-Profile header.
+
+	Place it right after AuthenticationMiddleware, which it needs for the
+	staff check; the profile covers everything from there on.
+	"""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		trigger = profile_trigger(request)
+		if trigger is None:
+			return self.get_response(request)
+
+		with SamplingProfiler() as profiler:
+			response = self.get_response(request)
+		match = getattr(request, 'resolver_match', None)
+		profile = RequestProfile.objects.create(
+			method=request.method,
+			path=request.get_full_path()[:500],
+			view_name=(match.view_name if match else '')[:200],
+			status_code=response.status_code,
+			user=request.user if request.user.is_authenticated else None,
+			trigger=trigger,
+			duration=profiler.duration,
+			interval=profiler.interval,
+			samples=profiler.samples,
+			collapsed=profiler.collapsed(),
+		)
+		if trigger != RequestProfile.SAMPLED:
+			response['X-Request-Profile'] = str(profile.pk)
+		return response
+
+
+class ServerTimingMiddleware:
+	"""
+	Adds a Server-Timing header, shown by browser devtools, breaking the
+	response time down into database, cache, and serializer (DRF views) or
+	template (HTML views) time. Enabled for everyone with the SERVER_TIMING
+	setting, and always for staff users.
+
+	Place it right after AuthenticationMiddleware, inside MetricsMiddleware,
+	whose per-request stats it reports; ``total`` is timed from here.
+	"""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		start = time.perf_counter()
+		response = self.get_response(request)
+		total = time.perf_counter() - start
+		if getattr(settings, 'SERVER_TIMING', False) or request.user.is_staff:
+			response['Server-Timing'] = server_timing(current_stats.get(), total, hasattr(response, 'accepted_renderer'))
+		return response
+
+
+def server_timing(stats, total, api):
+	"""The Server-Timing header value; ``api`` tells DRF responses from HTML ones."""
+	metrics = []
+	if stats is not None:
+		metrics.append(('db', stats.query_time, f'{stats.queries} queries'))
+		metrics.append(('cache', stats.cache_time, f'{stats.cache_calls} calls'))
+		if api:
+			metrics.append(('serializer', stats.serializer_time, 'DRF serialization'))
+		else:
+			metrics.append(('template', stats.template_time, 'Template rendering'))
+	metrics.append(('total', total, 'Total'))
+	return ', '.join(f'{name};dur={seconds * 1000:.1f};desc="{desc}"' for name, seconds, desc in metrics)
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=500)),
+                ('view_name', models.CharField(blank=True, db_index=True, help_text='URL name of the view.', max_length=200)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('trigger', models.CharField(choices=[('staff', 'Staff query flag'), ('header', 'Signed header'), ('sampled', 'Sampled')], max_length=10)),
+                ('duration', models.FloatField(help_text='Time profiled, in seconds.')),
+                ('interval', models.FloatField(help_text='Seconds between samples.')),
+                ('samples', models.PositiveIntegerField()),
+                ('collapsed', models.TextField(help_text="One 'frame;frame;... count' line per sampled stack, root first.")),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(help_text='SHA-1 of the normalised statement.', max_length=40, unique=True)),
+                ('sql', models.TextField(help_text='The statement with literals and parameters replaced by ?.')),
+                ('count', models.PositiveIntegerField(help_text='Slow executions seen.')),
+                ('total_time', models.FloatField(help_text='Total time of the slow executions, in seconds.')),
+                ('max_time', models.FloatField(help_text='Slowest execution, in seconds.')),
+                ('view_name', models.CharField(blank=True, help_text='URL name of the last view that ran it slowly.', max_length=200)),
+                ('origin', models.CharField(blank=True, help_text='Application code that last issued it slowly.', max_length=500)),
+                ('plan', models.TextField(blank=True, help_text='EXPLAIN output captured when the statement was first seen.')),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name_plural': 'slow queries',
+                'ordering': ['-total_time'],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+"""
+monitoring/models.py
+
+Stored request profiles (see monitoring/profiling.py) and the slow-query
+log (see monitoring/slow_queries.py).
+"""
+
+from django.conf import settings
+from django.db import models
+
+
+class RequestProfile(models.Model):
+	"""The sampled stacks of one profiled request, in collapsed-stack format."""
+	STAFF = 'staff'
+	SIGNED_HEADER = 'header'
+	SAMPLED = 'sampled'
+	TRIGGER_CHOICES = [
+		(STAFF, 'Staff query flag'),
+		(SIGNED_HEADER, 'Signed header'),
+		(SAMPLED, 'Sampled'),
+	]
+
+	method = models.CharField(max_length=10)
+	path = models.CharField(max_length=500)
+	view_name = models.CharField(max_length=200, blank=True, db_index=True, help_text="URL name of the view.")
+	status_code = models.PositiveSmallIntegerField()
+	user = models.ForeignKey(
+		settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name='+',
+	)
+	trigger = models.CharField(max_length=10, choices=TRIGGER_CHOICES)
+	duration = models.FloatField(help_text="Time profiled, in seconds.")
+	interval = models.FloatField(help_text="Seconds between samples.")
+	samples = models.PositiveIntegerField()
+	collapsed = models.TextField(help_text="One 'frame;frame;... count' line per sampled stack, root first.")
+	created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+	class Meta:
+		ordering = ['-created_at']
+
+	def __str__(self):
+		return f'{self.method} {self.path} ({self.duration * 1000:.0f} ms)'
+
+
+class SlowQuery(models.Model):
+	"""
+	Aggregates of the slow executions of one normalised SQL statement (see
+	monitoring/slow_queries.py).
+	"""
+	fingerprint = models.CharField(max_length=40, unique=True, help_text="SHA-1 of the normalised statement.")
+	sql = models.TextField(help_text="The statement with literals and parameters replaced by ?.")
+	count = models.PositiveIntegerField(help_text="Slow executions seen.")
+	total_time = models.FloatField(help_text="Total time of the slow executions, in seconds.")
+	max_time = models.FloatField(help_text="Slowest execution, in seconds.")
+	view_name = models.CharField(max_length=200, blank=True, help_text="URL name of the last view that ran it slowly.")
+	origin = models.CharField(max_length=500, blank=True, help_text="Application code that last issued it slowly.")
+	plan = models.TextField(blank=True, help_text="EXPLAIN output captured when the statement was first seen.")
+	first_seen = models.DateTimeField(auto_now_add=True)
+	last_seen = models.DateTimeField(db_index=True)
+
+	class Meta:
+		ordering = ['-total_time']
+		verbose_name_plural = 'slow queries'
+
+	def __str__(self):
+		return f'{self.sql[:80]} ({self.count}×)'
@@ -0,0 +1,166 @@
+"""
+monitoring/profiling.py
+
+Opt-in sampling profiler for single requests.
+
+While a request is profiled, a helper thread wakes every PROFILE_INTERVAL
+seconds, reads the request thread's current stack from sys._current_frames()
+and counts it. Sampling rather than tracing keeps the cost independent of the
+number of function calls, so the timings stay close to the unprofiled ones.
+The counts are stored in collapsed-stack format, one ``frame;frame;... count``
+line per distinct stack (root first), as read by flamegraph.pl, speedscope
+and most flame graph viewers.
+
+A request is profiled when one of these holds (see ProfilingMiddleware):
+
+	staff     a staff user adds ``?_profile=1`` to the URL
+	header    the request carries a valid X-Profile-Token header, made by
+	          the profile_token command (works for anyone, e.g. curl)
+	sampled   a random draw below PROFILE_SAMPLE_RATE (0 by default), for
+	          background profiling of a small fraction of traffic
+
+Other requests pay for those checks only: no thread, no stack walks.
+"""
+
+import functools
+import os
+import random
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core import signing
+
+from .models import RequestProfile
+
+QUERY_FLAG = '_profile'
+HEADER = 'X-Profile-Token'
+TOKEN_SALT = 'monitoring.profile'
+DEFAULT_INTERVAL = 0.005
+DEFAULT_TOKEN_MAX_AGE = 24 * 3600
+MAX_DEPTH = 128
+FRAME_LABEL_CACHE_SIZE = 4096
+
+_PATH_PREFIXES = sorted(
+	{os.path.join(os.path.abspath(entry), '') for entry in sys.path if entry},
+	key=len, reverse=True,
+)
+
+
+def make_profile_token():
+	"""A value for the X-Profile-Token header, valid for PROFILE_TOKEN_MAX_AGE seconds."""
+	return signing.dumps('profile', salt=TOKEN_SALT)
+
+
+def has_profile_token(request):
+	token = request.headers.get(HEADER)
+	if not token:
+		return False
+	try:
+		signing.loads(
+			token, salt=TOKEN_SALT,
+			max_age=getattr(settings, 'PROFILE_TOKEN_MAX_AGE', DEFAULT_TOKEN_MAX_AGE),
+		)
+	except signing.BadSignature:
+		return False
+	return True
+
+
+def profile_trigger(request):
+	"""Why ``request`` should be profiled (a RequestProfile trigger), or None."""
+	if QUERY_FLAG in request.GET and request.user.is_staff:
+		return RequestProfile.STAFF
+	if HEADER in request.headers and has_profile_token(request):
+		return RequestProfile.SIGNED_HEADER
+	rate = getattr(settings, 'PROFILE_SAMPLE_RATE', 0)
+	if rate and random.random() < rate:
+		return RequestProfile.SAMPLED
+	return None
+
+
+@functools.lru_cache(maxsize=FRAME_LABEL_CACHE_SIZE)
+def frame_label(code):
+	"""``function (module/path.py:line)`` for a code object; the most recently used labels are cached."""
+	filename = code.co_filename
+	for prefix in _PATH_PREFIXES:
+		if filename.startswith(prefix):
+			filename = filename[len(prefix):]
+			break
+	# ';' separates frames and ' ' the count in the collapsed format.
+	return f'{code.co_qualname} ({filename}:{code.co_firstlineno})'.replace(';', ':')
+
+
+class SamplingProfiler:
+	"""
+	Samples the stack of the thread that creates it, as a context manager:
+
+		with SamplingProfiler() as profiler:
+			...
+		profiler.collapsed()
+	"""
+
+	def __init__(self, interval=None):
+		self.interval = interval or getattr(settings, 'PROFILE_INTERVAL', DEFAULT_INTERVAL)
+		self.thread_id = threading.get_ident()
+		self.stacks = {}  # Tuple of code objects, root first -> samples
+		self.samples = 0
+		self.duration = 0.0
+		self._stop = threading.Event()
+		self._thread = None
+
+	def __enter__(self):
+		self._started = time.perf_counter()
+		self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+		self._thread.start()
+		return self
+
+	def __exit__(self, *exc_info):
+		self._stop.set()
+		self._thread.join()
+		self.duration = time.perf_counter() - self._started
+
+	def _run(self):
+		while not self._stop.wait(self.interval):
+			frame = sys._current_frames().get(self.thread_id)
+			if frame is None:
+				break
+			stack = []
+			while frame is not None and len(stack) < MAX_DEPTH:
+				stack.append(frame.f_code)
+				frame = frame.f_back
+			del frame
+			key = tuple(reversed(stack))
+			self.stacks[key] = self.stacks.get(key, 0) + 1
+			self.samples += 1
+
+	def collapsed(self):
+		"""The samples in collapsed-stack format, heaviest stacks first."""
+		lines = [
+			f"{';'.join(frame_label(code) for code in stack)} {count}"
+			for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1])
+		]
+		return '\n'.join(lines) + '\n' if lines else ''
+
+
+def parse_collapsed(text):
+	"""Yield (frames, count) from collapsed-stack text."""
+	for line in text.splitlines():
+		stack, _, count = line.rpartition(' ')
+		if stack and count.isdigit():
+			yield stack.split(';'), int(count)
+
+
+def hot_frames(text, limit=20):
+	"""
+	The ``limit`` frames with the most samples, as (label, self samples,
+	total samples) tuples: self counts samples where the frame was running,
+	total those where it was anywhere on the stack.
+	"""
+	own, total = {}, {}
+	for frames, count in parse_collapsed(text):
+		own[frames[-1]] = own.get(frames[-1], 0) + count
+		for label in set(frames):
+			total[label] = total.get(label, 0) + count
+	ranked = sorted(total, key=lambda label: (-own.get(label, 0), -total[label]))
+	return [(label, own.get(label, 0), total[label]) for label in ranked[:limit]]
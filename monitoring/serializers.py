@@ -0,0 +1,30 @@
+"""
+monitoring/serializers.py
+
+Serializer mixin timing DRF serialization for the Server-Timing header (see
+ServerTimingMiddleware).
+"""
+
+import time
+
+from .metrics import current_stats
+
+
+class InstrumentedSerializerMixin:
+	"""
+	Adds the time of each outermost to_representation() to the current
+	request's stats. With many=True that is one call per item, so fetching
+	the queryset is left to the database timing.
+	"""
+
+	def to_representation(self, instance):
+		stats = current_stats.get()
+		if stats is None or stats.serializer_depth:
+			return super().to_representation(instance)
+		stats.serializer_depth += 1
+		start = time.perf_counter()
+		try:
+			return super().to_representation(instance)
+		finally:
+			stats.serializer_depth -= 1
+			stats.serializer_time += time.perf_counter() - start
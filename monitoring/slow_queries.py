@@ -0,0 +1,133 @@
+"""
+monitoring/slow_queries.py
+
+Slow-query log. instrument_query (monitoring/middleware.py) notes every
+statement that takes longer than SLOW_QUERY_THRESHOLD_MS during a request,
+with the application code that issued it. When the response is ready,
+MetricsMiddleware hands them to record_slow_queries() in the background
+(DjangoQandAPlatform/tasks.py), which folds each into
+the SlowQuery row of its fingerprint: the statement with literals, parameter
+placeholders and IN lists normalised, so that the same query with other
+values lands in the same row. The first time a fingerprint is seen, its plan
+is captured with EXPLAIN (without ANALYZE, so the statement is not run
+again) using the original parameters, which are not stored.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sys
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.template.base import Template
+from django.utils import timezone
+
+from .models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD_MS = 200
+EXPLAINABLE = ('SELECT', 'WITH')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w."])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACE = re.compile(r'\s+')
+
+_APP_ROOT = os.path.join(str(settings.BASE_DIR), '')
+_SKIP_PATHS = (os.path.join(_APP_ROOT, 'monitoring', ''), f'{os.sep}site-packages{os.sep}')
+_TEMPLATE_MODULE = os.path.join('django', 'template', 'base.py')
+
+
+def threshold():
+	"""The slow-query threshold in seconds."""
+	return getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', DEFAULT_THRESHOLD_MS) / 1000
+
+
+def normalize_sql(sql):
+	"""``sql`` with literals and placeholders as ?, IN lists as (...), and single spaces."""
+	sql = _STRING.sub('?', sql)
+	sql = _NUMBER.sub('?', sql)
+	sql = _PLACEHOLDER.sub('?', sql)
+	sql = _LIST.sub('(...)', sql)
+	return _SPACE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized):
+	return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def query_origin():
+	"""
+	``path:line in function`` of the innermost application frame on the
+	stack, followed by the template being rendered when the query comes from
+	one (a queryset evaluated in a template has no application frame of its own).
+	"""
+	frame = sys._getframe(1)
+	template = None
+	while frame is not None:
+		code = frame.f_code
+		if template is None and code.co_name == 'render' and code.co_filename.endswith(_TEMPLATE_MODULE):
+			renderer = frame.f_locals.get('self')
+			if isinstance(renderer, Template):
+				template = renderer.name
+		if code.co_filename.startswith(_APP_ROOT) and not code.co_filename.startswith(_SKIP_PATHS):
+			origin = f'{code.co_filename[len(_APP_ROOT):]}:{frame.f_lineno} in {code.co_name}'
+			return f'{origin} (rendering {template})' if template else origin
+		frame = frame.f_back
+	return f'rendering {template}' if template else ''
+
+
+def explain(alias, sql, params):
+	"""The plan of ``sql`` on database ``alias`` without running it, or '' if it cannot be explained."""
+	if not sql.lstrip().upper().startswith(EXPLAINABLE):
+		return ''
+	connection = connections[alias]
+	try:
+		prefix = connection.ops.explain_query_prefix(analyze=False)
+	except ValueError:  # Backends without EXPLAIN options
+		prefix = connection.ops.explain_query_prefix()
+	try:
+		with transaction.atomic(using=alias), connection.cursor() as cursor:
+			cursor.execute(f'{prefix} {sql}', params)
+			return '\n'.join(' '.join(str(value) for value in row) for row in cursor.fetchall())
+	except Exception:
+		logger.warning("Could not explain slow query %s", sql[:200], exc_info=True)
+		return ''
+
+
+def _occurrence(seconds, view, origin, now):
+	"""Update expressions adding one occurrence to an existing SlowQuery row."""
+	return {
+		'count': F('count') + 1,
+		'total_time': F('total_time') + seconds,
+		'max_time': Greatest('max_time', seconds),
+		'view_name': view,
+		'origin': origin,
+		'last_seen': now,
+	}
+
+
+def record_slow_queries(slow_queries, view):
+	"""Fold (alias, sql, params, many, seconds, origin) tuples noted during a request into SlowQuery rows."""
+	now = timezone.now()
+	for alias, sql, params, many, seconds, origin in slow_queries:
+		normalized = normalize_sql(sql)
+		key = fingerprint(normalized)
+		occurrence = _occurrence(seconds, view, origin, now)
+		if SlowQuery.objects.filter(fingerprint=key).update(**occurrence):
+			continue
+		try:
+			with transaction.atomic():
+				SlowQuery.objects.create(
+					fingerprint=key, sql=normalized, count=1, total_time=seconds, max_time=seconds,
+					view_name=view, origin=origin, last_seen=now,
+					plan='' if many else explain(alias, sql, params),
+				)
+		except IntegrityError:  # Another request saw it first
+			SlowQuery.objects.filter(fingerprint=key).update(**occurrence)
@@ -0,0 +1,43 @@
+"""
+monitoring/templates.py
+
+Django template backend that times template rendering for the per-view
+metrics of monitoring/metrics.py. Use it as the TEMPLATES BACKEND (keeping
+NAME "django"); it otherwise behaves exactly like DjangoTemplates.
+"""
+
+import time
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from .metrics import current_stats
+
+
+class InstrumentedTemplate(Template):
+	"""Adds the time of each outermost render to the current request's stats."""
+
+	def render(self, context=None, request=None):
+		stats = current_stats.get()
+		if stats is None or stats.template_depth:
+			return super().render(context, request)
+		stats.template_depth += 1
+		start = time.perf_counter()
+		try:
+			return super().render(context, request)
+		finally:
+			stats.template_depth -= 1
+			stats.template_time += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+	"""DjangoTemplates returning InstrumentedTemplate instances."""
+
+	def from_string(self, template_code):
+		return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+	def get_template(self, template_name):
+		try:
+			return InstrumentedTemplate(self.engine.get_template(template_name), self)
+		except TemplateDoesNotExist as exc:
+			reraise(exc, self)
@@ -0,0 +1,347 @@
+"""
+monitoring/tests.py
+
+Tests for per-view request metrics, the /metrics endpoint, Server-Timing,
+the slow-query log, request profiling, the load-test harness and the microbenchmarks.
+"""
+
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from django.test import LiveServerTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from answers.models import Answer
+from comments.models import Comment
+from questions.models import Question
+from .benchmarks import Result, compare
+from .loadtest import Recorder, percentile, run_load_test
+from .metrics import QUERY_COUNT_BUCKETS, Histogram, RequestStats, current_stats, registry
+from .models import RequestProfile, SlowQuery
+from .profiling import SamplingProfiler, hot_frames, make_profile_token
+from .slow_queries import fingerprint, normalize_sql, record_slow_queries
+
+User = get_user_model()
+
+
+class MetricsTest(TestCase):
+	"""
+	Tests for metrics recording and export.
+	"""
+
+	def setUp(self):
+		cache.clear()
+		registry.reset()
+		self.user = User.objects.create_user(username='watcher', email='watcher@example.com', password='1234')
+		Question.objects.create(title='Measured', body='Body', author=self.user)
+
+	def test_request_recorded_under_url_name(self):
+		self.client.get(reverse('questions-list'))
+		self.client.get(reverse('questions-list'))
+		metrics = registry.snapshot()['questions-list']
+		self.assertEqual(metrics.requests, {('GET', '2xx'): 2})
+		self.assertEqual(metrics.latency.count, 2)
+		self.assertGreater(metrics.queries.sum, 0)
+		self.assertGreater(metrics.query_time, 0)
+		self.assertGreater(metrics.template_time, 0)
+
+	def test_unresolved_paths_share_one_label(self):
+		self.client.get('/no/such/page/')
+		self.client.get('/another/missing/page/')
+		self.assertEqual(registry.snapshot()['<unresolved>'].requests, {('GET', '4xx'): 2})
+
+	def test_histogram_buckets_are_inclusive(self):
+		hist = Histogram(QUERY_COUNT_BUCKETS)
+		for value in (0, 1, 3, 1000):
+			hist.observe(value)
+		self.assertEqual(hist.counts[:4], [1, 1, 0, 1])
+		self.assertEqual(hist.counts[-1], 1)
+
+	def test_metrics_endpoint_is_staff_only(self):
+		self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+		self.client.force_login(self.user)
+		self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+		staff = User.objects.create_user(username='ops', email='ops@example.com', password='1234', is_staff=True)
+		self.client.force_login(staff)
+		self.client.get(reverse('questions-list'))
+		resp = self.client.get(reverse('metrics'))
+		self.assertEqual(resp.status_code, 200)
+		self.assertTrue(resp['Content-Type'].startswith('text/plain; version=0.0.4'))
+		body = resp.content.decode()
+		self.assertIn('# TYPE django_http_request_duration_seconds histogram', body)
+		self.assertIn('django_http_requests_total{view="questions-list",method="GET",status="2xx"} 1', body)
+		self.assertIn('django_db_queries_per_request_bucket{view="questions-list",le="+Inf"} 1', body)
+
+	@override_settings(METRICS_TOKEN='s3cret')
+	def test_metrics_endpoint_accepts_token(self):
+		resp = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3cret')
+		self.assertEqual(resp.status_code, 200)
+		resp = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong')
+		self.assertEqual(resp.status_code, 403)
+
+
+class ServerTimingTest(TestCase):
+	"""
+	Tests for the Server-Timing header and the instrumented cache.
+	"""
+
+	def setUp(self):
+		cache.clear()
+		self.staff = User.objects.create_user(username='ops', email='ops@example.com', password='1234', is_staff=True)
+		Question.objects.create(title='Timed', body='Body', author=self.staff)
+
+	def timings(self, response):
+		return {
+			metric.split(';')[0]: metric for metric in response['Server-Timing'].split(', ')
+		}
+
+	def test_off_for_visitors_by_default(self):
+		self.assertNotIn('Server-Timing', self.client.get(reverse('questions-list')))
+
+	def test_html_view_breakdown_for_staff(self):
+		self.client.force_login(self.staff)
+		timings = self.timings(self.client.get(reverse('questions-list')))
+		self.assertEqual(set(timings), {'db', 'cache', 'template', 'total'})
+		self.assertRegex(timings['db'], r'^db;dur=\d+\.\d;desc="[1-9]\d* queries"$')
+
+	@override_settings(SERVER_TIMING=True)
+	def test_api_view_breakdown_when_enabled(self):
+		timings = self.timings(self.client.get(reverse('tag-catalogue-api')))
+		self.assertEqual(set(timings), {'db', 'cache', 'serializer', 'total'})
+		self.assertIn('desc="1 calls"', timings['cache'])  # The tag catalogue
+
+	def test_cache_calls_are_counted(self):
+		stats = RequestStats()
+		token = current_stats.set(stats)
+		try:
+			cache.set('key', 1)
+			cache.get_many(['key', 'other'])
+			self.assertEqual(cache.get('key'), 1)
+		finally:
+			current_stats.reset(token)
+		self.assertEqual(stats.cache_calls, 3)
+		self.assertGreater(stats.cache_time, 0)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class SlowQueryTest(TestCase):
+	"""
+	Tests for the slow-query log.
+	"""
+
+	def setUp(self):
+		cache.clear()
+		self.user = User.objects.create_user(username='writer', email='writer@example.com', password='1234')
+		self.question = Question.objects.create(title='Slow', body='Body', author=self.user)
+
+	def test_normalize_sql(self):
+		self.assertEqual(
+			normalize_sql('''SELECT "t1"."id" FROM "t1"  WHERE ("t1"."id" IN (%s, %s, %s) AND "t1"."name" = 'x')
+			LIMIT 20 OFFSET 40'''),
+			'SELECT "t1"."id" FROM "t1" WHERE ("t1"."id" IN (...) AND "t1"."name" = ?) LIMIT ? OFFSET ?',
+		)
+		self.assertEqual(normalize_sql('SELECT 1 WHERE a IN (%s)'), normalize_sql('SELECT 2 WHERE a IN (%s, %s)'))
+
+	def test_default_threshold_ignores_fast_queries(self):
+		self.get(reverse('question_details', args=(self.question.pk,)))
+		self.assertFalse(SlowQuery.objects.exists())
+
+	def get(self, url):
+		with self.captureOnCommitCallbacks(execute=True):
+			return self.client.get(url)
+
+	@override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+	def test_slow_queries_aggregated_with_plan(self):
+		url = reverse('question_details', args=(self.question.pk,))
+		self.get(url)
+		query = SlowQuery.objects.get(origin__startswith='questions/views.py:', origin__endswith=' in get_object')
+		self.assertEqual((query.count, query.view_name), (1, 'question_details'))
+		self.assertTrue(query.sql.startswith('SELECT "questions_question"."id"'))
+		self.assertTrue(query.plan)
+		self.assertTrue(SlowQuery.objects.filter(
+			sql__contains='"answers_answer"', origin__endswith='(rendering questions/question_details.html)',
+		).exists())
+
+		self.get(url)
+		query.refresh_from_db()
+		self.assertEqual(query.count, 2)
+		self.assertGreaterEqual(query.total_time, query.max_time)
+
+	@override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+	def test_admin_lists_slow_queries(self):
+		staff = User.objects.create_superuser(username='ops', email='ops@example.com', password='1234')
+		self.client.force_login(staff)
+		self.get(reverse('questions-list'))
+		resp = self.client.get(reverse('admin:monitoring_slowquery_changelist'))
+		self.assertContains(resp, 'questions_question')
+		query = SlowQuery.objects.exclude(plan='').first()
+		resp = self.client.get(reverse('admin:monitoring_slowquery_change', args=(query.pk,)))
+		self.assertContains(resp, '<pre>')
+
+	def test_concurrent_first_sighting_is_folded_in(self):
+		key = fingerprint(normalize_sql('SELECT 1'))
+		SlowQuery.objects.create(
+			fingerprint=key, sql='SELECT ?', count=1, total_time=0.1, max_time=0.1, last_seen=timezone.now(),
+		)
+		# The row is inserted by another request between the update and the create.
+		unseen = mock.Mock(**{'update.return_value': 0})
+		with mock.patch.object(SlowQuery.objects, 'filter', side_effect=[unseen, SlowQuery.objects.filter(fingerprint=key)]):
+			record_slow_queries([('default', 'SELECT 1', (), False, 0.5, 'app.py:1 in f')], 'home')
+		query = SlowQuery.objects.get(fingerprint=key)
+		self.assertEqual((query.count, query.max_time, query.view_name), (2, 0.5, 'home'))
+
+
+def spin(seconds):
+	deadline = time.perf_counter() + seconds
+	while time.perf_counter() < deadline:
+		pass
+
+
+class ProfilingTest(TestCase):
+	"""
+	Tests for the sampling profiler, its triggers and the profile admin.
+	"""
+
+	def setUp(self):
+		cache.clear()
+		self.user = User.objects.create_user(username='visitor', email='visitor@example.com', password='1234')
+		self.staff = User.objects.create_superuser(username='ops', email='ops@example.com', password='1234')
+		self.url = reverse('questions-list')
+
+	def test_profiler_samples_running_code(self):
+		with SamplingProfiler(interval=0.001) as profiler:
+			spin(0.1)
+		self.assertGreater(profiler.samples, 10)
+		collapsed = profiler.collapsed()
+		self.assertIn('spin (monitoring/tests.py:', collapsed)
+		label, own, total = hot_frames(collapsed, limit=1)[0]
+		self.assertTrue(label.startswith('spin '))
+		self.assertEqual(sum(int(line.rpartition(' ')[2]) for line in collapsed.splitlines()), profiler.samples)
+
+	def test_requests_are_not_profiled_by_default(self):
+		self.client.force_login(self.user)
+		resp = self.client.get(self.url, {'_profile': 1})
+		self.assertNotIn('X-Request-Profile', resp)
+		self.client.get(self.url, HTTP_X_PROFILE_TOKEN='forged')
+		self.assertFalse(RequestProfile.objects.exists())
+
+	def test_staff_query_flag(self):
+		self.client.force_login(self.staff)
+		resp = self.client.get(self.url, {'_profile': 1})
+		profile = RequestProfile.objects.get()
+		self.assertEqual(resp['X-Request-Profile'], str(profile.pk))
+		self.assertEqual(
+			(profile.trigger, profile.view_name, profile.status_code, profile.user),
+			(RequestProfile.STAFF, 'questions-list', 200, self.staff),
+		)
+
+	def test_signed_header(self):
+		resp = self.client.get(self.url, HTTP_X_PROFILE_TOKEN=make_profile_token())
+		profile = RequestProfile.objects.get()
+		self.assertEqual(resp['X-Request-Profile'], str(profile.pk))
+		self.assertEqual(profile.trigger, RequestProfile.SIGNED_HEADER)
+
+	@override_settings(PROFILE_SAMPLE_RATE=1.0)
+	def test_sample_rate(self):
+		resp = self.client.get(self.url)
+		self.assertNotIn('X-Request-Profile', resp)
+		self.assertEqual(RequestProfile.objects.get().trigger, RequestProfile.SAMPLED)
+
+	def test_admin_shows_and_downloads_profile(self):
+		profile = RequestProfile.objects.create(
+			method='GET', path='/questions/', status_code=200, trigger=RequestProfile.STAFF,
+			duration=0.2, interval=0.005, samples=40,
+			collapsed='main (a.py:1);view (b.py:2) 30\nmain (a.py:1);render (c.py:3) 10\n',
+		)
+		self.client.force_login(self.staff)
+		resp = self.client.get(reverse('admin:monitoring_requestprofile_change', args=(profile.pk,)))
+		self.assertContains(resp, '<td>30</td><td>30</td><td>view (b.py:2)</td>', html=False)
+		resp = self.client.get(reverse('admin:monitoring_requestprofile_collapsed', args=(profile.pk,)))
+		self.assertEqual(resp.content.decode(), profile.collapsed)
+		self.client.force_login(self.user)
+		resp = self.client.get(reverse('admin:monitoring_requestprofile_collapsed', args=(profile.pk,)))
+		self.assertEqual(resp.status_code, 302)
+
+
+# Test mirrors of replica aliases only apply to the test thread, so the live
+# server thread would read replicas from the non-test databases.
+@override_settings(DATABASE_REPLICAS=[])
+class LoadTestHarnessTest(LiveServerTestCase):
+	"""
+	Tests for the load-test harness, against a live test server.
+	"""
+
+	def test_percentiles_and_report(self):
+		self.assertEqual(percentile(list(range(1, 101)), 95), 95)
+		self.assertEqual(percentile([7], 99), 7)
+		self.assertIsNone(percentile([], 50))
+
+		recorder = Recorder()
+		for ms in range(1, 11):
+			recorder.record('page', ms / 1000, ok=ms != 10)
+		report = recorder.report(elapsed=2)
+		page = report['endpoints']['page']
+		self.assertEqual((page['requests'], page['errors'], page['error_rate']), (10, 1, 0.1))
+		self.assertEqual((page['p50_ms'], page['p99_ms'], page['throughput']), (5.0, 10.0, 5.0))
+
+	def test_scenarios_run_against_server(self):
+		user = User.objects.create_user(username='bench-0', email='bench-0@example.com', password='benchmark')
+		question = Question.objects.create(title='Loaded', body='Body', author=user)
+		# One run per scenario, so that each is certain to be played at least once.
+		reports = {
+			scenario: run_load_test(
+				self.live_server_url, {scenario: 1}, users=1, duration=0.5, think_time=0.01, accounts=1,
+			)
+			for scenario in ('browse', 'search', 'username', 'post')
+		}
+		endpoints = {scenario: set(report['endpoints']) for scenario, report in reports.items()}
+		self.assertLessEqual({'questions-list', 'question_details'}, endpoints['browse'])
+		self.assertEqual({'question-search-api'}, endpoints['search'])
+		self.assertEqual({'check-username'}, endpoints['username'])
+		self.assertLessEqual({'login', 'create-answer', 'add-comment'}, endpoints['post'])
+		for report in reports.values():
+			self.assertEqual(report['total']['errors'], 0)
+		self.assertIn('p99_ms', reports['browse']['endpoints']['questions-list'])
+		self.assertTrue(Answer.objects.filter(question=question).exists())
+		self.assertTrue(Comment.objects.filter(object_id=question.pk).exists())
+
+
+class BenchmarkTest(TestCase):
+	"""
+	Tests for the microbenchmark runner and baseline comparison.
+	"""
+
+	def test_compare_flags_slowdowns(self):
+		baseline = {'bench': {'median': 1.0}}
+		result = lambda median: Result('bench', 1, median, median, median, 0.0)
+		self.assertEqual(compare(result(1.05), baseline, 0.1), (1.05, 'ok'))
+		self.assertEqual(compare(result(1.5), baseline, 0.1)[1], 'regression')
+		self.assertEqual(compare(result(0.5), baseline, 0.1)[1], 'improvement')
+		self.assertEqual(compare(result(1.0), {}, 0.1), (None, 'new'))
+
+	def test_save_and_compare_baseline(self):
+		path = os.path.join(tempfile.mkdtemp(), 'baseline.json')
+		self.addCleanup(os.remove, path)
+		options = {'quick': True, 'repeat': 2, 'min_time': 0, 'warmup': 0, 'stdout': StringIO()}
+		call_command('run_benchmarks', 'serializer', 'root', save=path, **options)
+		with open(path) as f:
+			saved = json.load(f)['benchmarks']
+		self.assertEqual(set(saved), {'question_serializer[10]', 'get_root_question'})
+		self.assertFalse(Question.objects.exists())  # Fixtures rolled back
+
+		for entry in saved.values():
+			entry['median'] /= 1000
+		with open(path, 'w') as f:
+			json.dump({'benchmarks': saved}, f)
+		with self.assertRaisesMessage(CommandError, 'regression'):
+			call_command('run_benchmarks', 'root', baseline=path, **options)
@@ -0,0 +1,12 @@
+"""
+monitoring/urls.py
+
+Routing for the metrics endpoint.
+"""
+
+from django.urls import path
+from monitoring.views import metrics
+
+urlpatterns = [
+	path('metrics', metrics, name='metrics'),
+]
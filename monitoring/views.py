@@ -0,0 +1,31 @@
+"""
+monitoring/views.py
+
+Prometheus scrape endpoint for the per-view metrics.
+"""
+
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.cache import never_cache
+
+from .metrics import registry
+
+
+def has_metrics_token(request):
+	"""Whether the request carries ``Authorization: Bearer <METRICS_TOKEN>``."""
+	token = getattr(settings, 'METRICS_TOKEN', '')
+	scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+	return bool(token) and scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode())
+
+
+@never_cache
+def metrics(request):
+	"""
+	Metrics of this process in Prometheus text format. Open to staff users,
+	and to scrapers presenting the METRICS_TOKEN bearer token.
+	"""
+	if not (request.user.is_staff or has_metrics_token(request)):
+		return HttpResponseForbidden("Metrics are only available to staff.")
+	return HttpResponse(registry.export(), content_type='text/plain; version=0.0.4; charset=utf-8')
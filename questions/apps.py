@@ -10,3 +10,6 @@ class QuestionsConfig(AppConfig):
     """App configuration for questions."""
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'questions'
+
+    def ready(self):
+        import questions.signals  # noqa: F401
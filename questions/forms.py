@@ -6,6 +6,8 @@ Exposes title, tags, and body for both create and edit via BaseQuestionForm.
 """
 
 from django import forms
+
+from tags.forms import CatalogueTagField
 from .models import Question
 
 class BaseQuestionForm(forms.ModelForm):
@@ -13,6 +15,7 @@ class BaseQuestionForm(forms.ModelForm):
 	class Meta:
 		model = Question
 		fields = ['title', 'tags', 'body', 'media']
+		field_classes = {'tags': CatalogueTagField}
 
 class QuestionCreateForm(BaseQuestionForm):
 	"""Form for creating a question."""
@@ -0,0 +1,145 @@
+"""
+questions/hotness.py
+
+"Hot" ranking for questions.
+
+A question's hot score is its activity points (answers and comments, weighted)
+decayed exponentially by the question's age. Points are maintained
+incrementally by signal handlers when activity happens (see questions/signals.py),
+which also refresh that one question's score. The periodic decay_hot_scores
+command re-decays only recently active questions and zeroes the ones that went
+quiet, so listing by hotness is a plain indexed sort on Question.hot_score.
+
+Per-question updates invalidate the question's cached instance (see
+DjangoQandAPlatform/caching.py); the bulk decay does not, so a cached
+instance's hot_score may lag by up to MODEL_CACHE_TIMEOUT.
+"""
+
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from DjangoQandAPlatform.caching import invalidate
+from answers.models import Answer
+from comments.models import Comment
+from .models import Question
+
+BASE_POINTS = 1
+ANSWER_POINTS = 3
+COMMENT_POINTS = 1
+HALF_LIFE_HOURS = 24
+ACTIVE_WINDOW = timedelta(days=7)
+
+
+def hot_score(activity_points, created_at, now=None):
+	"""Score = (base + activity points) halved every HALF_LIFE_HOURS of question age."""
+	now = now or timezone.now()
+	age_hours = max((now - created_at).total_seconds(), 0) / 3600
+	return (BASE_POINTS + activity_points) * 0.5 ** (age_hours / HALF_LIFE_HOURS)
+
+
+def record_activity(question_id, points, now=None, touch=True):
+	"""
+	Add ``points`` (may be negative) to a question and refresh its hot score.
+	With ``touch`` the question's last_activity_at is moved to ``now``.
+	"""
+	now = now or timezone.now()
+	questions = Question.objects.filter(pk=question_id)
+	row = questions.values('created_at', 'activity_points').first()
+	if row is None:
+		return
+	updates = {
+		'activity_points': Greatest(F('activity_points') + points, Value(0)),
+		'hot_score': hot_score(max(row['activity_points'] + points, 0), row['created_at'], now),
+	}
+	if touch:
+		updates['last_activity_at'] = now
+	questions.update(**updates)
+	invalidate(Question, question_id)
+
+
+def count_activity_points(question_ids):
+	"""
+	Recount activity points from scratch for the given questions.
+	Returns {question_id: points}; used to backfill or repair drift.
+	"""
+	question_ids = list(question_ids)
+	points = dict.fromkeys(question_ids, 0)
+	question_ct = ContentType.objects.get_for_model(Question)
+	answer_ct = ContentType.objects.get_for_model(Answer)
+	comment_ct = ContentType.objects.get_for_model(Comment)
+
+	answer_question = dict(
+		Answer.objects.filter(question_id__in=question_ids).values_list('id', 'question_id')
+	)
+	for question_id in answer_question.values():
+		points[question_id] += ANSWER_POINTS
+
+	comment_question = {}
+	comments = Comment.objects.filter(
+		Q(content_type=question_ct, object_id__in=question_ids)
+		| Q(content_type=answer_ct, object_id__in=list(answer_question))
+	).values_list('id', 'content_type_id', 'object_id')
+	for comment_id, content_type_id, object_id in comments:
+		question_id = object_id if content_type_id == question_ct.id else answer_question[object_id]
+		comment_question[comment_id] = question_id
+		points[question_id] += COMMENT_POINTS
+
+	replies = Comment.objects.filter(
+		content_type=comment_ct, object_id__in=list(comment_question)
+	).values_list('object_id', flat=True)
+	for parent_id in replies:
+		points[comment_question[parent_id]] += COMMENT_POINTS
+	return points
+
+
+def recount_activity(question_id, now=None):
+	"""
+	Recount one question's activity points from scratch and refresh its score,
+	without touching last_activity_at.
+	"""
+	now = now or timezone.now()
+	questions = Question.objects.filter(pk=question_id)
+	created_at = questions.values_list('created_at', flat=True).first()
+	if created_at is None:
+		return
+	points = count_activity_points([question_id])[question_id]
+	questions.update(activity_points=points, hot_score=hot_score(points, created_at, now))
+	invalidate(Question, question_id)
+
+
+def decay_hot_scores(now=None, batch_size=1000):
+	"""
+	Re-decay the scores of questions active within ACTIVE_WINDOW and zero the
+	scores of questions that have been quiet for longer.
+	Returns (number re-scored, number zeroed).
+	"""
+	now = now or timezone.now()
+	cutoff = now - ACTIVE_WINDOW
+	zeroed = (
+		Question.objects
+		.filter(hot_score__gt=0)
+		.filter(Q(last_activity_at__lt=cutoff) | Q(last_activity_at__isnull=True))
+		.update(hot_score=0)
+	)
+
+	active = (
+		Question.objects
+		.filter(last_activity_at__gte=cutoff)
+		.only('pk', 'created_at', 'activity_points', 'hot_score')
+		.order_by('pk')
+	)
+	rescored = 0
+	last_pk = 0
+	while True:
+		batch = list(active.filter(pk__gt=last_pk)[:batch_size])
+		if not batch:
+			return rescored, zeroed
+		for question in batch:
+			question.hot_score = hot_score(question.activity_points, question.created_at, now)
+		Question.objects.bulk_update(batch, ['hot_score'])
+		rescored += len(batch)
+		last_pk = batch[-1].pk
@@ -0,0 +1,51 @@
+"""
+questions/management/commands/decay_hot_scores.py
+
+Periodic job for the "Hot" ordering: re-decays the hot scores of recently
+active questions and zeroes the ones that went quiet. Run it every few
+minutes (e.g. from cron). --recount first rebuilds activity points from the
+answer and comment tables, to backfill existing rows or repair drift.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from questions.hotness import count_activity_points, decay_hot_scores
+from questions.models import Question
+
+
+class Command(BaseCommand):
+	help = "Refresh hot scores of recently active questions."
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			'--recount', action='store_true',
+			help="Recount activity points for every question before decaying.",
+		)
+		parser.add_argument(
+			'--batch-size', type=int, default=1000,
+			help="Rows loaded and updated per batch (default: 1000).",
+		)
+
+	def handle(self, *args, recount, batch_size, **options):
+		if recount:
+			recounted = self.recount(batch_size)
+			self.stdout.write(f"Recounted activity points for {recounted} question(s).")
+		rescored, zeroed = decay_hot_scores(batch_size=batch_size)
+		self.stdout.write(f"Re-scored {rescored} active question(s), zeroed {zeroed} quiet one(s).")
+
+	def recount(self, batch_size):
+		Question.objects.filter(last_activity_at__isnull=True).update(last_activity_at=F('created_at'))
+		questions = Question.objects.only('pk', 'activity_points').order_by('pk')
+		recounted = 0
+		last_pk = 0
+		while True:
+			batch = list(questions.filter(pk__gt=last_pk)[:batch_size])
+			if not batch:
+				return recounted
+			points = count_activity_points(question.pk for question in batch)
+			for question in batch:
+				question.activity_points = points[question.pk]
+			Question.objects.bulk_update(batch, ['activity_points'])
+			recounted += len(batch)
+			last_pk = batch[-1].pk
@@ -0,0 +1,56 @@
+"""
+questions/management/commands/render_bodies.py
+
+Backfills the pre-rendered HTML columns of questions, answers and comments.
+Rows are processed in primary-key chunks and written back with bulk_update,
+so the command is safe to run against large tables.
+"""
+
+from django.core.management.base import BaseCommand
+
+from answers.models import Answer
+from comments.models import Comment
+from questions.models import Question
+
+
+class Command(BaseCommand):
+	help = "Render and store body/content HTML for questions, answers and comments."
+
+	models = (Question, Answer, Comment)
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			'--chunk-size', type=int, default=500,
+			help="Number of rows loaded and updated per batch (default: 500).",
+		)
+		parser.add_argument(
+			'--all', action='store_true', dest='render_all',
+			help="Re-render every row, not only rows whose HTML is still empty.",
+		)
+
+	def handle(self, *args, chunk_size, render_all, **options):
+		for model in self.models:
+			updated = self.backfill(model, chunk_size, render_all)
+			self.stdout.write(f"{model._meta.label}: rendered {updated} row(s).")
+
+	def backfill(self, model, chunk_size, render_all):
+		"""
+		Walk the table by ascending pk and re-render one chunk at a time.
+		"""
+		fields = model.rendered_fields
+		queryset = model.objects.only('pk', *fields.keys()).order_by('pk')
+		if not render_all:
+			for target in fields.values():
+				queryset = queryset.filter(**{target: ''})
+
+		updated = 0
+		last_pk = 0
+		while True:
+			chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+			if not chunk:
+				return updated
+			for obj in chunk:
+				obj.render_fields()
+			model.objects.bulk_update(chunk, list(fields.values()))
+			updated += len(chunk)
+			last_pk = chunk[-1].pk
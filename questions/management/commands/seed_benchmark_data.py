@@ -0,0 +1,282 @@
+"""
+questions/management/commands/seed_benchmark_data.py
+
+Generates a large synthetic dataset for reproducing production performance
+locally: users with profiles, tags used with a Zipfian distribution (a few
+very popular tags, a long tail of rare ones), questions, answers and
+comments nested the way AddCommentView allows (comments on questions and
+answers, replies to comments on questions only).
+
+Everything is written with bulk_create in batches, one transaction per batch
+of questions, so a million rows take minutes. Signals do not fire for bulk
+inserts, so what they would maintain is computed here instead: profiles,
+rendered HTML, activity points, last activity and hot scores. The tag
+catalogue is invalidated at the end; run build_related_tags --full
+afterwards for related-tag data.
+
+The same --seed always produces the same content. Timestamps are spread
+over the --days before the run.
+"""
+
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from DjangoQandAPlatform.rendering import render_text
+from answers.models import Answer
+from comments.models import Comment
+from questions.hotness import ANSWER_POINTS, COMMENT_POINTS, hot_score
+from questions.models import Question
+from tags.catalogue import invalidate_catalogue
+from tags.models import Tag
+from users.models import UserProfile
+
+User = get_user_model()
+
+WORDS = (
+	'django', 'query', 'model', 'view', 'template', 'index', 'cache', 'error', 'request', 'response',
+	'database', 'migration', 'field', 'form', 'user', 'test', 'server', 'deploy', 'static', 'media',
+	'why', 'how', 'does', 'my', 'the', 'a', 'not', 'work', 'when', 'after', 'slow', 'fast',
+	'returns', 'empty', 'list', 'value', 'string', 'number', 'function', 'class', 'import', 'module',
+)
+MAX_TAGS_PER_QUESTION = 5
+PASSWORD = 'benchmark'
+
+
+@contextmanager
+def explicit_timestamps(*models):
+	"""Let bulk inserts set auto_now/auto_now_add fields to the values given."""
+	fields = [
+		field for model in models for field in model._meta.concrete_fields
+		if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+	]
+	saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+	for field in fields:
+		field.auto_now = field.auto_now_add = False
+	try:
+		yield
+	finally:
+		for field, auto_now, auto_now_add in saved:
+			field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+	help = "Generate a large, deterministic synthetic dataset for benchmarking."
+
+	def add_arguments(self, parser):
+		parser.add_argument('--users', type=int, default=1000, help="Users to create (default: 1000).")
+		parser.add_argument('--tags', type=int, default=200, help="Tags to create (default: 200).")
+		parser.add_argument('--questions', type=int, default=10000, help="Questions to create (default: 10000).")
+		parser.add_argument(
+			'--answers', type=float, default=3,
+			help="Mean answers per question (default: 3).",
+		)
+		parser.add_argument(
+			'--comments', type=float, default=1,
+			help="Mean comments per question and per answer (default: 1).",
+		)
+		parser.add_argument(
+			'--reply-ratio', type=float, default=0.3,
+			help="Share of comments on questions that get a reply (default: 0.3).",
+		)
+		parser.add_argument(
+			'--zipf', type=float, default=1.1,
+			help="Exponent of the Zipfian tag popularity distribution (default: 1.1).",
+		)
+		parser.add_argument('--days', type=int, default=365, help="Spread timestamps over this many days (default: 365).")
+		parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0).")
+		parser.add_argument(
+			'--batch-size', type=int, default=2000,
+			help="Questions generated per batch and transaction (default: 2000).",
+		)
+		parser.add_argument(
+			'--prefix', default='bench',
+			help="Prefix of generated user and tag names (default: 'bench').",
+		)
+
+	def handle(self, *args, **options):
+		if options['users'] < 1 and options['questions'] > 0:
+			raise CommandError("Questions need at least one user.")
+		if options['tags'] < 1 and options['questions'] > 0:
+			raise CommandError("Questions need at least one tag.")
+		self.prefix = options['prefix']
+		if User.objects.filter(username__startswith=f'{self.prefix}-').exists():
+			raise CommandError(f"Users prefixed “{self.prefix}-” already exist; choose another --prefix.")
+		if Tag.objects.filter(name__startswith=f'{self.prefix}-').exists():
+			raise CommandError(f"Tags prefixed “{self.prefix}-” already exist; choose another --prefix.")
+
+		self.rng = random.Random(options['seed'])
+		self.now = timezone.now()
+		self.span = timedelta(days=options['days']).total_seconds()
+		self.options = options
+		self.batch_size = options['batch_size']
+		self.content_types = {
+			model: ContentType.objects.get_for_model(model).pk for model in (Question, Answer, Comment)
+		}
+		started = time.monotonic()
+
+		with transaction.atomic():
+			self.user_ids = self.create_users(options['users'])
+			self.tag_ids = self.create_tags(options['tags'])
+		self.stdout.write(f"Created {len(self.user_ids)} user(s) and {len(self.tag_ids)} tag(s).")
+		# Zipf: the tag of popularity rank r is used in proportion to 1 / r^s.
+		self.tag_weights = list(itertools.accumulate(
+			1 / rank ** options['zipf'] for rank in range(1, len(self.tag_ids) + 1)
+		))
+
+		totals = dict.fromkeys(('questions', 'answers', 'comments'), 0)
+		with explicit_timestamps(Question, Answer, Comment):
+			for start in range(0, options['questions'], self.batch_size):
+				size = min(self.batch_size, options['questions'] - start)
+				with transaction.atomic():
+					for key, count in self.create_question_batch(size).items():
+						totals[key] += count
+				self.stdout.write(f"  {start + size}/{options['questions']} question(s)...")
+
+		invalidate_catalogue()
+		self.stdout.write(
+			f"Created {totals['questions']} question(s), {totals['answers']} answer(s) and "
+			f"{totals['comments']} comment(s) in {time.monotonic() - started:.1f}s."
+		)
+
+	def past(self, after=None):
+		"""A random time in the window, or between ``after`` and now."""
+		if after is None:
+			return self.now - timedelta(seconds=self.rng.uniform(0, self.span))
+		return after + (self.now - after) * self.rng.random()
+
+	def count(self, mean):
+		"""A long-tailed random count with the given mean."""
+		return round(self.rng.expovariate(1 / mean)) if mean > 0 else 0
+
+	def text(self, min_words, max_words):
+		words = self.rng.choices(WORDS, k=self.rng.randint(min_words, max_words))
+		return ' '.join(words).capitalize()
+
+	def create_users(self, count):
+		password = make_password(PASSWORD)  # Hashed once, shared by every user
+		for start in range(0, count, self.batch_size):
+			users = [
+				User(
+					username=f'{self.prefix}-{i}',
+					email=f'{self.prefix}-{i}@example.com',
+					password=password,
+					date_joined=self.past(),
+				)
+				for i in range(start, min(start + self.batch_size, count))
+			]
+			User.objects.bulk_create(users)
+			# Bulk inserts skip the post_save signal that would create profiles.
+			UserProfile.objects.bulk_create(UserProfile(user_id=user.pk) for user in users)
+		return list(
+			User.objects.filter(username__startswith=f'{self.prefix}-').order_by('pk').values_list('pk', flat=True)
+		)
+
+	def create_tags(self, count):
+		tags = [Tag(name=f'{self.prefix}-{i}', slug=slugify(f'{self.prefix}-{i}')) for i in range(count)]
+		Tag.objects.bulk_create(tags, batch_size=self.batch_size)
+		names = [tag.name for tag in tags]
+		ids = dict(Tag.objects.filter(name__in=names).values_list('name', 'pk'))
+		return [ids[name] for name in names]  # In popularity rank order
+
+	def create_question_batch(self, size):
+		"""
+		Create ``size`` questions with their tags, answers and comments.
+		Returns the number of rows created by kind.
+		"""
+		rng = self.rng
+		questions, plans = [], []
+		for _ in range(size):
+			created_at = self.past()
+			body = self.text(20, 120)
+			question = Question(
+				title=self.text(4, 12)[:150], body=body, body_html=render_text(body),
+				author_id=rng.choice(self.user_ids), created_at=created_at, updated_at=created_at,
+			)
+			# Decide the whole thread up front: hot scores need its size and last activity.
+			answer_times = [self.past(created_at) for _ in range(self.count(self.options['answers']))]
+			answer_comment_times = [
+				[self.past(answered_at) for _ in range(self.count(self.options['comments']))]
+				for answered_at in answer_times
+			]
+			comment_times = [self.past(created_at) for _ in range(self.count(self.options['comments']))]
+			reply_times = [
+				self.past(commented_at) if rng.random() < self.options['reply_ratio'] else None
+				for commented_at in comment_times
+			]
+			comment_count = (
+				sum(map(len, answer_comment_times)) + len(comment_times)
+				+ sum(reply is not None for reply in reply_times)
+			)
+			points = len(answer_times) * ANSWER_POINTS + comment_count * COMMENT_POINTS
+			question.activity_points = points
+			question.last_activity_at = max(
+				[created_at, *answer_times, *comment_times, *itertools.chain(*answer_comment_times)]
+				+ [reply for reply in reply_times if reply is not None]
+			)
+			question.hot_score = hot_score(points, created_at, self.now)
+			tag_ids = set(rng.choices(self.tag_ids, cum_weights=self.tag_weights, k=rng.randint(1, MAX_TAGS_PER_QUESTION)))
+			questions.append(question)
+			plans.append((tag_ids, answer_times, answer_comment_times, comment_times, reply_times))
+
+		Question.objects.bulk_create(questions)
+
+		answers, answer_plans, comments = [], [], []
+		for question, (tag_ids, answer_times, answer_comment_times, comment_times, reply_times) in zip(questions, plans):
+			for answered_at, comment_times_of_answer in zip(answer_times, answer_comment_times):
+				answers.append(self.make_answer(question.pk, answered_at))
+				answer_plans.append(comment_times_of_answer)
+			for commented_at, replied_at in zip(comment_times, reply_times):
+				comments.append((self.make_comment(Question, question.pk, commented_at), replied_at))
+
+		through = Question.tags.through
+		through.objects.bulk_create(
+			[
+				through(question_id=question.pk, tag_id=tag_id)
+				for question, (tag_ids, *_) in zip(questions, plans) for tag_id in tag_ids
+			],
+			batch_size=self.batch_size,
+		)
+		Answer.objects.bulk_create(answers, batch_size=self.batch_size)
+		answer_comments = [
+			self.make_comment(Answer, answer.pk, commented_at)
+			for answer, comment_times_of_answer in zip(answers, answer_plans)
+			for commented_at in comment_times_of_answer
+		]
+		question_comments = [comment for comment, _ in comments]
+		Comment.objects.bulk_create(question_comments + answer_comments, batch_size=self.batch_size)
+		# Replies only to comments on questions, one level deep, as AddCommentView allows.
+		replies = [
+			self.make_comment(Comment, comment.pk, replied_at)
+			for comment, replied_at in comments if replied_at is not None
+		]
+		Comment.objects.bulk_create(replies, batch_size=self.batch_size)
+		return {
+			'questions': len(questions),
+			'answers': len(answers),
+			'comments': len(question_comments) + len(answer_comments) + len(replies),
+		}
+
+	def make_answer(self, question_id, created_at):
+		content = self.text(10, 80)
+		return Answer(
+			question_id=question_id, author_id=self.rng.choice(self.user_ids),
+			content=content, content_html=render_text(content), created_at=created_at,
+		)
+
+	def make_comment(self, parent_model, parent_id, created_at):
+		content = self.text(3, 30)
+		return Comment(
+			author_id=self.rng.choice(self.user_ids), content=content, content_html=render_text(content),
+			content_type_id=self.content_types[parent_model], object_id=parent_id, created_at=created_at,
+		)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0004_alter_question_media'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='body_html',
+            field=models.TextField(blank=True, editable=False, help_text='Pre-rendered HTML of the body, refreshed on save.'),
+        ),
+    ]
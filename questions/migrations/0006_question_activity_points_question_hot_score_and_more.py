@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0005_question_body_html'),
+        ('tags', '0003_tagactivitybucket'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='activity_points',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Weighted count of answers and comments, maintained incrementally.'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='hot_score',
+            field=models.FloatField(default=0, editable=False, help_text='Activity points decayed by age; see questions/hotness.py.'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='last_activity_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, help_text='Time of the last question, answer or comment activity.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['-hot_score', '-created_at'], name='question_hot_idx'),
+        ),
+    ]
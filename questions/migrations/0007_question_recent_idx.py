@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0006_question_activity_points_question_hot_score_and_more'),
+        ('tags', '0005_tag_slug_unique'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['-created_at', '-id'], name='question_recent_idx'),
+        ),
+    ]
@@ -8,17 +8,24 @@ from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
 from django.utils.text import Truncator
 
+from DjangoQandAPlatform.rendering import RenderedTextMixin
 from DjangoQandAPlatform.validators import SizeValidator
+from uploads.derivatives import ImageDerivativesMixin
 
 UserModel = get_user_model()
 
-class Question(models.Model):
+class Question(RenderedTextMixin, ImageDerivativesMixin, models.Model):
 	"""
 	Represents a posted question.
 	Includes generic relation for comments and a set of tags.
 	"""
 	title = models.CharField(max_length=150, help_text="Question headline.")
 	body = models.TextField(help_text="Detailed question description.")
+	body_html = models.TextField(
+		blank=True,
+		editable=False,
+		help_text="Pre-rendered HTML of the body, refreshed on save."
+	)
 	author = models.ForeignKey(
 		to=UserModel,
 		on_delete=models.CASCADE,
@@ -42,6 +49,31 @@ class Question(models.Model):
 		validators=[SizeValidator(10)],
 		help_text="Optional image for context.",
 	)
+	media_meta = models.JSONField(
+		default=dict,
+		blank=True,
+		editable=False,
+		help_text="Generated image derivatives; see uploads/derivatives.py."
+	)
+	activity_points = models.PositiveIntegerField(
+		default=0,
+		editable=False,
+		help_text="Weighted count of answers and comments, maintained incrementally."
+	)
+	last_activity_at = models.DateTimeField(
+		null=True, blank=True,
+		editable=False,
+		db_index=True,
+		help_text="Time of the last question, answer or comment activity."
+	)
+	hot_score = models.FloatField(
+		default=0,
+		editable=False,
+		help_text="Activity points decayed by age; see questions/hotness.py."
+	)
+
+	rendered_fields = {'body': 'body_html'}
+	image_fields = {'media': 'media_meta'}
 
 	def __str__(self):
 		"""Return the question's title."""
@@ -50,3 +82,7 @@ class Question(models.Model):
 
 	class Meta:
 		ordering = ['-created_at']
+		indexes = [
+			models.Index(fields=['-hot_score', '-created_at'], name='question_hot_idx'),
+			models.Index(fields=['-created_at', '-id'], name='question_recent_idx'),
+		]
@@ -0,0 +1,62 @@
+"""
+questions/signals.py
+
+Signal handlers keeping each question's hot score current as activity happens.
+See questions/hotness.py for the scoring model. Also registers Question for
+read-through caching (see DjangoQandAPlatform/caching.py).
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from DjangoQandAPlatform import caching
+from answers.models import Answer
+from comments.models import Comment
+from comments.utils import get_root_question
+from .hotness import ANSWER_POINTS, COMMENT_POINTS, hot_score, record_activity, recount_activity
+from .models import Question
+
+caching.register(Question)
+
+
+@receiver(post_save, sender=Question)
+def init_hot_score(sender, instance, created, **kwargs):
+	"""New questions start as active, with only base points."""
+	if created:
+		instance.last_activity_at = instance.created_at
+		instance.hot_score = hot_score(0, instance.created_at, instance.created_at)
+		Question.objects.filter(pk=instance.pk).update(
+			last_activity_at=instance.last_activity_at,
+			hot_score=instance.hot_score,
+		)
+
+
+@receiver(post_save, sender=Answer)
+def answer_saved(sender, instance, created, **kwargs):
+	if created:
+		record_activity(instance.question_id, ANSWER_POINTS)
+
+
+@receiver(post_delete, sender=Answer)
+def answer_deleted(sender, instance, **kwargs):
+	# The answer's comments cascade through a generic relation and may be
+	# deleted after it, when they can no longer find their question, so
+	# recount rather than subtract.
+	recount_activity(instance.question_id)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+	if created:
+		question = get_root_question(instance.content_object)
+		if question:
+			record_activity(question.pk, COMMENT_POINTS)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+	# During cascades the parent may already be gone; answer deletes recount,
+	# and any other drift is repaired by `decay_hot_scores --recount`.
+	question = get_root_question(instance.content_object)
+	if question:
+		record_activity(question.pk, -COMMENT_POINTS, touch=False)
@@ -4,10 +4,22 @@ questions/tests.py
 Unit and integration test suite for Question model logic and relationships.
 """
 
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import CommandError, call_command
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from DjangoQandAPlatform.testing import QueryBudgetMixin
+from answers.models import Answer
+from comments.models import Comment
+from questions.hotness import ANSWER_POINTS, COMMENT_POINTS, count_activity_points, hot_score
 from questions.models import Question
 from tags.models import Tag
+from users.models import UserProfile
 
 User = get_user_model()
 
@@ -44,3 +56,229 @@ class QuestionModelTest(TestCase):
 		self.assertEqual(q.tags.count(), 2)
 		# Tags should link back to question
 		self.assertIn(q, self.tag1.questions.all())
+
+	def test_body_html_rendered_on_save(self):
+		q = Question.objects.create(
+			title="Rendering",
+			body="First <b>line</b>\n\nSecond paragraph",
+			author=self.user
+		)
+		self.assertEqual(q.body_html, '<p>First &lt;b&gt;line&lt;/b&gt;</p>\n\n<p>Second paragraph</p>')
+		q.body = "Edited"
+		q.save(update_fields=['body'])
+		q.refresh_from_db()
+		self.assertEqual(q.body_html, '<p>Edited</p>')
+
+
+class RenderBodiesCommandTest(TestCase):
+	"""
+	Tests for the render_bodies backfill management command.
+	"""
+
+	def setUp(self):
+		self.user = User.objects.create_user(username='backfiller', password='1234')
+
+	def test_backfills_missing_html(self):
+		for i in range(3):
+			Question.objects.create(title=f"Q{i}", body=f"Body {i}", author=self.user)
+		# Simulate rows written before the column existed.
+		Question.objects.update(body_html='')
+		call_command('render_bodies', chunk_size=2, stdout=StringIO())
+		self.assertEqual(
+			sorted(Question.objects.values_list('body_html', flat=True)),
+			['<p>Body 0</p>', '<p>Body 1</p>', '<p>Body 2</p>'],
+		)
+
+
+class QuestionListViewTest(TestCase):
+	"""
+	Tests for the server-rendered first page of the questions list.
+	"""
+
+	def setUp(self):
+		self.user = User.objects.create_user(username='lister', password='1234')
+		self.tag = Tag.objects.create(name="ListT")
+		for i in range(12):
+			q = Question.objects.create(title=f"Listed q{i}", body="Body", author=self.user)
+			if i % 2:
+				q.tags.add(self.tag)
+
+	def test_first_page_embedded(self):
+		resp = self.client.get(reverse('questions-list'))
+		self.assertEqual(resp.status_code, 200)
+		data = resp.context['initial_questions']
+		self.assertEqual(data['count'], 12)
+		self.assertEqual(len(data['results']), 10)
+		self.assertContains(resp, 'id="initial-questions-data"')
+
+	def test_url_parameters_honoured(self):
+		resp = self.client.get(reverse('questions-list'), {'search': 'q1', 'tag': self.tag.id})
+		data = resp.context['initial_questions']
+		self.assertEqual({q['title'] for q in data['results']}, {'Listed q1', 'Listed q11'})
+
+		resp = self.client.get(reverse('questions-list'), {'page': 2})
+		self.assertEqual(len(resp.context['initial_questions']['results']), 2)
+
+	def test_non_numeric_tag_ignored(self):
+		resp = self.client.get(reverse('questions-list'), {'tag': 'abc'})
+		self.assertEqual(resp.status_code, 200)
+		self.assertEqual(resp.context['initial_questions']['count'], 12)
+
+		resp = self.client.get(reverse('questions-list'), {'tag': ['abc', self.tag.id]})
+		self.assertEqual(resp.context['initial_questions']['count'], 6)
+
+	def test_out_of_range_page_falls_back_to_client_fetch(self):
+		resp = self.client.get(reverse('questions-list'), {'page': 99})
+		self.assertEqual(resp.status_code, 200)
+		self.assertIsNone(resp.context['initial_questions'])
+
+
+class HotScoreTest(TestCase):
+	"""
+	Tests for the incrementally maintained hot score and ordering=hot.
+	"""
+
+	def setUp(self):
+		self.user = User.objects.create_user(username='hotshot', password='1234')
+		self.question = Question.objects.create(title="Hot", body="Body", author=self.user)
+
+	def test_activity_raises_score(self):
+		self.question.refresh_from_db()
+		initial = self.question.hot_score
+		self.assertGreater(initial, 0)
+
+		answer = Answer.objects.create(question=self.question, author=self.user, content="A")
+		Comment.objects.create(author=self.user, content="C", content_object=answer)
+		self.question.refresh_from_db()
+		self.assertEqual(self.question.activity_points, ANSWER_POINTS + COMMENT_POINTS)
+		self.assertGreater(self.question.hot_score, initial)
+
+		answer.delete()
+		self.question.refresh_from_db()
+		self.assertEqual(self.question.activity_points, 0)
+
+	def test_decay_command_zeroes_quiet_questions(self):
+		quiet = Question.objects.create(title="Quiet", body="Body", author=self.user)
+		long_ago = timezone.now() - timedelta(days=30)
+		Question.objects.filter(pk=quiet.pk).update(created_at=long_ago, last_activity_at=long_ago)
+		call_command('decay_hot_scores', stdout=StringIO())
+		quiet.refresh_from_db()
+		self.question.refresh_from_db()
+		self.assertEqual(quiet.hot_score, 0)
+		self.assertGreater(self.question.hot_score, 0)
+
+	def test_recount_repairs_points(self):
+		Answer.objects.create(question=self.question, author=self.user, content="A")
+		Question.objects.update(activity_points=0)
+		call_command('decay_hot_scores', recount=True, stdout=StringIO())
+		self.question.refresh_from_db()
+		self.assertEqual(self.question.activity_points, ANSWER_POINTS)
+
+	def test_api_ordering_hot(self):
+		busy = Question.objects.create(title="Busy", body="Body", author=self.user)
+		Question.objects.filter(pk=busy.pk).update(created_at=timezone.now() - timedelta(hours=1))
+		for _ in range(3):
+			Answer.objects.create(question=busy, author=self.user, content="A")
+		resp = self.client.get(reverse('question-search-api'), {'ordering': 'hot'})
+		self.assertEqual([q['title'] for q in resp.json()['results']], ['Busy', 'Hot'])
+		resp = self.client.get(reverse('question-search-api'))
+		self.assertEqual([q['title'] for q in resp.json()['results']], ['Hot', 'Busy'])
+
+	def test_score_halves_every_half_life(self):
+		now = timezone.now()
+		self.assertAlmostEqual(hot_score(3, now - timedelta(hours=24), now), hot_score(3, now, now) / 2)
+
+
+class QuestionQueryBudgetTest(QueryBudgetMixin, TestCase):
+	"""
+	Query budgets for the question views, over growing numbers of rows shown.
+	"""
+
+	def setUp(self):
+		self.user = User.objects.create_user(username='budgeter', password='1234')
+		self.question = Question.objects.create(title="Budget", body="Body", author=self.user)
+		self.client.force_login(self.user)
+
+	def add_questions(self, size):
+		tag = Tag.objects.create(name="BudgetT")
+		for i in range(size):
+			Question.objects.create(title=f"Q{i}", body="Body", author=self.user).tags.add(tag)
+
+	def add_thread(self, size):
+		"""``size`` answers and top-level comments, each with a comment of its own."""
+		for i in range(size):
+			answer = Answer.objects.create(question=self.question, author=self.user, content=f"A{i}")
+			Comment.objects.create(author=self.user, content="On answer", content_object=answer)
+			comment = Comment.objects.create(author=self.user, content="On question", content_object=self.question)
+			Comment.objects.create(author=self.user, content="Reply", content_object=comment)
+
+	def test_list(self):
+		self.assertQueryBudget(6, lambda: self.client.get(reverse('questions-list')), self.add_questions)
+
+	def test_details(self):
+		url = reverse('question_details', args=[self.question.pk])
+		self.assertQueryBudget(9, lambda: self.client.get(url), self.add_thread)
+
+	def test_create_form(self):
+		self.assertQueryBudget(2, lambda: self.client.get(reverse('question_create')), self.add_questions)
+
+	def test_update_form(self):
+		url = reverse('question_update', args=[self.question.pk])
+		self.assertQueryBudget(5, lambda: self.client.get(url), self.add_thread)
+
+	def test_delete_confirmation(self):
+		url = reverse('question_delete', args=[self.question.pk])
+		self.assertQueryBudget(4, lambda: self.client.get(url), self.add_thread)
+
+
+class SeedBenchmarkDataTest(TestCase):
+	"""
+	Tests for the synthetic dataset generator.
+	"""
+
+	def seed(self, prefix, **options):
+		call_command(
+			'seed_benchmark_data', users=5, tags=8, questions=30, batch_size=7,
+			prefix=prefix, stdout=StringIO(), **options,
+		)
+
+	def test_generates_consistent_data(self):
+		self.seed('b1', seed=3)
+		self.assertEqual(User.objects.filter(username__startswith='b1-').count(), 5)
+		self.assertEqual(UserProfile.objects.filter(user__username__startswith='b1-').count(), 5)
+		self.assertEqual(Question.objects.count(), 30)
+		self.assertTrue(Answer.objects.exists())
+		self.assertTrue(all(q.tags.exists() for q in Question.objects.all()))
+
+		points = count_activity_points(Question.objects.values_list('pk', flat=True))
+		for question in Question.objects.all():
+			self.assertEqual(question.activity_points, points[question.pk])
+			self.assertGreaterEqual(question.last_activity_at, question.created_at)
+			self.assertEqual(question.body_html, f'<p>{question.body}</p>')
+
+	def test_comments_follow_nesting_rules(self):
+		self.seed('b1', comments=2, reply_ratio=1)
+		comment_type = ContentType.objects.get_for_model(Comment)
+		replies = Comment.objects.filter(content_type=comment_type)
+		self.assertTrue(replies.exists())
+		for reply in replies:
+			parent = reply.content_object
+			self.assertEqual(parent.content_type, ContentType.objects.get_for_model(Question))
+
+	def test_same_seed_same_content(self):
+		self.seed('b1', seed=7)
+		first = list(Question.objects.order_by('pk').values_list('title', 'body'))
+		Question.objects.all().delete()
+		self.seed('b2', seed=7)
+		self.assertEqual(list(Question.objects.order_by('pk').values_list('title', 'body')), first)
+
+	def test_refuses_existing_prefix(self):
+		self.seed('b1')
+		with self.assertRaises(CommandError):
+			self.seed('b1')
+
+	def test_refuses_leftover_tags_of_prefix(self):
+		Tag.objects.create(name='b1-3')
+		with self.assertRaisesMessage(CommandError, "Tags prefixed “b1-” already exist"):
+			self.seed('b1')
+		self.assertFalse(User.objects.filter(username__startswith='b1-').exists())
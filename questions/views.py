@@ -8,28 +8,34 @@ Handles permission checks, context enrichment, and related fetching.
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models import Prefetch
 from django.urls import reverse_lazy, reverse
-from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
+from django.views.generic import CreateView, UpdateView, DeleteView, DetailView, TemplateView
 
 from DjangoQandAPlatform.mixins import UserIsAuthorMixin
 from answers.models import Answer
+from api.views import search_questions_payload
 from comments.models import Comment
 from questions.forms import QuestionCreateForm, QuestionEditForm
 from questions.models import Question
-from tags.models import Tag
+from tags.catalogue import get_tag_catalogue
+from tags.trending import get_trending_tags
 
-class QuestionListView(ListView):
+class QuestionListView(TemplateView):
 	"""
-	List all questions (paginated), with tags in the context for filtering.
+	List questions with tags (from the cached tag catalogue) in the context for filtering.
+
+	The first page of results (honouring the 'search', 'page' and 'tag' URL
+	parameters) is rendered server-side as the search API payload, so the
+	page script can display it without an extra round trip.
 	"""
-	model = Question
 	template_name = 'questions/questions_list.html'
-	context_object_name = 'questions'
-	ordering = ['-created_at']
 
 	def get_context_data(self, **kwargs):
 		context = super().get_context_data(**kwargs)
-		context['has_questions'] = Question.objects.exists()
-		context['tags'] = Tag.objects.all()
+		catalogue = get_tag_catalogue()
+		context['has_questions'] = catalogue.has_questions
+		context['tags'] = catalogue.tags
+		context['trending_tags'] = get_trending_tags()
+		context['initial_questions'] = search_questions_payload(self.request)
 		return context
 
 class QuestionCreateView(LoginRequiredMixin, CreateView):
@@ -1,11 +1,34 @@
 """
 Admin configuration for the Tag model.
 
-Provides search, pretty list display, and conditional readonly logic for staff.
+Provides search, pretty list display, conditional readonly logic for staff,
+and a bulk "merge into" action backed by tags/synonyms.py.
 """
 
-from django.contrib import admin
-from .models import Tag
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.template.response import TemplateResponse
+
+from .models import Tag, TagSynonym
+from .synonyms import merge_tags, rename_tag
+
+
+class MergeTagsForm(forms.Form):
+	"""Intermediate form of the merge action: pick the surviving tag."""
+	target = forms.ModelChoiceField(
+		queryset=Tag.objects.order_by('name'),
+		help_text="The selected tags are merged into this tag and then deleted.",
+	)
+
+
+class TagSynonymInline(admin.TabularInline):
+	"""Synonyms pointing at a tag, editable from the tag page."""
+	model = TagSynonym
+	fields = ('name', 'slug')
+	readonly_fields = ('slug',)
+	extra = 0
+
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
@@ -14,9 +37,59 @@ class TagAdmin(admin.ModelAdmin):
 
 	- Shows name in list view.
 	- Enables search by name.
-	- Auto-populates slug from name during creation.
+	- Shows the slug read-only; Tag.save() derives it (unique) from the name.
+	- Renaming a tag keeps its old name as a synonym.
+	- "Merge selected tags" moves their questions to another tag in bulk.
 	"""
-	list_display = ('name',)
+	list_display = ('name', 'slug')
 	search_fields = ('name',)
-	prepopulated_fields = {'slug': ('name',)}
+	readonly_fields = ('slug',)
+	inlines = [TagSynonymInline]
+	actions = ['merge_selected_tags']
 
+	def save_model(self, request, obj, form, change):
+		if change and 'name' in form.changed_data:
+			obj.name = form.initial['name']
+			rename_tag(obj, form.cleaned_data['name'])
+			return
+		super().save_model(request, obj, form, change)
+
+	@admin.action(description="Merge selected tags into another tag", permissions=['delete'])
+	def merge_selected_tags(self, request, queryset):
+		"""
+		Ask for the target tag, then merge every selected tag into it.
+		"""
+		form = MergeTagsForm(request.POST if 'apply' in request.POST else None)
+		if form.is_valid():
+			target = form.cleaned_data['target']
+			moved = 0
+			merged = 0
+			for source in queryset.exclude(pk=target.pk):
+				moved += merge_tags(source, target)
+				merged += 1
+			self.message_user(
+				request,
+				f"Merged {merged} tag(s) into “{target}”; {moved} question link(s) moved.",
+				messages.SUCCESS,
+			)
+			return None
+
+		return TemplateResponse(request, 'admin/tags/tag/merge_tags.html', {
+			**self.admin_site.each_context(request),
+			'title': "Merge tags",
+			'opts': self.model._meta,
+			'tags': queryset,
+			'form': form,
+			'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+		})
+
+
+@admin.register(TagSynonym)
+class TagSynonymAdmin(admin.ModelAdmin):
+	"""
+	Admin for tag synonyms: search by name, pick the canonical tag by autocomplete.
+	"""
+	list_display = ('name', 'tag')
+	search_fields = ('name', 'tag__name')
+	readonly_fields = ('slug',)
+	autocomplete_fields = ('tag',)
@@ -0,0 +1,76 @@
+"""
+Tag autocomplete from an in-memory prefix index.
+
+The index is a sorted list of lookup keys (each tag's slug and lower-cased
+name, and those of its synonyms) built from the cached tag catalogue, so
+typing a synonym such as "py" suggests its canonical tag. A prefix query is two bisections
+into that list plus a walk over the matching range, so it costs no queries.
+The index is rebuilt in each process whenever the catalogue version changes.
+"""
+
+import heapq
+from bisect import bisect_left
+from typing import NamedTuple
+
+from django.utils.text import slugify
+
+from .catalogue import get_tag_catalogue
+
+
+class PrefixIndex(NamedTuple):
+	"""Sorted lookup keys and, at the same positions, the tags they belong to."""
+	keys: list
+	tags: list
+
+
+# (catalogue, PrefixIndex) pair for this process, rebuilt when the catalogue is replaced.
+_index = (None, None)
+
+
+def build_prefix_index(tags, synonyms=()):
+	"""
+	Index ``tags`` (catalogue entries) by slug and by lower-cased name, and
+	by those of their ``synonyms`` (catalogue synonym entries).
+	"""
+	by_id = {tag.id: tag for tag in tags}
+	keyed = [(tag, {tag.slug, tag.name.lower()}) for tag in tags]
+	keyed += [
+		(by_id[synonym.tag_id], {synonym.slug, synonym.name.lower()})
+		for synonym in synonyms if synonym.tag_id in by_id
+	]
+	entries = sorted((key, tag) for tag, keys in keyed for key in keys)
+	return PrefixIndex(keys=[key for key, _ in entries], tags=[tag for _, tag in entries])
+
+
+def get_prefix_index():
+	"""Return the prefix index for the current tag catalogue."""
+	global _index
+	catalogue = get_tag_catalogue()
+	indexed, index = _index
+	if indexed is not catalogue:
+		index = build_prefix_index(catalogue.tags, catalogue.synonyms)
+		_index = (catalogue, index)
+	return index
+
+
+def _matches(index, prefix):
+	"""Return the tags having a key that starts with ``prefix``."""
+	position = bisect_left(index.keys, prefix)
+	end = bisect_left(index.keys, prefix + '\uffff', lo=position)
+	return index.tags[position:end]
+
+
+def autocomplete_tags(query, limit=10):
+	"""
+	Return up to ``limit`` catalogue tags whose name or slug, or one of
+	their synonyms', starts with ``query``, most used first (ties broken by name).
+	"""
+	query = query.strip().lower()
+	if not query:
+		return []
+	index = get_prefix_index()
+	matches = {}
+	for prefix in {query, slugify(query)} - {''}:
+		for tag in _matches(index, prefix):
+			matches[tag.id] = tag
+	return heapq.nsmallest(limit, matches.values(), key=lambda tag: (-tag.question_count, tag.name))
@@ -0,0 +1,129 @@
+"""
+Cached catalogue of all tags (id, name, slug, question count) and their
+synonyms.
+
+Tags almost never change, so the catalogue is built once and then served from
+the shared Django cache and from a process-local copy. Both copies are keyed on
+a version token kept in the cache. Signal handlers (see tags/signals.py) replace
+the token whenever tags, synonyms or question tagging change, which invalidates every
+copy in every process at once. In steady state a lookup costs zero queries.
+"""
+
+import uuid
+from typing import NamedTuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+VERSION_KEY = 'tags:catalogue:version'
+DATA_KEY = 'tags:catalogue:{version}'
+DATA_TIMEOUT = 60 * 60 * 24  # Unused versions simply expire
+
+
+class TagEntry(NamedTuple):
+	"""One tag as exposed by the catalogue."""
+	id: int
+	name: str
+	slug: str
+	question_count: int
+
+
+class SynonymEntry(NamedTuple):
+	"""An alternative name of the tag with id ``tag_id``."""
+	name: str
+	slug: str
+	tag_id: int
+
+
+class TagCatalogue(NamedTuple):
+	"""All tags ordered by name, whether any question exists at all, and all synonyms."""
+	tags: tuple
+	has_questions: bool
+	synonyms: tuple = ()
+
+
+# (version, catalogue) pair for this process; replaced atomically, never mutated.
+_local_copy = (None, None)
+# (catalogue, {slug: TagEntry}) pair, rebuilt whenever the catalogue is replaced.
+_slug_index = (None, {})
+
+
+def get_catalogue_version():
+	"""Return the current catalogue version token, creating one if missing."""
+	version = cache.get(VERSION_KEY)
+	if version is None:
+		version = bump_catalogue_version()
+	return version
+
+
+def bump_catalogue_version():
+	"""Store a fresh version token, invalidating all cached catalogues."""
+	version = uuid.uuid4().hex
+	cache.set(VERSION_KEY, version, None)
+	return version
+
+
+def invalidate_catalogue():
+	"""
+	Invalidate now and again once the surrounding transaction commits, so a
+	catalogue rebuilt from not-yet-committed data cannot outlive the commit.
+	"""
+	bump_catalogue_version()
+	transaction.on_commit(bump_catalogue_version)
+
+
+def build_catalogue():
+	"""Query the database for a fresh catalogue."""
+	from questions.models import Question
+	from .models import Tag, TagSynonym
+
+	rows = (
+		Tag.objects
+		.annotate(question_count=Count('questions'))
+		.order_by('name')
+		.values_list('id', 'name', 'slug', 'question_count')
+	)
+	return TagCatalogue(
+		tags=tuple(TagEntry(*row) for row in rows),
+		has_questions=Question.objects.exists(),
+		synonyms=tuple(
+			SynonymEntry(*row) for row in TagSynonym.objects.values_list('name', 'slug', 'tag_id')
+		),
+	)
+
+
+def get_tag_catalogue():
+	"""
+	Return the current TagCatalogue from the process-local copy, the shared
+	cache, or the database, in that order.
+	"""
+	global _local_copy
+	version = get_catalogue_version()
+	local_version, catalogue = _local_copy
+	if local_version == version:
+		return catalogue
+
+	key = DATA_KEY.format(version=version)
+	catalogue = cache.get(key)
+	if catalogue is None:
+		catalogue = build_catalogue()
+		cache.set(key, catalogue, DATA_TIMEOUT)
+	_local_copy = (version, catalogue)
+	return catalogue
+
+
+def get_tag_by_slug(slug):
+	"""Return the catalogue's TagEntry for ``slug``, or None if there is no such tag."""
+	global _slug_index
+	catalogue = get_tag_catalogue()
+	indexed, index = _slug_index
+	if indexed is not catalogue:
+		index = {tag.slug: tag for tag in catalogue.tags}
+		_slug_index = (catalogue, index)
+	return index.get(slug)
+
+
+def get_popular_tags():
+	"""Return the catalogue's tags ordered by question count (highest first), then name."""
+	return sorted(get_tag_catalogue().tags, key=lambda tag: (-tag.question_count, tag.name))
@@ -0,0 +1,74 @@
+"""
+Form fields for selecting tags.
+
+CatalogueTagField renders its choices from the cached tag catalogue, so
+displaying a form with a tag picker costs no queries. Submitted values are
+still validated against the database queryset; besides ids they may be tag
+names or synonyms, which are resolved to the canonical tag first.
+
+TagAutocompleteWidget renders only the currently selected tags and looks the
+rest up through the tag autocomplete API as the user types, instead of
+embedding every tag in the page. A name typed without picking a suggestion
+is submitted as is, and resolved like any other name.
+"""
+
+from django.forms import SelectMultiple
+from django.forms.models import ModelChoiceIterator, ModelMultipleChoiceField
+from django.urls import reverse
+
+from .catalogue import get_tag_catalogue
+from .synonyms import resolve_tag_names
+
+
+class CatalogueTagIterator(ModelChoiceIterator):
+	"""Yields (id, name) choices from the tag catalogue instead of the queryset."""
+
+	def __iter__(self):
+		for tag in get_tag_catalogue().tags:
+			yield tag.id, tag.name
+
+	def __len__(self):
+		return len(get_tag_catalogue().tags)
+
+	def __bool__(self):
+		return bool(get_tag_catalogue().tags)
+
+
+class TagAutocompleteWidget(SelectMultiple):
+	"""
+	Tag picker that only renders the selected tags as options; suggestions
+	come from the tag autocomplete API.
+	"""
+	template_name = 'tags/widgets/tag_autocomplete.html'
+
+	def optgroups(self, name, value, attrs=None):
+		selected = {str(v) for v in value}
+		# Re-displaying a bound form: submitted tag names stand for their tags.
+		names = [v for v in selected if not v.isdigit()]
+		if names:
+			selected.update(str(tag_id) for tag_id in resolve_tag_names(names).values())
+		groups = []
+		for index, (option_value, option_label) in enumerate(self.choices):
+			if str(option_value) in selected:
+				option = self.create_option(name, option_value, option_label, True, index, attrs=attrs)
+				groups.append((None, [option], index))
+		return groups
+
+	def get_context(self, name, value, attrs):
+		context = super().get_context(name, value, attrs)
+		context['widget']['autocomplete_url'] = reverse('tag-autocomplete-api')
+		return context
+
+
+class CatalogueTagField(ModelMultipleChoiceField):
+	"""Multiple tag choice field backed by the tag catalogue for rendering."""
+	iterator = CatalogueTagIterator
+	widget = TagAutocompleteWidget
+
+	def _check_values(self, value):
+		names = [v for v in value if not str(v).isdigit()]
+		if names:
+			resolved = resolve_tag_names(names)
+			# dict.fromkeys drops duplicates, e.g. a tag picked by id and by a synonym.
+			value = list(dict.fromkeys(str(resolved.get(v, v)) for v in value))
+		return super()._check_values(value)
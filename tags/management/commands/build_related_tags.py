@@ -0,0 +1,45 @@
+"""
+Builds the tag co-occurrence matrix used for related-tag suggestions.
+
+By default only tags carried by questions changed since the previous
+successful run, or marked stale since, are recomputed; pass --full to
+rebuild the whole matrix.
+"""
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tags.models import JobCheckpoint
+from tags.related import (
+	forget_stale_tags, rebuild_cooccurrences, stale_tag_ids, tags_of_questions_changed_since,
+)
+
+CHECKPOINT_NAME = 'build_related_tags'
+
+
+class Command(BaseCommand):
+	help = "Build or incrementally update the tag co-occurrence matrix."
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			'--full', action='store_true',
+			help="Rebuild the whole matrix instead of only tags touched since the last run.",
+		)
+
+	def handle(self, *args, full, **options):
+		started_at = timezone.now()
+		checkpoint = JobCheckpoint.objects.filter(name=CHECKPOINT_NAME).first()
+
+		if full or checkpoint is None:
+			pairs = rebuild_cooccurrences()
+			self.stdout.write(f"Full rebuild: stored {pairs} tag pair(s).")
+		else:
+			affected = tags_of_questions_changed_since(checkpoint.last_run_at) | stale_tag_ids()
+			pairs = rebuild_cooccurrences(affected)
+			self.stdout.write(f"Incremental run: {len(affected)} tag(s) affected, stored {pairs} tag pair(s).")
+
+		# Tags marked since started_at may not be counted yet; keep them for the next run.
+		forget_stale_tags(started_at)
+		JobCheckpoint.objects.update_or_create(
+			name=CHECKPOINT_NAME, defaults={'last_run_at': started_at},
+		)
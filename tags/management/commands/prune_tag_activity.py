@@ -0,0 +1,18 @@
+"""
+Deletes tag activity buckets older than the trending window.
+
+Scores ignore such buckets anyway; pruning just keeps the table small.
+Intended to run periodically (e.g. daily).
+"""
+
+from django.core.management.base import BaseCommand
+
+from tags.trending import prune_activity
+
+
+class Command(BaseCommand):
+	help = "Delete tag activity buckets that fell out of the trending window."
+
+	def handle(self, *args, **options):
+		deleted = prune_activity()
+		self.stdout.write(f"Deleted {deleted} expired activity bucket(s).")
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Batch job identifier.', max_length=50, unique=True)),
+                ('last_run_at', models.DateTimeField(help_text='Start time of the last successful run.')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TagCooccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(help_text='Number of questions carrying both tags.')),
+                ('related', models.ForeignKey(help_text='Tag appearing on the same questions.', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tags.tag')),
+                ('tag', models.ForeignKey(help_text='Tag whose related tags this row describes.', on_delete=django.db.models.deletion.CASCADE, related_name='cooccurrences', to='tags.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tag', '-count'], name='tag_cooccurrence_top_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tag', 'related'), name='unique_tag_cooccurrence')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0002_jobcheckpoint_tagcooccurrence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagActivityBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(db_index=True, help_text='Start of the hour this bucket covers.')),
+                ('count', models.PositiveIntegerField(default=0, help_text='Weighted activity within the hour.')),
+                ('tag', models.ForeignKey(help_text='Tag the activity counts towards.', on_delete=django.db.models.deletion.CASCADE, related_name='activity_buckets', to='tags.tag')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('tag', 'hour'), name='unique_tag_activity_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:51
+
+from django.db import migrations
+from django.utils.text import slugify
+
+
+def unique_slug(name, taken):
+    """
+    slugify(name), suffixed with -2, -3, ... until it is not in ``taken``.
+    A frozen copy of tags.models.unique_slug, so that later changes to the
+    model helper do not change what this migration does.
+    """
+    base = slugify(name)[:34] or 'tag'
+    slug, n = base, 1
+    while slug in taken:
+        n += 1
+        slug = f'{base}-{n}'
+    return slug
+
+
+def dedupe_slugs(apps, schema_editor):
+    """Regenerate slugs so that the unique constraint added next can be applied."""
+    Tag = apps.get_model('tags', 'Tag')
+    taken = set()
+    for tag in Tag.objects.order_by('pk'):
+        slug = unique_slug(tag.name, taken)
+        taken.add(slug)
+        if tag.slug != slug:
+            Tag.objects.filter(pk=tag.pk).update(slug=slug)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0003_tagactivitybucket'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_slugs, migrations.RunPython.noop),
+    ]
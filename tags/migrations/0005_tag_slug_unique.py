@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0004_dedupe_tag_slugs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tag',
+            name='slug',
+            field=models.SlugField(blank=True, help_text='Always auto-generated from name', max_length=40, unique=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0005_tag_slug_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagSynonym',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text="Alternative tag name (e.g. 'py').", max_length=30)),
+                ('slug', models.SlugField(help_text='Slugified name used for lookups.', max_length=40, unique=True)),
+                ('tag', models.ForeignKey(help_text='Canonical tag this name resolves to.', on_delete=django.db.models.deletion.CASCADE, related_name='synonyms', to='tags.tag')),
+            ],
+        ),
+    ]
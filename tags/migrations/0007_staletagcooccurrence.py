@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0006_tagsynonym'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaleTagCooccurrence',
+            fields=[
+                ('tag', models.OneToOneField(help_text='Tag whose co-occurrence rows are out of date.', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='tags.tag')),
+                ('marked_at', models.DateTimeField(help_text="When the tag's question links last changed.")),
+            ],
+        ),
+    ]
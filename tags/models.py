@@ -7,6 +7,24 @@ Defines the Tag model, which supports slugs for clean URLs and uniqueness.
 from django.db import models
 from django.utils.text import slugify
 
+def unique_slug(name, exclude_pk=None, taken=None):
+	"""
+	Return slugify(name), suffixed with -2, -3, ... until it is free.
+	``taken`` is an optional set of slugs to check instead of querying Tag.
+	"""
+	base = slugify(name)[:34] or 'tag'
+	slug, n = base, 1
+	while True:
+		if taken is not None:
+			in_use = slug in taken
+		else:
+			in_use = Tag.objects.filter(slug=slug).exclude(pk=exclude_pk).exists()
+		if not in_use:
+			return slug
+		n += 1
+		slug = f'{base}-{n}'
+
+
 class Tag(models.Model):
 	"""
 	Represents a tag that can be associated with questions, posts, etc.
@@ -17,17 +35,132 @@ class Tag(models.Model):
 	"""
 	name = models.CharField(max_length=30, unique=True,
 	                        help_text="Unique human-readable tag name (e.g. 'python').")
-	slug = models.SlugField(max_length=40, blank=True,
+	slug = models.SlugField(max_length=40, unique=True, blank=True,
 	                        help_text="Always auto-generated from name")
 
 	def save(self, *args, **kwargs):
 		"""
 		Automatically set or update slug to a slugified version
-		of the current name, always.
+		of the current name, always. Names that slugify alike
+		(e.g. 'C++' and 'C') get a numeric suffix.
 		"""
-		self.slug = slugify(self.name)
+		self.slug = unique_slug(self.name, exclude_pk=self.pk)
 		super().save(*args, **kwargs)
 
 	def __str__(self):
 		"""String representation: just the tag name."""
 		return self.name
+
+
+class TagCooccurrence(models.Model):
+	"""
+	Sparse tag co-occurrence matrix: how many questions carry both ``tag`` and ``related``.
+
+	Rows are stored in both directions and rebuilt in batch by the
+	``build_related_tags`` management command; see tags/related.py.
+	"""
+	tag = models.ForeignKey(
+		to=Tag,
+		on_delete=models.CASCADE,
+		related_name='cooccurrences',
+		help_text="Tag whose related tags this row describes."
+	)
+	related = models.ForeignKey(
+		to=Tag,
+		on_delete=models.CASCADE,
+		related_name='+',
+		help_text="Tag appearing on the same questions."
+	)
+	count = models.PositiveIntegerField(help_text="Number of questions carrying both tags.")
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=['tag', 'related'], name='unique_tag_cooccurrence'),
+		]
+		indexes = [
+			# Serves "top related tags for a tag" as an index range scan.
+			models.Index(fields=['tag', '-count'], name='tag_cooccurrence_top_idx'),
+		]
+
+	def __str__(self):
+		return f'{self.tag} ~ {self.related} ({self.count})'
+
+
+class StaleTagCooccurrence(models.Model):
+	"""
+	A tag added to or removed from a question since its co-occurrence rows were
+	last counted. The next incremental ``build_related_tags`` run recomputes
+	those rows; see tags/related.py.
+	"""
+	tag = models.OneToOneField(
+		to=Tag,
+		on_delete=models.CASCADE,
+		primary_key=True,
+		related_name='+',
+		help_text="Tag whose co-occurrence rows are out of date."
+	)
+	marked_at = models.DateTimeField(help_text="When the tag's question links last changed.")
+
+	def __str__(self):
+		return f'{self.tag} @ {self.marked_at}'
+
+
+class JobCheckpoint(models.Model):
+	"""
+	Remembers when an incremental batch job last completed successfully.
+	"""
+	name = models.CharField(max_length=50, unique=True, help_text="Batch job identifier.")
+	last_run_at = models.DateTimeField(help_text="Start time of the last successful run.")
+
+	def __str__(self):
+		return f'{self.name} @ {self.last_run_at}'
+
+
+class TagActivityBucket(models.Model):
+	"""
+	Hourly activity counter for a tag (questions tagged, answers posted).
+
+	Trending scores are computed from these buckets with exponential time decay,
+	without scanning questions; see tags/trending.py.
+	"""
+	tag = models.ForeignKey(
+		to=Tag,
+		on_delete=models.CASCADE,
+		related_name='activity_buckets',
+		help_text="Tag the activity counts towards."
+	)
+	hour = models.DateTimeField(db_index=True, help_text="Start of the hour this bucket covers.")
+	count = models.PositiveIntegerField(default=0, help_text="Weighted activity within the hour.")
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=['tag', 'hour'], name='unique_tag_activity_bucket'),
+		]
+
+	def __str__(self):
+		return f'{self.tag} @ {self.hour:%Y-%m-%d %H:00}: {self.count}'
+
+
+class TagSynonym(models.Model):
+	"""
+	Alternative name for a tag, e.g. left behind when a tag is merged or renamed.
+
+	User-entered tag names and old tag URLs resolve through synonyms to the
+	canonical tag; see tags/synonyms.py.
+	"""
+	name = models.CharField(max_length=30, help_text="Alternative tag name (e.g. 'py').")
+	slug = models.SlugField(max_length=40, unique=True, help_text="Slugified name used for lookups.")
+	tag = models.ForeignKey(
+		to=Tag,
+		on_delete=models.CASCADE,
+		related_name='synonyms',
+		help_text="Canonical tag this name resolves to."
+	)
+
+	def save(self, *args, **kwargs):
+		"""Derive the lookup slug from the name, like Tag does."""
+		self.slug = slugify(self.name)
+		super().save(*args, **kwargs)
+
+	def __str__(self):
+		return f'{self.name} → {self.tag}'
@@ -0,0 +1,148 @@
+"""
+Related-tag suggestions built from a batch-computed co-occurrence matrix.
+
+Counting co-occurrence live is a self-join over the question/tag through
+table, so the matrix is (re)built offline by the ``build_related_tags``
+management command and read back through a cached lookup.
+
+Incremental runs only recompute the rows of affected tags: those carried by
+questions edited since the previous run, and those marked stale by signal
+handlers (see tags/signals.py) when they were added to or removed from a
+question, including through tags.set()/clear() and question deletion, none of
+which edit the question. Tag merges (tags/synonyms.py) move links with raw
+SQL and mark the tags involved themselves. A link change only alters pairs
+involving the tag linked or unlinked, and the matrix is symmetric, so
+recomputing every pair that involves an affected tag brings the stored pairs
+up to date. Other raw SQL on the through table needs a full rebuild.
+"""
+
+import uuid
+from collections import Counter
+from itertools import groupby
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from questions.models import Question
+from .models import StaleTagCooccurrence, TagCooccurrence
+
+VERSION_KEY = 'tags:related:version'
+DATA_KEY = 'tags:related:{version}:{tag_id}:{limit}'
+DATA_TIMEOUT = 60 * 60
+BATCH_SIZE = 2000
+
+TagLink = Question.tags.through
+
+
+def count_cooccurrences(affected_tag_ids=None):
+	"""
+	Count ordered tag pairs appearing on the same question.
+
+	With ``affected_tag_ids`` only pairs involving at least one of those tags are
+	counted, reading only the questions that carry them. Returns a Counter
+	keyed on (tag_id, related_id).
+	"""
+	links = TagLink.objects.order_by('question_id', 'tag_id')
+	if affected_tag_ids is not None:
+		links = links.filter(
+			question_id__in=TagLink.objects.filter(tag_id__in=affected_tag_ids).values('question_id')
+		)
+
+	counts = Counter()
+	rows = links.values_list('question_id', 'tag_id').iterator(chunk_size=BATCH_SIZE)
+	for _, group in groupby(rows, key=lambda row: row[0]):
+		tag_ids = [tag_id for _, tag_id in group]
+		for tag_id in tag_ids:
+			for related_id in tag_ids:
+				if tag_id == related_id:
+					continue
+				if affected_tag_ids is None or tag_id in affected_tag_ids or related_id in affected_tag_ids:
+					counts[tag_id, related_id] += 1
+	return counts
+
+
+def rebuild_cooccurrences(affected_tag_ids=None):
+	"""
+	Replace the stored matrix rows for ``affected_tag_ids`` (all rows if None).
+	Returns the number of stored pairs written.
+	"""
+	if affected_tag_ids is not None:
+		affected_tag_ids = set(affected_tag_ids)
+		if not affected_tag_ids:
+			return 0
+
+	counts = count_cooccurrences(affected_tag_ids)
+	with transaction.atomic():
+		stale = TagCooccurrence.objects.all()
+		if affected_tag_ids is not None:
+			stale = stale.filter(tag_id__in=affected_tag_ids) | stale.filter(related_id__in=affected_tag_ids)
+		stale.delete()
+		TagCooccurrence.objects.bulk_create(
+			(
+				TagCooccurrence(tag_id=tag_id, related_id=related_id, count=count)
+				for (tag_id, related_id), count in counts.items()
+			),
+			batch_size=BATCH_SIZE,
+		)
+	bump_related_version()
+	return len(counts)
+
+
+def tags_of_questions_changed_since(since):
+	"""Ids of tags currently carried by questions created or edited after ``since``."""
+	return set(
+		TagLink.objects
+		.filter(question__updated_at__gte=since)
+		.values_list('tag_id', flat=True)
+		.distinct()
+	)
+
+
+def mark_tags_stale(tag_ids):
+	"""Have the next incremental build recompute the rows of ``tag_ids``."""
+	now = timezone.now()
+	StaleTagCooccurrence.objects.bulk_create(
+		[StaleTagCooccurrence(tag_id=tag_id, marked_at=now) for tag_id in set(tag_ids)],
+		update_conflicts=True, unique_fields=['tag'], update_fields=['marked_at'],
+	)
+
+
+def stale_tag_ids():
+	"""Ids of tags marked stale by mark_tags_stale() and not yet forgotten."""
+	return set(StaleTagCooccurrence.objects.values_list('tag_id', flat=True))
+
+
+def forget_stale_tags(before):
+	"""Unmark tags marked before ``before``, the start of a build that recomputed them."""
+	StaleTagCooccurrence.objects.filter(marked_at__lt=before).delete()
+
+
+def bump_related_version():
+	"""Invalidate every cached related-tags response."""
+	cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def get_related_tags(tag_id, limit=10):
+	"""
+	Return up to ``limit`` related tags for a tag, most frequent first, as dicts
+	with id, name, slug and count. Cached until the matrix is rebuilt.
+	"""
+	version = cache.get(VERSION_KEY)
+	if version is None:
+		bump_related_version()
+		version = cache.get(VERSION_KEY)
+	key = DATA_KEY.format(version=version, tag_id=tag_id, limit=limit)
+	related = cache.get(key)
+	if related is None:
+		related = [
+			{'id': row.related_id, 'name': row.related.name, 'slug': row.related.slug, 'count': row.count}
+			for row in (
+				TagCooccurrence.objects
+				.filter(tag_id=tag_id)
+				.select_related('related')
+				.order_by('-count', 'related__name')[:limit]
+			)
+		]
+		cache.set(key, related, DATA_TIMEOUT)
+	return related
@@ -1,6 +1,12 @@
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
-from .models import Tag
+
+from answers.models import Answer
+from questions.models import Question
+from .catalogue import get_tag_catalogue, invalidate_catalogue
+from .models import Tag, TagSynonym
+from .related import mark_tags_stale
+from .trending import record_tag_activity, QUESTION_TAGGED_WEIGHT, ANSWER_POSTED_WEIGHT
 
 
 @receiver(post_migrate)
@@ -8,3 +14,77 @@ def create_default_tags_once(sender, **kwargs):
 	default_tags = ['Python', 'Django', 'WebDev', 'Database', 'API']
 	for name in default_tags:
 		Tag.objects.get_or_create(name=name)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, **kwargs):
+	"""Any tag create/rename/delete invalidates the tag catalogue."""
+	invalidate_catalogue()
+
+
+@receiver(post_save, sender=TagSynonym)
+@receiver(post_delete, sender=TagSynonym)
+def synonym_changed(sender, **kwargs):
+	"""Synonyms are part of the catalogue, for tag autocomplete."""
+	invalidate_catalogue()
+
+
+@receiver(m2m_changed, sender=Question.tags.through)
+def question_tags_changed(sender, action, **kwargs):
+	"""Tagging or untagging questions changes the catalogue's question counts."""
+	if action in ('post_add', 'post_remove', 'post_clear'):
+		invalidate_catalogue()
+
+
+@receiver(m2m_changed, sender=Question.tags.through)
+def question_tagged(sender, instance, action, reverse, pk_set, **kwargs):
+	"""Count newly added tags (on create or retag) as trending activity."""
+	if action != 'post_add' or not pk_set:
+		return
+	if reverse:
+		# tag.questions.add(...): one tag gained several questions.
+		record_tag_activity([instance.pk], QUESTION_TAGGED_WEIGHT * len(pk_set))
+	else:
+		record_tag_activity(pk_set, QUESTION_TAGGED_WEIGHT)
+
+
+@receiver(m2m_changed, sender=Question.tags.through)
+def question_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+	"""Mark the tags linked or unlinked for the next incremental related-tags build."""
+	if action not in ('post_add', 'pre_remove', 'pre_clear'):
+		return
+	if reverse:
+		# tag.questions.add/remove/clear(...): only this tag's pairs change.
+		mark_tags_stale([instance.pk])
+	elif action == 'pre_clear':
+		mark_tags_stale(instance.tags.values_list('id', flat=True))
+	elif pk_set:
+		mark_tags_stale(pk_set)
+
+
+@receiver(pre_delete, sender=Question)
+def question_deleting(sender, instance, **kwargs):
+	"""Its tag links go with it, without m2m_changed; mark the tags for the related-tags build."""
+	mark_tags_stale(instance.tags.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Answer)
+def answer_posted(sender, instance, created, **kwargs):
+	"""A new answer counts as activity for every tag of its question."""
+	if created:
+		tag_ids = instance.question.tags.values_list('id', flat=True)
+		record_tag_activity(tag_ids, ANSWER_POSTED_WEIGHT)
+
+
+@receiver(post_save, sender=Question)
+def question_created(sender, created, **kwargs):
+	"""The first question flips the catalogue's has_questions flag."""
+	if created and not get_tag_catalogue().has_questions:
+		invalidate_catalogue()
+
+
+@receiver(post_delete, sender=Question)
+def question_deleted(sender, **kwargs):
+	"""Deleting a question drops its tag links without sending m2m_changed."""
+	invalidate_catalogue()
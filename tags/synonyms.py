@@ -0,0 +1,127 @@
+"""
+Tag merging, renaming and synonym resolution.
+
+Merging moves every question/tag link from the source tag to the target with
+two set-based statements inside one transaction, instead of re-tagging
+question by question: no per-row m2m_changed signals fire, and the only
+invalidation is the single post_delete of the source tag. The source's name
+is kept as a TagSynonym, so user-entered names and old tag URLs keep
+resolving to the surviving tag.
+"""
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils.text import slugify
+
+from questions.models import Question
+from .catalogue import get_tag_by_slug
+from .models import TagActivityBucket, TagSynonym
+from .related import bump_related_version, mark_tags_stale
+
+TagLink = Question.tags.through
+
+
+def resolve_tag_names(names):
+	"""
+	Map user-entered tag names to tag ids through tag slugs, then synonyms.
+	Returns {name: tag_id} for the names that resolve; unknown names are left out.
+	"""
+	resolved = {}
+	unresolved = {}
+	for name in names:
+		slug = slugify(name)
+		tag = get_tag_by_slug(slug)
+		if tag is not None:
+			resolved[name] = tag.id
+		else:
+			unresolved.setdefault(slug, []).append(name)
+	if unresolved:
+		for slug, tag_id in TagSynonym.objects.filter(slug__in=unresolved).values_list('slug', 'tag_id'):
+			for name in unresolved[slug]:
+				resolved[name] = tag_id
+	return resolved
+
+
+def merge_tags(source, target):
+	"""
+	Merge tag ``source`` into ``target`` and delete ``source``.
+
+	Questions carrying both tags keep a single link to ``target``. Activity
+	buckets and synonyms move to ``target``, and the source's name becomes a
+	synonym of it. Returns the number of questions that carried ``source``.
+	"""
+	if source.pk == target.pk:
+		raise ValueError("Cannot merge a tag into itself.")
+
+	table = connection.ops.quote_name(TagLink._meta.db_table)
+	question_column = connection.ops.quote_name(TagLink._meta.get_field('question').column)
+	tag_column = connection.ops.quote_name(TagLink._meta.get_field('tag').column)
+
+	with transaction.atomic():
+		source_links = TagLink.objects.filter(tag_id=source.pk)
+		moved = source_links.count()
+		# The target's related-tag pairs change, and those of every tag on the moved questions.
+		co_tags = (
+			TagLink.objects
+			.filter(question_id__in=source_links.values('question_id'))
+			.exclude(tag_id=source.pk)
+			.values_list('tag_id', flat=True)
+			.distinct()
+		)
+		mark_tags_stale([target.pk, *co_tags])
+
+		with connection.cursor() as cursor:
+			cursor.execute(
+				f'INSERT INTO {table} ({question_column}, {tag_column}) '
+				f'SELECT {question_column}, %s FROM {table} WHERE {tag_column} = %s '
+				f'ON CONFLICT DO NOTHING',
+				[target.pk, source.pk],
+			)
+			cursor.execute(f'DELETE FROM {table} WHERE {tag_column} = %s', [source.pk])
+
+		_merge_activity_buckets(source, target)
+		TagSynonym.objects.filter(tag=source).update(tag=target)
+		TagSynonym.objects.update_or_create(
+			slug=slugify(source.name),
+			defaults={'name': source.name, 'tag': target},
+		)
+		# Cascades co-occurrence rows; its post_delete invalidates the catalogue once.
+		source.delete()
+		transaction.on_commit(bump_related_version)
+	return moved
+
+
+def _merge_activity_buckets(source, target):
+	"""Add the source's hourly activity into the target's buckets."""
+	source_counts = dict(
+		TagActivityBucket.objects.filter(tag=source).values_list('hour', 'count')
+	)
+	if not source_counts:
+		return
+	existing = TagActivityBucket.objects.filter(tag=target, hour__in=list(source_counts))
+	existing_hours = set(existing.values_list('hour', flat=True))
+	for hour in existing_hours:
+		existing.filter(hour=hour).update(count=F('count') + source_counts[hour])
+	TagActivityBucket.objects.bulk_create([
+		TagActivityBucket(tag=target, hour=hour, count=count)
+		for hour, count in source_counts.items()
+		if hour not in existing_hours
+	])
+
+
+def rename_tag(tag, new_name):
+	"""
+	Rename ``tag`` and keep its previous name as a synonym, so that links
+	to the old slug and the old name as typed by users still resolve.
+	"""
+	old_name = tag.name
+	with transaction.atomic():
+		tag.name = new_name
+		tag.save()
+		if slugify(old_name) != tag.slug:
+			TagSynonym.objects.update_or_create(
+				slug=slugify(old_name),
+				defaults={'name': old_name, 'tag': tag},
+			)
+		TagSynonym.objects.filter(tag=tag, slug=tag.slug).delete()
+	return tag
@@ -1,16 +1,35 @@
 """
 Unit tests for the Tag model and Tag admin logic.
 
-Covers creation, string representation, slug logic, validation, and admin
-readonly logic depending on user group membership ("Staff Moderators").
+Covers creation, string representation, slug logic, validation, admin
+readonly logic depending on user group membership ("Staff Moderators"),
+the cached tag catalogue, related-tag co-occurrence, trending tags,
+the public tag pages, tag merging/synonyms and tag autocomplete.
 """
 
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models.signals import m2m_changed
 from django.test import TestCase, RequestFactory
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User, Group
 from django.contrib import admin
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.text import slugify
 
-from .models import Tag
+from DjangoQandAPlatform.testing import QueryBudgetMixin
+from answers.models import Answer
+from questions.forms import QuestionCreateForm
+from questions.models import Question
+from .autocomplete import autocomplete_tags
+from .catalogue import get_tag_catalogue
+from .models import StaleTagCooccurrence, Tag, TagCooccurrence, TagActivityBucket, TagSynonym
+from .synonyms import merge_tags, rename_tag, resolve_tag_names
+from .trending import compute_trending_scores, current_hour, get_trending_tags, prune_activity, record_tag_activity
 
 
 class TagModelTests(TestCase):
@@ -48,3 +67,374 @@ class TagModelTests(TestCase):
 		tag = Tag(name="DjangoT", slug="custom-slug")
 		tag.save()
 		self.assertEqual(tag.slug, slugify('DjangoT'))
+
+	def test_colliding_slugs_get_suffix(self):
+		"""
+		Names that slugify alike still get distinct slugs; re-saving keeps them stable.
+		"""
+		first = Tag.objects.create(name="C++")
+		second = Tag.objects.create(name="C#")
+		self.assertEqual((first.slug, second.slug), ('c', 'c-2'))
+		second.save()
+		self.assertEqual(second.slug, 'c-2')
+
+
+class TagCatalogueTests(TestCase):
+	"""
+	Tests for the cached tag catalogue and its signal-driven invalidation.
+	"""
+
+	def setUp(self):
+		cache.clear()
+		self.user = get_user_model().objects.create_user(username='cataloguer', password='pw')
+		self.tag = Tag.objects.create(name='CatalogueT')
+
+	def entry(self, tag):
+		return next(t for t in get_tag_catalogue().tags if t.id == tag.id)
+
+	def test_warm_catalogue_costs_no_queries(self):
+		get_tag_catalogue()
+		with self.assertNumQueries(0):
+			catalogue = get_tag_catalogue()
+		self.assertIn(self.tag.id, [t.id for t in catalogue.tags])
+		self.assertEqual(self.entry(self.tag).slug, 'cataloguet')
+
+	def test_tag_changes_invalidate(self):
+		get_tag_catalogue()
+		self.tag.name = 'RenamedT'
+		self.tag.save()
+		self.assertEqual(self.entry(self.tag).name, 'RenamedT')
+		self.tag.delete()
+		self.assertNotIn('RenamedT', [t.name for t in get_tag_catalogue().tags])
+
+	def test_tagging_updates_counts(self):
+		self.assertFalse(get_tag_catalogue().has_questions)
+		question = Question.objects.create(title='Tagged', body='Body', author=self.user)
+		self.assertTrue(get_tag_catalogue().has_questions)
+		question.tags.add(self.tag)
+		self.assertEqual(self.entry(self.tag).question_count, 1)
+		question.delete()
+		self.assertEqual(self.entry(self.tag).question_count, 0)
+
+	def test_question_form_tag_choices_cost_no_queries(self):
+		get_tag_catalogue()
+		form = QuestionCreateForm(initial={'tags': [self.tag.pk]})
+		with self.assertNumQueries(0):
+			html = str(form['tags'])
+		self.assertIn('CatalogueT', html)
+		# Unselected tags are left to the autocomplete endpoint.
+		self.assertNotIn('>Django<', html)
+		self.assertIn(reverse('tag-autocomplete-api'), html)
+
+	def test_tag_catalogue_api(self):
+		resp = self.client.get(reverse('tag-catalogue-api'))
+		self.assertEqual(resp.status_code, 200)
+		self.assertIn(
+			{'id': self.tag.id, 'name': 'CatalogueT', 'slug': 'cataloguet', 'question_count': 0},
+			resp.json(),
+		)
+
+
+class RelatedTagsTests(TestCase):
+	"""
+	Tests for the batch co-occurrence matrix and the related-tags endpoint.
+	"""
+
+	def setUp(self):
+		cache.clear()
+		user = get_user_model().objects.create_user(username='relater', password='pw')
+		self.a, self.b, self.c = (Tag.objects.create(name=n) for n in ('RelA', 'RelB', 'RelC'))
+		self.q1 = Question.objects.create(title='Q1', body='Body', author=user)
+		self.q1.tags.add(self.a, self.b, self.c)
+		self.q2 = Question.objects.create(title='Q2', body='Body', author=user)
+		self.q2.tags.add(self.a, self.b)
+
+	def pairs(self):
+		return {
+			(row.tag_id, row.related_id): row.count
+			for row in TagCooccurrence.objects.filter(tag__name__startswith='Rel')
+		}
+
+	def test_full_build_counts_pairs_symmetrically(self):
+		call_command('build_related_tags', stdout=StringIO())
+		pairs = self.pairs()
+		self.assertEqual(pairs[self.a.id, self.b.id], 2)
+		self.assertEqual(pairs[self.b.id, self.a.id], 2)
+		self.assertEqual(pairs[self.a.id, self.c.id], 1)
+		self.assertEqual(len(pairs), 6)
+
+	def test_incremental_run_updates_changed_questions(self):
+		call_command('build_related_tags', stdout=StringIO())
+		self.q2.tags.remove(self.b)
+		self.q2.tags.add(self.c)
+		self.q2.save()  # Form saves bump updated_at alongside the m2m change
+		call_command('build_related_tags', stdout=StringIO())
+		pairs = self.pairs()
+		self.assertEqual(pairs[self.a.id, self.b.id], 1)
+		self.assertEqual(pairs[self.b.id, self.a.id], 1)
+		self.assertEqual(pairs[self.a.id, self.c.id], 2)
+		self.assertEqual(pairs[self.c.id, self.a.id], 2)
+
+	def test_incremental_run_follows_links_changed_without_edits(self):
+		call_command('build_related_tags', stdout=StringIO())
+		self.q2.tags.set([self.a, self.c])
+		self.q1.tags.clear()
+		call_command('build_related_tags', stdout=StringIO())
+		self.assertEqual(self.pairs(), {(self.a.id, self.c.id): 1, (self.c.id, self.a.id): 1})
+		self.assertFalse(StaleTagCooccurrence.objects.exists())
+
+		self.q2.delete()
+		call_command('build_related_tags', stdout=StringIO())
+		self.assertEqual(self.pairs(), {})
+
+	def test_related_tags_api(self):
+		call_command('build_related_tags', stdout=StringIO())
+		url = reverse('related-tags-api', args=[self.a.id])
+		data = self.client.get(url).json()
+		self.assertEqual([t['name'] for t in data], ['RelB', 'RelC'])
+		self.assertEqual(data[0]['count'], 2)
+		with self.assertNumQueries(0):
+			self.client.get(url)
+		self.assertEqual(self.client.get(reverse('related-tags-api', args=[999999])).status_code, 404)
+
+
+class TrendingTagsTests(TestCase):
+	"""
+	Tests for hourly activity buckets and decayed trending scores.
+	"""
+
+	def setUp(self):
+		cache.clear()
+		self.user = get_user_model().objects.create_user(username='trender', password='pw')
+		self.hot = Tag.objects.create(name='HotT')
+		self.cold = Tag.objects.create(name='ColdT')
+
+	def test_tagging_and_answers_fill_buckets(self):
+		question = Question.objects.create(title='Trend', body='Body', author=self.user)
+		question.tags.add(self.hot)
+		Answer.objects.create(question=question, author=self.user, content='Answer')
+		bucket = TagActivityBucket.objects.get(tag=self.hot)
+		self.assertEqual(bucket.hour, current_hour())
+		self.assertEqual(bucket.count, 3)  # tagged (2) + answered (1)
+
+	def test_scores_decay_with_age(self):
+		now = timezone.now()
+		record_tag_activity([self.hot.id], 4, now=now)
+		record_tag_activity([self.cold.id], 4, now=now - timedelta(hours=12))
+		scores = compute_trending_scores(now=now)
+		self.assertAlmostEqual(scores[self.hot.id], 4)
+		self.assertAlmostEqual(scores[self.cold.id], 2)
+		self.assertEqual([t['name'] for t in get_trending_tags()][:2], ['HotT', 'ColdT'])
+
+	def test_prune_removes_expired_buckets(self):
+		record_tag_activity([self.cold.id], 1, now=timezone.now() - timedelta(days=10))
+		record_tag_activity([self.hot.id], 1)
+		self.assertEqual(prune_activity(), 1)
+		self.assertEqual(list(TagActivityBucket.objects.values_list('tag_id', flat=True)), [self.hot.id])
+
+
+class TagPageTests(TestCase):
+	"""
+	Tests for the tag index and the per-tag keyset-paginated question pages.
+	"""
+
+	def setUp(self):
+		cache.clear()
+		self.user = get_user_model().objects.create_user(username='tagpager', password='pw')
+		self.tag = Tag.objects.create(name='PagedT')
+		self.other = Tag.objects.create(name='OtherT')
+		for i in range(25):
+			question = Question.objects.create(title=f'Paged {i:02d}', body='Body', author=self.user)
+			question.tags.add(self.tag)
+		Question.objects.create(title='Untagged', body='Body', author=self.user).tags.add(self.other)
+
+	def test_index_sorted_by_popularity(self):
+		resp = self.client.get(reverse('tag-list'))
+		self.assertEqual(resp.status_code, 200)
+		names = [tag.name for tag in resp.context['tags']]
+		self.assertLess(names.index('PagedT'), names.index('OtherT'))
+		self.assertContains(resp, reverse('tag-details', args=['pagedt']))
+
+	def test_keyset_pagination_walks_all_questions(self):
+		url = reverse('tag-details', args=['pagedt'])
+		resp = self.client.get(url)
+		self.assertEqual(resp.status_code, 200)
+		self.assertEqual(resp.context['tag'].question_count, 25)
+		seen = [q.title for q in resp.context['questions']]
+		self.assertEqual(len(seen), 20)
+		resp = self.client.get(url, {'cursor': resp.context['next_cursor']})
+		seen += [q.title for q in resp.context['questions']]
+		self.assertIsNone(resp.context['next_cursor'])
+		self.assertEqual(seen, [f'Paged {i:02d}' for i in reversed(range(25))])
+
+	def test_unknown_slug_and_bad_cursor(self):
+		self.assertEqual(self.client.get(reverse('tag-details', args=['nope'])).status_code, 404)
+		resp = self.client.get(reverse('tag-details', args=['pagedt']), {'cursor': 'garbage'})
+		self.assertEqual(resp.status_code, 400)
+
+
+class TagMergeTests(TestCase):
+	"""
+	Tests for set-based tag merging, renaming and synonym resolution.
+	"""
+
+	def setUp(self):
+		cache.clear()
+		self.user = get_user_model().objects.create_user(username='merger', password='pw')
+		self.source = Tag.objects.create(name='js')
+		self.target = Tag.objects.create(name='javascript')
+		self.only_source = Question.objects.create(title='Only js', body='Body', author=self.user)
+		self.only_source.tags.add(self.source)
+		self.both = Question.objects.create(title='Both', body='Body', author=self.user)
+		self.both.tags.add(self.source, self.target)
+
+	def test_merge_moves_links_without_per_row_signals(self):
+		received = []
+		handler = lambda **kwargs: received.append(kwargs['action'])
+		m2m_changed.connect(handler, sender=Question.tags.through)
+		try:
+			moved = merge_tags(self.source, self.target)
+		finally:
+			m2m_changed.disconnect(handler, sender=Question.tags.through)
+
+		self.assertEqual(moved, 2)
+		self.assertEqual(received, [])
+		self.assertFalse(Tag.objects.filter(pk=self.source.pk).exists())
+		self.assertEqual(list(self.only_source.tags.all()), [self.target])
+		self.assertEqual(list(self.both.tags.all()), [self.target])
+		entry = next(t for t in get_tag_catalogue().tags if t.id == self.target.id)
+		self.assertEqual(entry.question_count, 2)
+
+	def test_merge_updates_related_tags_incrementally(self):
+		other = Tag.objects.create(name='node')
+		self.only_source.tags.add(other)
+		call_command('build_related_tags', stdout=StringIO())
+		edited = self.only_source.updated_at
+		merge_tags(self.source, self.target)
+		call_command('build_related_tags', stdout=StringIO())
+		self.assertEqual(
+			set(TagCooccurrence.objects.values_list('tag_id', 'related_id', 'count')),
+			{(self.target.pk, other.pk, 1), (other.pk, self.target.pk, 1)},
+		)
+		self.only_source.refresh_from_db()
+		self.assertEqual(self.only_source.updated_at, edited)
+
+	def test_merge_moves_activity_and_leaves_synonym(self):
+		TagActivityBucket.objects.all().delete()
+		record_tag_activity([self.source.pk, self.target.pk], weight=3)
+		merge_tags(self.source, self.target)
+		self.assertEqual(TagActivityBucket.objects.get(tag=self.target).count, 6)
+		self.assertEqual(TagSynonym.objects.get(slug='js').tag, self.target)
+		self.assertEqual(resolve_tag_names(['js', 'JavaScript', 'nope']), {'js': self.target.pk, 'JavaScript': self.target.pk})
+		self.assertRedirects(
+			self.client.get(reverse('tag-details', args=['js'])),
+			reverse('tag-details', args=['javascript']),
+			status_code=301,
+		)
+
+	def test_rename_keeps_old_name_as_synonym(self):
+		rename_tag(self.target, 'ECMAScript')
+		self.assertEqual(self.target.slug, 'ecmascript')
+		self.assertEqual(TagSynonym.objects.get(slug='javascript').tag, self.target)
+
+	def test_form_accepts_synonym_names(self):
+		merge_tags(self.source, self.target)
+		form = QuestionCreateForm(data={'title': 'T', 'body': 'B', 'tags': ['js']})
+		self.assertTrue(form.is_valid(), form.errors)
+		self.assertEqual(list(form.cleaned_data['tags']), [self.target])
+		form = QuestionCreateForm(data={'title': 'T', 'body': 'B', 'tags': ['unknown']})
+		self.assertFalse(form.is_valid())
+
+	def test_question_form_accepts_typed_synonym(self):
+		merge_tags(self.source, self.target)
+		self.client.force_login(self.user)
+		url = reverse('question_create')
+		self.assertContains(self.client.get(url), 'class="tag-autocomplete-input"')
+
+		# Re-displayed after an error, the typed name shows as its canonical tag.
+		resp = self.client.post(url, {'title': '', 'body': 'B', 'tags': ['js']})
+		self.assertContains(resp, f'<option value="{self.target.pk}" selected>javascript</option>', html=True)
+
+		resp = self.client.post(url, {'title': 'Typed', 'body': 'B', 'tags': ['js']})
+		question = Question.objects.get(title='Typed')
+		self.assertRedirects(resp, reverse('question_details', args=[question.pk]))
+		self.assertEqual(list(question.tags.all()), [self.target])
+
+	def test_admin_merge_action(self):
+		admin_user = get_user_model().objects.create_superuser(username='boss', password='pw', email='b@example.com')
+		self.client.force_login(admin_user)
+		url = reverse('admin:tags_tag_changelist')
+		data = {'action': 'merge_selected_tags', admin.helpers.ACTION_CHECKBOX_NAME: [self.source.pk]}
+		resp = self.client.post(url, data)
+		self.assertContains(resp, 'name="apply"')
+		resp = self.client.post(url, {**data, 'apply': '1', 'target': self.target.pk})
+		self.assertEqual(resp.status_code, 302)
+		self.assertFalse(Tag.objects.filter(pk=self.source.pk).exists())
+
+
+class TagAutocompleteTests(TestCase):
+	"""
+	Tests for the prefix-index tag autocomplete and its API endpoint.
+	"""
+
+	def setUp(self):
+		cache.clear()
+		self.user = get_user_model().objects.create_user(username='completer', password='pw')
+		self.rare = Tag.objects.create(name='Pyramid')
+		self.popular = Tag.objects.create(name='PyTest')
+		question = Question.objects.create(title='Tested', body='Body', author=self.user)
+		question.tags.add(self.popular)
+
+	def test_prefix_matches_ranked_by_usage(self):
+		autocomplete_tags('py')
+		with self.assertNumQueries(0):
+			names = [tag.name for tag in autocomplete_tags('py')]
+		self.assertEqual(names[0], 'PyTest')
+		self.assertEqual(set(names), {'PyTest', 'Pyramid', 'Python'})
+		self.assertEqual([tag.name for tag in autocomplete_tags('PYR')], ['Pyramid'])
+		self.assertEqual(autocomplete_tags(''), [])
+		self.assertEqual(len(autocomplete_tags('py', limit=1)), 1)
+
+	def test_index_follows_catalogue_changes(self):
+		self.assertEqual(autocomplete_tags('pyo'), [])
+		Tag.objects.create(name='Pyodide')
+		self.assertEqual([tag.name for tag in autocomplete_tags('pyo')], ['Pyodide'])
+
+	def test_synonym_prefix_suggests_canonical_tag(self):
+		self.assertEqual(autocomplete_tags('unittests'), [])
+		TagSynonym.objects.create(name='UnitTests', slug='unittests', tag=self.popular)
+		self.assertEqual([tag.name for tag in autocomplete_tags('unit')], ['PyTest'])
+		rename_tag(self.rare, 'Pyro')
+		self.assertEqual([tag.name for tag in autocomplete_tags('pyra')], ['Pyro'])
+
+	def test_autocomplete_api(self):
+		resp = self.client.get(reverse('tag-autocomplete-api'), {'q': 'pyt', 'limit': 1})
+		self.assertEqual(resp.status_code, 200)
+		self.assertEqual(
+			resp.json(),
+			[{'id': self.popular.id, 'name': 'PyTest', 'slug': 'pytest', 'question_count': 1}],
+		)
+
+
+class TagQueryBudgetTest(QueryBudgetMixin, TestCase):
+	"""
+	Query budgets for the tag pages, over growing numbers of tags and questions.
+	"""
+
+	def setUp(self):
+		self.user = get_user_model().objects.create_user(username='budgeter', password='pw')
+		self.tag = Tag.objects.create(name='budget')
+
+	def add_tagged_questions(self, size):
+		tags = [Tag.objects.create(name=f'budget{i}') for i in range(size)]
+		for i in range(size):
+			question = Question.objects.create(title=f'Q{i}', body='Body', author=self.user)
+			question.tags.add(self.tag, tags[i])
+
+	def test_tag_list(self):
+		# Counts come from the cached catalogue
+		self.assertQueryBudget(0, lambda: self.client.get(reverse('tag-list')), self.add_tagged_questions)
+
+	def test_tag_details(self):
+		url = reverse('tag-details', args=[self.tag.slug])
+		self.assertQueryBudget(1, lambda: self.client.get(url), self.add_tagged_questions)
@@ -0,0 +1,102 @@
+"""
+Trending tags from time-bucketed activity counters.
+
+Activity (a question being tagged, an answer on a tagged question) increments
+an hourly TagActivityBucket per tag. A tag's trending score is the sum of its
+bucket counts weighted by exponential decay on bucket age, so computing it
+reads at most WINDOW_HOURS buckets per tag and never scans questions.
+"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .catalogue import get_tag_catalogue
+from .models import TagActivityBucket
+
+QUESTION_TAGGED_WEIGHT = 2
+ANSWER_POSTED_WEIGHT = 1
+
+WINDOW_HOURS = 72
+HALF_LIFE_HOURS = 12
+
+CACHE_KEY = 'tags:trending:{limit}'
+CACHE_TIMEOUT = 5 * 60
+
+
+def current_hour(now=None):
+	"""Truncate a timestamp to the start of its hour."""
+	return (now or timezone.now()).replace(minute=0, second=0, microsecond=0)
+
+
+def record_tag_activity(tag_ids, weight=1, now=None):
+	"""
+	Add ``weight`` to the current hour's bucket of every tag in ``tag_ids``.
+	"""
+	tag_ids = set(tag_ids)
+	if not tag_ids:
+		return
+	hour = current_hour(now)
+	buckets = TagActivityBucket.objects.filter(hour=hour)
+	with transaction.atomic():
+		existing = set(buckets.filter(tag_id__in=tag_ids).values_list('tag_id', flat=True))
+		if existing:
+			buckets.filter(tag_id__in=existing).update(count=F('count') + weight)
+		# A concurrent insert of the same bucket wins; losing one increment is fine for trends.
+		TagActivityBucket.objects.bulk_create(
+			[TagActivityBucket(tag_id=tag_id, hour=hour, count=weight) for tag_id in tag_ids - existing],
+			ignore_conflicts=True,
+		)
+
+
+def compute_trending_scores(now=None):
+	"""
+	Return {tag_id: score} over the buckets inside the trending window.
+	A bucket's count halves every HALF_LIFE_HOURS of age.
+	"""
+	hour = current_hour(now)
+	scores = {}
+	buckets = TagActivityBucket.objects.filter(
+		hour__gt=hour - timedelta(hours=WINDOW_HOURS)
+	).values_list('tag_id', 'hour', 'count')
+	for tag_id, bucket_hour, count in buckets:
+		age_hours = (hour - bucket_hour).total_seconds() / 3600
+		scores[tag_id] = scores.get(tag_id, 0.0) + count * 0.5 ** (age_hours / HALF_LIFE_HOURS)
+	return scores
+
+
+def get_trending_tags(limit=10):
+	"""
+	Return up to ``limit`` trending tags as dicts (id, name, slug, score),
+	highest score first. Cached for CACHE_TIMEOUT seconds.
+	"""
+	key = CACHE_KEY.format(limit=limit)
+	trending = cache.get(key)
+	if trending is None:
+		tags_by_id = {tag.id: tag for tag in get_tag_catalogue().tags}
+		scores = compute_trending_scores()
+		ranked = sorted(
+			(tag_id for tag_id in scores if tag_id in tags_by_id),
+			key=lambda tag_id: (-scores[tag_id], tags_by_id[tag_id].name),
+		)
+		trending = [
+			{
+				'id': tag_id,
+				'name': tags_by_id[tag_id].name,
+				'slug': tags_by_id[tag_id].slug,
+				'score': round(scores[tag_id], 3),
+			}
+			for tag_id in ranked[:limit]
+		]
+		cache.set(key, trending, CACHE_TIMEOUT)
+	return trending
+
+
+def prune_activity(now=None):
+	"""Delete buckets that fell out of the trending window. Returns the number deleted."""
+	cutoff = current_hour(now) - timedelta(hours=WINDOW_HOURS)
+	deleted, _ = TagActivityBucket.objects.filter(hour__lte=cutoff).delete()
+	return deleted
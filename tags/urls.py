@@ -0,0 +1,14 @@
+"""
+tags/urls.py
+
+Routing for the tag index and per-tag question pages.
+"""
+
+from django.urls import path
+from tags.views import TagListView, TagDetailsView
+
+urlpatterns = [
+	path('', TagListView.as_view(), name='tag-list'),
+	# Route for a tag's questions; expects the tag slug in the URL
+	path('<slug:slug>/', TagDetailsView.as_view(), name='tag-details'),
+]
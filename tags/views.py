@@ -0,0 +1,103 @@
+"""
+tags/views.py
+
+Public tag pages: the tag index sorted by popularity, and one page per tag
+listing its questions.
+
+Both pages resolve tags and their question counts through the cached tag
+catalogue, so neither counts questions per hit. The per-tag question list
+uses keyset pagination on (created_at, id), which stays an index walk no
+matter how deep a crawler pages.
+"""
+
+import base64
+from datetime import datetime
+
+from django.core.exceptions import BadRequest
+from django.db.models import Q
+from django.http import Http404, HttpResponsePermanentRedirect
+from django.urls import reverse
+from django.views.generic import ListView, TemplateView
+
+from questions.models import Question
+from .catalogue import get_popular_tags, get_tag_by_slug
+from .models import TagSynonym
+from .related import get_related_tags
+
+
+def encode_cursor(question):
+	"""Opaque cursor pointing just past ``question`` in newest-first order."""
+	raw = f'{question.created_at.isoformat()}|{question.pk}'
+	return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+	"""Inverse of encode_cursor; returns (created_at, pk) or raises ValueError."""
+	try:
+		created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+		return datetime.fromisoformat(created_at), int(pk)
+	except (UnicodeError, ValueError, TypeError) as exc:
+		raise ValueError(f"Invalid cursor: {cursor!r}") from exc
+
+
+class TagListView(ListView):
+	"""
+	All tags, most used first, from the catalogue's precomputed counts.
+	"""
+	template_name = 'tags/tag_list.html'
+	context_object_name = 'tags'
+	paginate_by = 100
+
+	def get_queryset(self):
+		return get_popular_tags()
+
+
+class TagDetailsView(TemplateView):
+	"""
+	Questions carrying one tag, newest first, a page at a time.
+
+	The 'cursor' query parameter (from the previous page's next link)
+	continues the listing after the last question shown. Slugs of merged
+	or renamed tags redirect permanently to the canonical tag's page.
+	"""
+	template_name = 'tags/tag_details.html'
+	page_size = 20
+
+	def get(self, request, *args, **kwargs):
+		if get_tag_by_slug(kwargs['slug']) is None:
+			synonym = TagSynonym.objects.filter(slug=kwargs['slug']).select_related('tag').first()
+			if synonym is not None:
+				return HttpResponsePermanentRedirect(reverse('tag-details', args=[synonym.tag.slug]))
+		return super().get(request, *args, **kwargs)
+
+	def get_context_data(self, **kwargs):
+		context = super().get_context_data(**kwargs)
+		tag = get_tag_by_slug(self.kwargs['slug'])
+		if tag is None:
+			raise Http404("No tag found matching the query")
+
+		questions = (
+			Question.objects
+			.filter(tags__id=tag.id)
+			.select_related('author')
+			.only('id', 'title', 'body', 'created_at', 'author__username')
+			.order_by('-created_at', '-id')
+		)
+		cursor = self.request.GET.get('cursor')
+		if cursor:
+			try:
+				created_at, pk = decode_cursor(cursor)
+			except ValueError:
+				raise BadRequest("Invalid cursor.")
+			questions = questions.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+		page = list(questions[:self.page_size + 1])
+		has_next = len(page) > self.page_size
+		page = page[:self.page_size]
+
+		context['tag'] = tag
+		context['questions'] = page
+		context['is_first_page'] = not cursor
+		context['next_cursor'] = encode_cursor(page[-1]) if has_next else None
+		context['related_tags'] = get_related_tags(tag.id)
+		return context
@@ -0,0 +1,17 @@
+"""
+uploads/apps.py
+
+Django app configuration for the uploads app.
+"""
+
+from django.apps import AppConfig
+
+class UploadsConfig(AppConfig):
+    """
+    Config for the uploads app (image derivatives and upload handling).
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'uploads'
+
+    def ready(self):
+        import uploads.signals  # noqa: F401
@@ -0,0 +1,214 @@
+"""
+uploads/derivatives.py
+
+Resized derivatives of uploaded images, generated off-request.
+
+Models opt in with ImageDerivativesMixin and an ``image_fields`` mapping from
+each ImageField to a JSONField holding its metadata. Saving a new image
+schedules process_image_field() on the background runner, which writes WebP
+and JPEG copies at DERIVATIVE_WIDTHS next to the original through the field's
+storage and records their names in the metadata, together with the
+original's upright dimensions and a tiny inline placeholder (LQIP):
+
+	{"source": "photo.png", "width": 1600, "height": 900,
+	 "placeholder": "data:image/jpeg;base64,...",
+	 "variants": [{"format": "webp", "width": 320, "name": "photo__w320.webp"}, ...]}
+
+Templates turn that into width/height, placeholder and srcset attributes with
+the responsive_image tag. Until the task has run the metadata is empty and
+the original is served as is.
+
+Replaced, cleared and deleted images are removed from storage together with
+their derivatives (uploads/signals.py covers row deletion). With the
+content-addressed storage of uploads/storage.py this only drops a reference,
+so files shared with other uploads survive.
+"""
+
+import base64
+import io
+import os
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from DjangoQandAPlatform.caching import invalidate
+from DjangoQandAPlatform.tasks import run_in_background
+
+DERIVATIVE_WIDTHS = (320, 640, 1280)
+PLACEHOLDER_SIZE = 16  # Longest side of the placeholder, in pixels
+DERIVATIVE_FORMATS = {
+	# format: (Pillow format, extension, save options)
+	'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+	'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def open_image(field_file):
+	"""Open a stored image upright (EXIF orientation applied) and fully loaded."""
+	field_file.open('rb')
+	try:
+		image = Image.open(field_file)
+		image = ImageOps.exif_transpose(image)
+		image.load()
+	finally:
+		field_file.close()
+	return image
+
+
+def _encode(image, image_format):
+	pil_format, _, options = DERIVATIVE_FORMATS[image_format]
+	if pil_format == 'JPEG' and image.mode != 'RGB':
+		background = Image.new('RGB', image.size, 'white')
+		rgba = image.convert('RGBA')
+		background.paste(rgba, mask=rgba.getchannel('A'))
+		image = background
+	elif image.mode not in ('RGB', 'RGBA'):
+		image = image.convert('RGBA')
+	buffer = io.BytesIO()
+	image.save(buffer, pil_format, **options)
+	return buffer.getvalue()
+
+
+def has_transparency(image):
+	"""Whether ``image`` may have transparent pixels."""
+	return image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+
+
+def placeholder_data_uri(image):
+	"""
+	A few-hundred-byte JPEG of ``image`` as a data: URI, shown scaled up (and so
+	blurred) behind the real image while it loads. None for images with
+	transparency, which would show the placeholder through.
+	"""
+	if has_transparency(image):
+		return None
+	thumbnail = image.convert('RGB')
+	thumbnail.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.BOX)
+	buffer = io.BytesIO()
+	thumbnail.save(buffer, 'JPEG', quality=50)
+	return 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def generate_derivatives(field_file):
+	"""
+	Write the derivatives of ``field_file`` to its storage and return the
+	metadata dict describing them and the original. Widths at or above the
+	original's are skipped.
+	"""
+	storage = field_file.storage
+	image = open_image(field_file)
+	root = os.path.splitext(field_file.name)[0]
+	variants = []
+	for width in DERIVATIVE_WIDTHS:
+		if width >= image.width:
+			break
+		height = max(1, round(image.height * width / image.width))
+		resized = image.resize((width, height), Image.Resampling.LANCZOS)
+		for image_format, (_, extension, _) in DERIVATIVE_FORMATS.items():
+			name = storage.save(f'{root}__w{width}.{extension}', ContentFile(_encode(resized, image_format)))
+			variants.append({'format': image_format, 'width': width, 'name': name})
+	return {
+		'source': field_file.name,
+		'width': image.width,
+		'height': image.height,
+		'placeholder': placeholder_data_uri(image),
+		'variants': variants,
+	}
+
+
+def derivative_names(meta):
+	"""Names of the stored files listed in a derivatives metadata dict."""
+	return [variant['name'] for variant in (meta or {}).get('variants', ())]
+
+
+def delete_derivatives(storage, meta):
+	"""Delete the stored files listed in a derivatives metadata dict."""
+	for name in derivative_names(meta):
+		storage.delete(name)
+
+
+def process_image_field(model_label, pk, field_name, source_name):
+	"""
+	Background task: generate derivatives for one image field of one row.
+
+	Does nothing if the row is gone or its image was replaced meanwhile; the
+	newer image has its own task queued.
+	"""
+	model = apps.get_model(model_label)
+	meta_field = model.image_fields[field_name]
+	instance = model.objects.filter(pk=pk).only('pk', field_name, meta_field).first()
+	if instance is None:
+		return
+	field_file = getattr(instance, field_name)
+	if field_file.name != source_name:
+		return
+	old_meta = getattr(instance, meta_field)
+	meta = generate_derivatives(field_file)
+	updated = model.objects.filter(pk=pk, **{field_name: source_name}).update(**{meta_field: meta})
+	if updated:
+		invalidate(model, pk)
+	# Either the image changed under us or these supersede an earlier run's files.
+	delete_derivatives(field_file.storage, old_meta if updated else meta)
+
+
+def discard_files(model_label, field_name, names):
+	"""Background task: delete an image that was replaced, cleared or deleted, and its derivatives."""
+	storage = apps.get_model(model_label)._meta.get_field(field_name).storage
+	for name in names:
+		storage.delete(name)
+
+
+class ImageDerivativesMixin:
+	"""
+	Model mixin that queues derivative generation when an image field changes,
+	and deletes replaced images (with their derivatives) once nothing uses them.
+
+	``image_fields`` maps each ImageField to the JSONField holding its metadata.
+	"""
+	image_fields = {}
+
+	@classmethod
+	def from_db(cls, db, field_names, values):
+		instance = super().from_db(db, field_names, values)
+		# Raw stored names, to tell replaced images apart on the next save.
+		instance._stored_image_names = {
+			name: instance.__dict__[name] or None
+			for name in cls.image_fields if name in instance.__dict__
+		}
+		return instance
+
+	def save(self, *args, **kwargs):
+		update_fields = kwargs.get('update_fields')
+		stored_names = getattr(self, '_stored_image_names', {})
+		changed = []
+		for field_name, meta_field in self.image_fields.items():
+			if update_fields is not None and field_name not in update_fields:
+				continue
+			field_file = getattr(self, field_name)
+			meta = getattr(self, meta_field) or {}
+			is_new_upload = bool(field_file) and not field_file._committed
+			is_stale = bool(meta) and (field_file.name or None) != meta.get('source')
+			is_cleared = not field_file and stored_names.get(field_name) is not None
+			if is_new_upload or is_stale or is_cleared:
+				changed.append((field_name, meta))
+				setattr(self, meta_field, {})
+
+		if update_fields is not None and changed:
+			# Partial saves must clear the metadata of any image they replace.
+			kwargs['update_fields'] = set(update_fields) | {self.image_fields[name] for name, _ in changed}
+		super().save(*args, **kwargs)
+
+		for field_name, old_meta in changed:
+			new_name = getattr(self, field_name).name or None
+			if new_name:
+				run_in_background(process_image_field, self._meta.label, self.pk, field_name, new_name)
+			obsolete = derivative_names(old_meta)
+			old_name = stored_names.get(field_name)
+			if old_name and old_name != new_name:
+				obsolete.append(old_name)
+			if obsolete:
+				run_in_background(discard_files, self._meta.label, field_name, obsolete)
+		self._stored_image_names = {
+			name: getattr(self, name).name or None for name in self.image_fields
+		}
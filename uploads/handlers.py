@@ -0,0 +1,99 @@
+"""
+uploads/handlers.py
+
+Upload limits enforced while the request body is still streaming.
+
+UploadLimitHandler runs first in FILE_UPLOAD_HANDLERS. It sniffs the first
+bytes of every uploaded file for a known image signature, and counts bytes as
+they arrive against the per-field size limit. On a violation it stops the
+upload without reading the rest of the body (StopUpload with
+connection_reset) and records why on the request. UploadLimitMiddleware
+(uploads/middleware.py) turns that into a 400/413 response, and also refuses
+bodies whose declared Content-Length is over the request limit before any of
+them is read.
+
+Settings:
+	UPLOAD_MAX_FILE_SIZE      default per-file limit in bytes
+	UPLOAD_FIELD_SIZE_LIMITS  {field name: limit in bytes} overrides
+	UPLOAD_MAX_REQUEST_SIZE   limit for a whole multipart request body
+"""
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+MB = 1024 * 1024
+DEFAULT_MAX_FILE_SIZE = 10 * MB
+
+# Leading bytes of the image formats accepted for upload. WebP is a RIFF
+# container, identified by bytes 8-12 as well; see is_allowed_image().
+IMAGE_SIGNATURES = (
+	b'\x89PNG\r\n\x1a\n',
+	b'\xff\xd8\xff',  # JPEG
+	b'GIF87a',
+	b'GIF89a',
+)
+SNIFF_LENGTH = 12
+
+
+class UploadRejected(Exception):
+	"""Why an upload was stopped; ``status`` is the HTTP status to answer with."""
+
+	def __init__(self, message, status):
+		super().__init__(message)
+		self.message = message
+		self.status = status
+
+
+def is_allowed_image(head):
+	"""Whether ``head`` (the first bytes of a file) starts like an accepted image."""
+	if head.startswith(b'RIFF') and head[8:12] == b'WEBP':
+		return True
+	return head.startswith(IMAGE_SIGNATURES)
+
+
+def get_field_size_limit(field_name):
+	"""Per-file byte limit for uploads in form field ``field_name``."""
+	limits = getattr(settings, 'UPLOAD_FIELD_SIZE_LIMITS', {})
+	return limits.get(field_name, getattr(settings, 'UPLOAD_MAX_FILE_SIZE', DEFAULT_MAX_FILE_SIZE))
+
+
+class UploadLimitHandler(FileUploadHandler):
+	"""
+	Pass-through upload handler that aborts oversized or non-image uploads early.
+	Later handlers in the chain still receive and store the data.
+	"""
+
+	def new_file(self, field_name, *args, **kwargs):
+		super().new_file(field_name, *args, **kwargs)
+		self.max_size = get_field_size_limit(field_name)
+		self.head = b''
+		# Browsers may declare a per-file length; trust it only to fail faster.
+		if self.content_length and self.content_length > self.max_size:
+			self.reject(self.too_large_message(), 413)
+
+	def receive_data_chunk(self, raw_data, start):
+		if len(self.head) < SNIFF_LENGTH:
+			self.head += raw_data[:SNIFF_LENGTH - len(self.head)]
+			if len(self.head) >= SNIFF_LENGTH and not is_allowed_image(self.head):
+				self.reject(self.not_an_image_message(), 400)
+		if start + len(raw_data) > self.max_size:
+			self.reject(self.too_large_message(), 413)
+		return raw_data
+
+	def file_complete(self, file_size):
+		# Files shorter than the sniffed prefix never reached the check above.
+		if file_size and len(self.head) < SNIFF_LENGTH and not is_allowed_image(self.head):
+			self.reject(self.not_an_image_message(), 400)
+		return None
+
+	def reject(self, message, status):
+		"""Record the rejection on the request and stop reading the body."""
+		if self.request is not None:
+			self.request.upload_rejection = UploadRejected(message, status)
+		raise StopUpload(connection_reset=True)
+
+	def too_large_message(self):
+		return f"“{self.file_name}” is larger than the {self.max_size // MB} MB limit."
+
+	def not_an_image_message(self):
+		return f"“{self.file_name}” is not a PNG, JPEG, GIF or WebP image."
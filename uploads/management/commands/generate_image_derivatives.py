@@ -0,0 +1,63 @@
+"""
+uploads/management/commands/generate_image_derivatives.py
+
+Backfills resized image derivatives, dimensions and placeholders for every
+model using ImageDerivativesMixin, e.g. for images uploaded before the
+pipeline (or its newer metadata) existed, or whose background task was lost
+in a restart. Runs synchronously, walking
+each table by primary key.
+"""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from uploads.derivatives import ImageDerivativesMixin, process_image_field
+
+
+class Command(BaseCommand):
+	help = "Generate missing image derivatives for uploaded images."
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			'--chunk-size', type=int, default=100,
+			help="Number of rows loaded per batch (default: 100).",
+		)
+		parser.add_argument(
+			'--all', action='store_true', dest='regenerate_all',
+			help="Regenerate derivatives for every image, not only those missing metadata.",
+		)
+
+	def handle(self, *args, chunk_size, regenerate_all, **options):
+		for model in apps.get_models():
+			if not issubclass(model, ImageDerivativesMixin):
+				continue
+			for field_name, meta_field in model.image_fields.items():
+				processed = self.backfill(model, field_name, meta_field, chunk_size, regenerate_all)
+				self.stdout.write(f"{model._meta.label}.{field_name}: processed {processed} image(s).")
+
+	def backfill(self, model, field_name, meta_field, chunk_size, regenerate_all):
+		queryset = (
+			model.objects
+			.exclude(**{f'{field_name}__isnull': True})
+			.exclude(**{field_name: ''})
+			.order_by('pk')
+		)
+		if not regenerate_all:
+			# Metadata written before dimensions were recorded counts as missing.
+			queryset = queryset.exclude(**{f'{meta_field}__has_key': 'width'})
+		rows = queryset.values_list('pk', field_name)
+
+		processed = 0
+		last_pk = 0
+		while True:
+			chunk = list(rows.filter(pk__gt=last_pk)[:chunk_size])
+			if not chunk:
+				return processed
+			for pk, name in chunk:
+				try:
+					process_image_field(model._meta.label, pk, field_name, name)
+				except (OSError, ValueError) as exc:
+					self.stderr.write(f"{model._meta.label} #{pk}: {exc}")
+				else:
+					processed += 1
+			last_pk = chunk[-1][0]
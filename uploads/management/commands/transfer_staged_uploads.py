@@ -0,0 +1,51 @@
+"""
+uploads/management/commands/transfer_staged_uploads.py
+
+Retries remote transfers of staged uploads: those that failed for good, and
+pending ones whose background task was lost (e.g. in a restart). Meant to run
+from cron. Transfers run synchronously, one file at a time.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from uploads.models import StagedUpload
+from uploads.storage import find_staged_storage
+
+
+class Command(BaseCommand):
+	help = "Transfer staged uploads that are stuck or failed to remote storage."
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			'--older-than', type=int, default=15,
+			help="Only retry pending uploads untouched for this many minutes (default: 15).",
+		)
+
+	def handle(self, *args, older_than, **options):
+		storage = find_staged_storage()
+		if storage is None:
+			raise CommandError("The default storage does not stage uploads.")
+
+		cutoff = timezone.now() - timedelta(minutes=older_than)
+		names = list(
+			StagedUpload.objects
+			.filter(Q(status=StagedUpload.FAILED) | Q(status=StagedUpload.PENDING, updated_at__lt=cutoff))
+			.order_by('pk')
+			.values_list('name', flat=True)
+		)
+		# Failed uploads get another full round of attempts.
+		StagedUpload.objects.filter(name__in=names, status=StagedUpload.FAILED).update(
+			status=StagedUpload.PENDING, attempts=0,
+		)
+		transferred = 0
+		for name in names:
+			storage.transfer(name)
+			if StagedUpload.objects.filter(name=name, status=StagedUpload.DONE).exists():
+				transferred += 1
+			else:
+				self.stderr.write(f"{name}: transfer failed.")
+		self.stdout.write(f"Transferred {transferred} staged upload(s).")
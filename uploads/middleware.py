@@ -0,0 +1,49 @@
+"""
+uploads/middleware.py
+
+Answers requests whose uploads broke the limits of uploads/handlers.py.
+"""
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from .handlers import MB
+
+
+class UploadLimitMiddleware:
+	"""
+	Refuses multipart bodies declared larger than UPLOAD_MAX_REQUEST_SIZE
+	before reading them. Otherwise it parses the upload ahead of the view,
+	so that a rejection by UploadLimitHandler is answered with 400/413
+	instead of reaching the view as a form with a missing file.
+
+	Must come before CsrfViewMiddleware, which would otherwise be first to
+	read the body.
+	"""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		return self.get_response(request)
+
+	def process_view(self, request, view_func, view_args, view_kwargs):
+		if request.method != 'POST' or request.content_type != 'multipart/form-data':
+			return None
+
+		max_request_size = getattr(settings, 'UPLOAD_MAX_REQUEST_SIZE', None)
+		try:
+			content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+		except ValueError:
+			content_length = 0
+		if max_request_size and content_length > max_request_size:
+			return self.reject(f"Upload is larger than the {max_request_size // MB} MB limit.", 413)
+
+		request.FILES  # Parse the body now, with the upload handlers in place
+		rejection = getattr(request, 'upload_rejection', None)
+		if rejection is not None:
+			return self.reject(rejection.message, rejection.status)
+		return None
+
+	def reject(self, message, status):
+		return HttpResponse(message, status=status, content_type='text/plain; charset=utf-8')
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(help_text='Hex SHA-256 of the content.', max_length=64, unique=True)),
+                ('name', models.CharField(help_text='Name of the file in the backend storage.', max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(help_text='Content size in bytes.')),
+                ('refcount', models.PositiveIntegerField(default=0, help_text='Number of live references to this blob.')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='When the content was first stored.')),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StagedUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Name the file was saved under.', max_length=255, unique=True)),
+                ('remote_name', models.CharField(blank=True, help_text='Name assigned by the remote storage.', max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Transferred'), ('failed', 'Failed')], db_index=True, default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='Failed transfer attempts so far.')),
+                ('last_error', models.TextField(blank=True, help_text='Error of the last failed attempt.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
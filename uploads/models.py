@@ -0,0 +1,50 @@
+"""
+uploads/models.py
+
+Bookkeeping for content-addressed media storage (see uploads/storage.py).
+"""
+
+from django.db import models
+
+
+class StoredBlob(models.Model):
+	"""
+	One stored file body, shared by every upload with the same content.
+
+	``refcount`` counts the saves that returned this blob's name and have not
+	been deleted since; the file is removed from the backend when it drops to 0.
+	"""
+	sha256 = models.CharField(max_length=64, unique=True, help_text="Hex SHA-256 of the content.")
+	name = models.CharField(max_length=255, unique=True, help_text="Name of the file in the backend storage.")
+	size = models.PositiveBigIntegerField(help_text="Content size in bytes.")
+	refcount = models.PositiveIntegerField(default=0, help_text="Number of live references to this blob.")
+	created_at = models.DateTimeField(auto_now_add=True, help_text="When the content was first stored.")
+
+	def __str__(self):
+		return f'{self.name} ({self.refcount} ref(s))'
+
+
+class StagedUpload(models.Model):
+	"""
+	A file saved to local staging storage that is being (or has been)
+	transferred to the remote storage; see StagedRemoteStorage.
+	"""
+	PENDING = 'pending'
+	DONE = 'done'
+	FAILED = 'failed'
+	STATUS_CHOICES = [
+		(PENDING, 'Pending'),
+		(DONE, 'Transferred'),
+		(FAILED, 'Failed'),
+	]
+
+	name = models.CharField(max_length=255, unique=True, help_text="Name the file was saved under.")
+	remote_name = models.CharField(max_length=255, blank=True, help_text="Name assigned by the remote storage.")
+	status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+	attempts = models.PositiveSmallIntegerField(default=0, help_text="Failed transfer attempts so far.")
+	last_error = models.TextField(blank=True, help_text="Error of the last failed attempt.")
+	created_at = models.DateTimeField(auto_now_add=True)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	def __str__(self):
+		return f'{self.name} ({self.get_status_display()})'
@@ -0,0 +1,28 @@
+"""
+uploads/signals.py
+
+Removes the stored images of deleted rows, with their derivatives.
+"""
+
+from django.apps import apps
+from django.db.models.signals import post_delete
+
+from DjangoQandAPlatform.tasks import run_in_background
+from .derivatives import ImageDerivativesMixin, derivative_names, discard_files
+
+
+def discard_deleted_images(sender, instance, **kwargs):
+	for field_name, meta_field in instance.image_fields.items():
+		names = derivative_names(getattr(instance, meta_field))
+		field_file = getattr(instance, field_name)
+		if field_file:
+			names.append(field_file.name)
+		if names:
+			run_in_background(discard_files, sender._meta.label, field_name, names)
+
+
+# Connected per model rather than for all senders, which would disable
+# Django's fast (signal-free) cascade deletes for every other model.
+for model in apps.get_models():
+	if issubclass(model, ImageDerivativesMixin):
+		post_delete.connect(discard_deleted_images, sender=model, dispatch_uid=f'discard_images_{model._meta.label}')
@@ -0,0 +1,329 @@
+"""
+uploads/storage.py
+
+Storage backends for uploaded media.
+
+ContentAddressedStorage is a de-duplicating wrapper around another backend.
+
+Saving hashes the content chunk by chunk and stores it once, under a name
+derived from its SHA-256, in the wrapped backend. Saving the same bytes again
+(a re-uploaded screenshot, the same avatar for a second account) only
+increments the StoredBlob reference count: nothing is written or transferred.
+Deleting decrements the count, and the backend file is removed only when the
+last reference goes. Names stored before the wrapper was enabled have no
+StoredBlob row and are passed straight through to the backend.
+
+Configure it as a STORAGES entry, naming the wrapped backend in OPTIONS:
+
+	"default": {
+		"BACKEND": "uploads.storage.ContentAddressedStorage",
+		"OPTIONS": {"backend": "cloudinary_storage.storage.MediaCloudinaryStorage"},
+	}
+
+StagedRemoteStorage keeps slow remote uploads out of the request. Saving
+writes the file to a local staging directory and records a StagedUpload row;
+once the transaction commits, a background worker transfers the file to the
+remote backend, retrying with exponential backoff, and then removes the local
+copy. Until then url() points at the staged-media view, which serves the local
+file; afterwards it is the remote URL. Stuck or failed transfers are retried by
+the transfer_staged_uploads command. Remote names of transferred files are
+kept in a per-process LRU in front of the Django cache, so rendering a page
+rarely queries StagedUpload, and remote_names() resolves the names of one
+image and its derivatives in a single round trip. The staging directory must
+be shared by every process that serves requests. It can be the wrapped backend of
+ContentAddressedStorage:
+
+	"OPTIONS": {
+		"backend": "uploads.storage.StagedRemoteStorage",
+		"backend_options": {"remote": "cloudinary_storage.storage.MediaCloudinaryStorage"},
+	}
+"""
+
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage, Storage, default_storage
+from django.db import transaction
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+from django.utils.module_loading import import_string
+
+from DjangoQandAPlatform.tasks import run_in_background, run_later
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = 'django.core.files.storage.FileSystemStorage'
+REMOTE_NAME_CACHE_SIZE = 4096
+REMOTE_NAME_TIMEOUT = 24 * 3600
+
+
+def hash_content(content):
+	"""Return (hex SHA-256, size) of a File, reading it chunk by chunk."""
+	digest = hashlib.sha256()
+	size = 0
+	if hasattr(content, 'seek'):
+		content.seek(0)
+	for chunk in content.chunks():
+		digest.update(chunk)
+		size += len(chunk)
+	content.seek(0)
+	return digest.hexdigest(), size
+
+
+@deconstructible
+class ContentAddressedStorage(Storage):
+	"""Stores each distinct file body once in ``backend``, reference counted."""
+
+	def __init__(self, backend=DEFAULT_BACKEND, backend_options=None, prefix='blobs'):
+		self.backend_path = backend
+		self.backend_options = backend_options or {}
+		self.prefix = prefix
+		self.backend = import_string(backend)(**self.backend_options)
+
+	def blob_name(self, digest, name):
+		"""Backend name for content ``digest``, keeping the upload's extension."""
+		extension = os.path.splitext(name)[1].lower()
+		return f'{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+	def get_available_name(self, name, max_length=None):
+		# The final name comes from the content hash, so the upload's name never collides.
+		return name
+
+	def _save(self, name, content):
+		from .models import StoredBlob
+
+		digest, size = hash_content(content)
+		while True:
+			with transaction.atomic():
+				# A concurrent first save of the same content blocks here on the unique
+				# sha256 until that upload commits, then takes the existing-blob path.
+				blob, created = StoredBlob.objects.get_or_create(
+					sha256=digest,
+					defaults={'name': self.blob_name(digest, name), 'size': size, 'refcount': 1},
+				)
+				if created:
+					stored_name = self.backend.save(blob.name, content)
+					if stored_name != blob.name:
+						blob.name = stored_name
+						blob.save(update_fields=['name'])
+					return blob.name
+				if StoredBlob.objects.filter(pk=blob.pk).update(refcount=F('refcount') + 1):
+					return blob.name
+			# The last reference was deleted in between; store the content afresh.
+
+	def delete(self, name):
+		from .models import StoredBlob
+
+		with transaction.atomic():
+			blob = StoredBlob.objects.select_for_update().filter(name=name).first()
+			if blob is None:
+				self.backend.delete(name)
+				return
+			if blob.refcount > 1:
+				StoredBlob.objects.filter(pk=blob.pk).update(refcount=F('refcount') - 1)
+				return
+			blob.delete()
+			transaction.on_commit(lambda: self.backend.delete(name))
+
+	def _open(self, name, mode='rb'):
+		return self.backend.open(name, mode)
+
+	def exists(self, name):
+		return self.backend.exists(name)
+
+	def url(self, name):
+		return self.backend.url(name)
+
+	def size(self, name):
+		return self.backend.size(name)
+
+	def path(self, name):
+		return self.backend.path(name)
+
+	def listdir(self, path):
+		return self.backend.listdir(path)
+
+	def get_accessed_time(self, name):
+		return self.backend.get_accessed_time(name)
+
+	def get_created_time(self, name):
+		return self.backend.get_created_time(name)
+
+	def get_modified_time(self, name):
+		return self.backend.get_modified_time(name)
+
+
+class StagingStorage(FileSystemStorage):
+	"""Local staging directory. A name stays taken while its StagedUpload row exists."""
+
+	def exists(self, name):
+		from .models import StagedUpload
+
+		return super().exists(name) or StagedUpload.objects.filter(name=name).exists()
+
+
+@deconstructible
+class StagedRemoteStorage(Storage):
+	"""Saves to local staging and transfers files to ``remote`` in the background."""
+
+	def __init__(self, remote=DEFAULT_BACKEND, remote_options=None, staging_location=None,
+			max_attempts=5, retry_delay=30):
+		self.remote_path = remote
+		self.remote_options = remote_options or {}
+		self.staging_location = staging_location
+		self.max_attempts = max_attempts
+		self.retry_delay = retry_delay
+		self.remote = import_string(remote)(**self.remote_options)
+		self.staging = StagingStorage(
+			location=staging_location or os.path.join(settings.MEDIA_ROOT, 'staging'),
+		)
+		# LRU of names whose remote name is final (transferred or pre-existing); never pending ones.
+		self._remote_names = OrderedDict()
+
+	def get_available_name(self, name, max_length=None):
+		# The staging storage picks a free name when saving.
+		return name
+
+	def _save(self, name, content):
+		from .models import StagedUpload
+
+		name = self.staging.save(name, content)
+		StagedUpload.objects.create(name=name)
+		run_in_background(self.transfer, name)
+		return name
+
+	def transfer(self, name):
+		"""
+		Copy a staged file to the remote storage and drop the local copy.
+		On failure the transfer is retried with exponential backoff, up to
+		``max_attempts`` times in all.
+		"""
+		from .models import StagedUpload
+
+		upload = StagedUpload.objects.filter(name=name).exclude(status=StagedUpload.DONE).first()
+		if upload is None:
+			return
+		try:
+			with self.staging.open(name) as f:
+				remote_name = self.remote.save(name, f)
+		except Exception as exc:
+			attempts = upload.attempts + 1
+			status = StagedUpload.FAILED if attempts >= self.max_attempts else StagedUpload.PENDING
+			StagedUpload.objects.filter(pk=upload.pk).update(
+				attempts=attempts, status=status, last_error=repr(exc), updated_at=timezone.now(),
+			)
+			logger.warning("Transfer of %s failed (attempt %d): %r", name, attempts, exc)
+			if status == StagedUpload.PENDING:
+				run_later(self.retry_delay * 2 ** (attempts - 1), self.transfer, name)
+			return
+
+		updated = StagedUpload.objects.filter(pk=upload.pk).exclude(status=StagedUpload.DONE).update(
+			status=StagedUpload.DONE, remote_name=remote_name, last_error='', updated_at=timezone.now(),
+		)
+		if not updated:
+			# Deleted, or transferred by a concurrent retry, while this copy was uploading.
+			self.remote.delete(remote_name)
+		self.staging.delete(name)
+
+	def is_staged(self, name):
+		"""Whether ``name`` is still served from local staging."""
+		return os.path.exists(self.staging.path(name))
+
+	@staticmethod
+	def _remote_name_key(name):
+		return f'uploads:remote_name:{hashlib.sha1(name.encode()).hexdigest()}'
+
+	def _remember(self, name, remote_name):
+		self._remote_names[name] = remote_name
+		self._remote_names.move_to_end(name)
+		if len(self._remote_names) > REMOTE_NAME_CACHE_SIZE:
+			self._remote_names.popitem(last=False)
+
+	def remote_name(self, name):
+		"""Name of ``name``'s file in the remote storage."""
+		return self.remote_names([name])[name]
+
+	def remote_names(self, names):
+		"""
+		{name: remote name} for ``names``, looked up in the process LRU, then the
+		Django cache, then with one StagedUpload query for the rest.
+		"""
+		from .models import StagedUpload
+
+		found = {}
+		for name in names:
+			if name in self._remote_names:
+				self._remote_names.move_to_end(name)
+				found[name] = self._remote_names[name]
+		keys = {self._remote_name_key(name): name for name in names if name not in found}
+		if keys:
+			for key, remote_name in cache.get_many(keys).items():
+				found[keys[key]] = remote_name
+				self._remember(keys[key], remote_name)
+		missing = [name for name in keys.values() if name not in found]
+		if missing:
+			rows = StagedUpload.objects.filter(name__in=missing).values_list('name', 'status', 'remote_name')
+			uploads = {name: (status, remote_name) for name, status, remote_name in rows}
+			final = {}
+			for name in missing:
+				status, remote_name = uploads.get(name, (None, None))
+				if status is not None and status != StagedUpload.DONE:
+					found[name] = name
+					continue
+				# Transferred, or saved to the remote storage before staging was enabled.
+				found[name] = final[name] = name if status is None else remote_name
+				self._remember(name, found[name])
+			cache.set_many(
+				{self._remote_name_key(name): remote_name for name, remote_name in final.items()},
+				REMOTE_NAME_TIMEOUT,
+			)
+		return found
+
+	def delete(self, name):
+		from .models import StagedUpload
+
+		upload = StagedUpload.objects.filter(name=name).first()
+		if upload is not None:
+			upload.delete()
+		self.staging.delete(name)
+		self._remote_names.pop(name, None)
+		cache.delete(self._remote_name_key(name))
+		if upload is None:
+			self.remote.delete(name)
+		elif upload.remote_name:
+			self.remote.delete(upload.remote_name)
+
+	def _open(self, name, mode='rb'):
+		if self.is_staged(name):
+			return self.staging.open(name, mode)
+		return self.remote.open(self.remote_name(name), mode)
+
+	def exists(self, name):
+		return self.is_staged(name) or self.remote.exists(self.remote_name(name))
+
+	def url(self, name):
+		if self.is_staged(name):
+			return reverse('staged-media', args=[name])
+		return self.remote.url(self.remote_name(name))
+
+	def size(self, name):
+		if self.is_staged(name):
+			return self.staging.size(name)
+		return self.remote.size(self.remote_name(name))
+
+
+def find_staged_storage(storage=None):
+	"""
+	Return the StagedRemoteStorage behind ``storage`` (default: the default
+	storage), looking through wrapping backends, or None if there is none.
+	"""
+	storage = default_storage if storage is None else storage
+	while storage is not None and not isinstance(storage, StagedRemoteStorage):
+		storage = getattr(storage, 'backend', None)
+	return storage
@@ -0,0 +1,72 @@
+"""
+uploads/templatetags/responsive_images.py
+
+{% responsive_image %} renders an uploaded image with the srcset of its
+generated derivatives (see uploads/derivatives.py) and native lazy loading.
+Once the image's metadata is known it also sets width and height, so the
+page reserves the image's box before it loads, and paints the blurred
+placeholder in that box until it does.
+
+Usage:
+	{% load responsive_images %}
+	{% responsive_image answer.media answer.media_meta alt="Answer Image" css_class="answer-image" %}
+"""
+
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from uploads.storage import find_staged_storage
+
+register = template.Library()
+
+DEFAULT_SIZES = '(max-width: 800px) 100vw, 800px'
+
+
+def _srcset(storage, variants, image_format):
+	return ', '.join(
+		f"{storage.url(variant['name'])} {variant['width']}w"
+		for variant in variants
+		if variant['format'] == image_format
+	)
+
+
+@register.simple_tag
+def responsive_image(image, meta=None, alt='', css_class='', sizes=DEFAULT_SIZES, lazy=True):
+	"""
+	Render ``image`` (an ImageField file) as <picture> with WebP and JPEG
+	srcsets, or as a plain lazy <img> while no derivatives exist yet.
+	"""
+	if not image:
+		return ''
+	meta = meta if meta and meta.get('source') == image.name else {}
+	variants = meta.get('variants')
+	staged = find_staged_storage(image.storage)
+	if staged is not None and variants:
+		# Resolve the remote names of the image and its derivatives at once.
+		staged.remote_names([image.name, *(variant['name'] for variant in variants)])
+
+	attrs = {'src': image.url, 'alt': alt, 'class': css_class or None, 'decoding': 'async'}
+	if lazy:
+		attrs['loading'] = 'lazy'
+
+	if meta.get('width') and meta.get('height'):
+		attrs['width'] = meta['width']
+		attrs['height'] = meta['height']
+	if meta.get('placeholder'):
+		attrs['class'] = f'{css_class} image-placeholder'.strip()
+		attrs['style'] = f"background-image: url({meta['placeholder']})"
+
+	if not variants:
+		return format_html('<img{}>', _attributes(attrs))
+
+	storage = image.storage
+	attrs['srcset'] = _srcset(storage, variants, 'jpeg')
+	attrs['sizes'] = sizes
+	return format_html(
+		'<picture><source type="image/webp" srcset="{}" sizes="{}"><img{}></picture>',
+		_srcset(storage, variants, 'webp'), sizes, _attributes(attrs),
+	)
+
+
+def _attributes(attrs):
+	return format_html_join('', ' {}="{}"', ((name, value) for name, value in attrs.items() if value is not None))
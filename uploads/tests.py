@@ -0,0 +1,405 @@
+"""
+uploads/tests.py
+
+Tests for off-request image derivatives, the responsive_image template tag,
+streaming upload limits, content-addressed storage and staged remote uploads.
+"""
+
+import io
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopUpload
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from questions.models import Question
+from .handlers import UploadLimitHandler
+from .models import StagedUpload, StoredBlob
+from .storage import ContentAddressedStorage, StagedRemoteStorage
+
+User = get_user_model()
+
+
+def make_image(name='photo.png', size=(1000, 500), image_format='PNG', mode='RGB'):
+	"""Return an uploaded image file of the given pixel size."""
+	buffer = io.BytesIO()
+	Image.new(mode, size, 'navy').save(buffer, image_format)
+	return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{image_format.lower()}')
+
+
+def use_temporary_media(test):
+	"""Store uploads made during ``test`` in a temporary directory instead of the configured storage."""
+	media_dir = tempfile.TemporaryDirectory()
+	test.addCleanup(media_dir.cleanup)
+	storages = {
+		'default': {
+			'BACKEND': 'django.core.files.storage.FileSystemStorage',
+			'OPTIONS': {'location': media_dir.name},
+		},
+		'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+	}
+	override = override_settings(STORAGES=storages)
+	override.enable()
+	test.addCleanup(override.disable)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class ImageDerivativesTest(TestCase):
+	"""
+	Tests for derivative generation on upload, replacement and backfill.
+	"""
+
+	def setUp(self):
+		use_temporary_media(self)
+		self.user = User.objects.create_user(username='uploader', password='1234')
+
+	def create_question(self, **kwargs):
+		with self.captureOnCommitCallbacks(execute=True):
+			return Question.objects.create(title='Pic', body='Body', author=self.user, **kwargs)
+
+	def test_upload_generates_smaller_widths(self):
+		question = self.create_question(media=make_image())
+		question.refresh_from_db()
+		meta = question.media_meta
+		self.assertEqual(meta['source'], question.media.name)
+		self.assertEqual((meta['width'], meta['height']), (1000, 500))
+		self.assertTrue(meta['placeholder'].startswith('data:image/jpeg;base64,'))
+		self.assertLess(len(meta['placeholder']), 1000)
+		self.assertEqual(
+			sorted((v['format'], v['width']) for v in meta['variants']),
+			[('jpeg', 320), ('jpeg', 640), ('webp', 320), ('webp', 640)],
+		)
+		storage = question.media.storage
+		for variant in meta['variants']:
+			self.assertTrue(storage.exists(variant['name']))
+		with storage.open(meta['variants'][0]['name']) as f:
+			self.assertEqual(Image.open(f).width, meta['variants'][0]['width'])
+
+	def test_transparent_image_has_no_placeholder(self):
+		question = self.create_question(media=make_image(size=(100, 100), mode='RGBA'))
+		question.refresh_from_db()
+		self.assertEqual(question.media_meta['width'], 100)
+		self.assertIsNone(question.media_meta['placeholder'])
+
+	def test_replacing_image_discards_old_derivatives(self):
+		question = self.create_question(media=make_image())
+		question.refresh_from_db()
+		old_names = [v['name'] for v in question.media_meta['variants']]
+		question.media = make_image('other.png', size=(400, 300))
+		with self.captureOnCommitCallbacks(execute=True):
+			question.save()
+		question.refresh_from_db()
+		self.assertEqual([v['width'] for v in question.media_meta['variants']], [320, 320])
+		self.assertFalse(any(question.media.storage.exists(name) for name in old_names))
+
+	def test_unchanged_image_is_not_reprocessed(self):
+		question = self.create_question(media=make_image())
+		with mock.patch('uploads.derivatives.run_in_background') as run_in_background:
+			question.title = 'Edited'
+			question.save()
+		run_in_background.assert_not_called()
+
+	def test_backfill_command(self):
+		question = self.create_question(media=make_image())
+		Question.objects.update(media_meta={})
+		call_command('generate_image_derivatives', stdout=StringIO())
+		question.refresh_from_db()
+		self.assertEqual(len(question.media_meta['variants']), 4)
+
+		# Metadata from before dimensions were recorded is regenerated too.
+		Question.objects.update(media_meta={'source': question.media.name, 'variants': []})
+		call_command('generate_image_derivatives', stdout=StringIO())
+		question.refresh_from_db()
+		self.assertEqual(question.media_meta['height'], 500)
+
+	def test_responsive_image_tag(self):
+		question = self.create_question(media=make_image())
+		template = Template(
+			'{% load responsive_images %}'
+			'{% responsive_image q.media q.media_meta alt="Pic" css_class="question-image" %}'
+		)
+		html = template.render(Context({'q': question}))
+		self.assertIn('<img', html)
+		self.assertIn('loading="lazy"', html)
+		self.assertNotIn('srcset', html)  # Derivatives not loaded on this instance yet
+		self.assertNotIn('width=', html)
+
+		question.refresh_from_db()
+		html = template.render(Context({'q': question}))
+		self.assertIn('<source type="image/webp"', html)
+		self.assertIn(' 640w', html)
+		self.assertIn('width="1000" height="500"', html)
+		self.assertIn('class="question-image image-placeholder"', html)
+		self.assertIn("background-image: url(data:image/jpeg;base64,", html)
+
+
+@override_settings(UPLOAD_FIELD_SIZE_LIMITS={'media': 2000})
+class UploadLimitTest(TestCase):
+	"""
+	Tests for upload size and signature checks while the body streams.
+	"""
+
+	def setUp(self):
+		self.user = User.objects.create_user(username='streamer', password='1234')
+		self.client.force_login(self.user)
+
+	def post_question(self, media, **extra):
+		return self.client.post(
+			reverse('question_create'),
+			{'title': 'Upload', 'body': 'Body', 'media': media},
+			**extra,
+		)
+
+	def test_small_image_accepted(self):
+		use_temporary_media(self)
+		resp = self.post_question(make_image(size=(10, 10)))
+		self.assertEqual(resp.status_code, 302)
+		self.assertTrue(Question.objects.filter(title='Upload').exists())
+
+	def test_oversized_file_rejected(self):
+		resp = self.post_question(SimpleUploadedFile('big.png', b'\x89PNG\r\n\x1a\n' + b'0' * 5000))
+		self.assertEqual(resp.status_code, 413)
+		self.assertFalse(Question.objects.exists())
+
+	def test_non_image_rejected(self):
+		resp = self.post_question(SimpleUploadedFile('evil.png', b'<?php echo "hi"; ?>'))
+		self.assertEqual(resp.status_code, 400)
+		self.assertFalse(Question.objects.exists())
+
+	@override_settings(UPLOAD_MAX_REQUEST_SIZE=1000)
+	def test_declared_length_rejected_before_reading(self):
+		resp = self.post_question(make_image(size=(10, 10)), CONTENT_LENGTH='5000000')
+		self.assertEqual(resp.status_code, 413)
+
+	def test_handler_stops_at_first_chunk_over_limit(self):
+		request = RequestFactory().post('/')
+		handler = UploadLimitHandler(request)
+		handler.new_file('media', 'big.jpg', 'image/jpeg', None)
+		handler.receive_data_chunk(b'\xff\xd8\xff' + b'0' * 1500, 0)
+		with self.assertRaises(StopUpload):
+			handler.receive_data_chunk(b'0' * 1500, 1503)
+		self.assertEqual(request.upload_rejection.status, 413)
+
+
+class ContentAddressedStorageTest(TestCase):
+	"""
+	Tests for de-duplicated, reference-counted storage over a filesystem backend.
+	"""
+
+	def setUp(self):
+		self.tempdir = tempfile.TemporaryDirectory()
+		self.addCleanup(self.tempdir.cleanup)
+		self.backend_options = {'location': self.tempdir.name}
+		self.storage = ContentAddressedStorage(backend_options=self.backend_options)
+
+	def stored_files(self):
+		return [files for _, _, files in os.walk(self.tempdir.name) if files]
+
+	def test_duplicate_content_stored_once(self):
+		first = self.storage.save('a.png', ContentFile(b'same bytes'))
+		second = self.storage.save('b.PNG', ContentFile(b'same bytes'))
+		other = self.storage.save('c.png', ContentFile(b'other bytes'))
+		self.assertEqual(first, second)
+		self.assertNotEqual(first, other)
+		self.assertTrue(first.startswith('blobs/') and first.endswith('.png'))
+		self.assertEqual(StoredBlob.objects.get(name=first).refcount, 2)
+		self.assertEqual(len(self.stored_files()), 2)
+		with self.storage.open(first) as f:
+			self.assertEqual(f.read(), b'same bytes')
+
+	def test_last_delete_removes_blob(self):
+		name = self.storage.save('a.png', ContentFile(b'shared'))
+		self.storage.save('b.png', ContentFile(b'shared'))
+		with self.captureOnCommitCallbacks(execute=True):
+			self.storage.delete(name)
+		self.assertTrue(self.storage.exists(name))
+		with self.captureOnCommitCallbacks(execute=True):
+			self.storage.delete(name)
+		self.assertFalse(self.storage.exists(name))
+		self.assertFalse(StoredBlob.objects.exists())
+
+	def test_legacy_names_pass_through(self):
+		self.storage.backend.save('legacy.png', ContentFile(b'old'))
+		self.storage.delete('legacy.png')
+		self.assertFalse(self.storage.exists('legacy.png'))
+
+	def test_replacing_shared_image_keeps_it_for_others(self):
+		storages = {
+			'default': {
+				'BACKEND': 'uploads.storage.ContentAddressedStorage',
+				'OPTIONS': {'backend_options': self.backend_options},
+			},
+			'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+		}
+		user = User.objects.create_user(username='sharer', password='1234')
+		with self.settings(STORAGES=storages, BACKGROUND_TASKS_EAGER=True):
+			with self.captureOnCommitCallbacks(execute=True):
+				first = Question.objects.create(title='A', body='B', author=user, media=make_image(size=(10, 10)))
+				second = Question.objects.create(title='C', body='D', author=user, media=make_image(size=(10, 10)))
+			self.assertEqual(first.media.name, second.media.name)
+
+			first = Question.objects.get(pk=first.pk)
+			first.media = make_image('new.png', size=(20, 20))
+			with self.captureOnCommitCallbacks(execute=True):
+				first.save()
+			self.assertTrue(second.media.storage.exists(second.media.name))
+
+			with self.captureOnCommitCallbacks(execute=True):
+				second.delete()
+			self.assertEqual(StoredBlob.objects.count(), 1)
+			self.assertFalse(second.media.storage.exists(second.media.name))
+
+
+class FlakyStorage(FileSystemStorage):
+	"""Remote stand-in whose next ``failures`` saves raise."""
+	failures = 0
+
+	def _save(self, name, content):
+		if FlakyStorage.failures:
+			FlakyStorage.failures -= 1
+			raise OSError("Remote unavailable")
+		return super()._save(name, content)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class StagedRemoteStorageTest(TestCase):
+	"""
+	Tests for local staging with background transfer to a remote storage.
+	"""
+
+	def setUp(self):
+		staging_dir = tempfile.TemporaryDirectory()
+		remote_dir = tempfile.TemporaryDirectory()
+		self.addCleanup(staging_dir.cleanup)
+		self.addCleanup(remote_dir.cleanup)
+		self.addCleanup(setattr, FlakyStorage, 'failures', 0)
+		self.options = {
+			'remote': 'uploads.tests.FlakyStorage',
+			'remote_options': {'location': remote_dir.name, 'base_url': '/remote/'},
+			'staging_location': staging_dir.name,
+			'max_attempts': 3,
+			'retry_delay': 0,
+		}
+		self.storage = StagedRemoteStorage(**self.options)
+		cache.clear()
+
+	def save(self, name, content):
+		with self.captureOnCommitCallbacks(execute=True):
+			return self.storage.save(name, ContentFile(content))
+
+	def test_url_switches_to_remote_after_transfer(self):
+		with self.captureOnCommitCallbacks() as callbacks:
+			name = self.storage.save('photo.png', ContentFile(b'pixels'))
+		self.assertEqual(self.storage.url(name), reverse('staged-media', args=[name]))
+		with self.storage.open(name) as f:
+			self.assertEqual(f.read(), b'pixels')
+
+		for callback in callbacks:
+			callback()
+		self.assertFalse(self.storage.is_staged(name))
+		self.assertEqual(StagedUpload.objects.get(name=name).status, StagedUpload.DONE)
+		self.assertEqual(self.storage.url(name), '/remote/photo.png')
+		with self.storage.open(name) as f:
+			self.assertEqual(f.read(), b'pixels')
+
+	def test_failed_transfer_is_retried(self):
+		FlakyStorage.failures = 2
+		with self.assertLogs('uploads.storage', 'WARNING'):
+			name = self.save('photo.png', b'pixels')
+		upload = StagedUpload.objects.get(name=name)
+		self.assertEqual((upload.status, upload.attempts), (StagedUpload.DONE, 2))
+		self.assertTrue(self.storage.remote.exists('photo.png'))
+
+	def test_command_retries_failed_transfers(self):
+		FlakyStorage.failures = 5
+		with self.assertLogs('uploads.storage', 'WARNING'):
+			name = self.save('photo.png', b'pixels')
+		upload = StagedUpload.objects.get(name=name)
+		self.assertEqual((upload.status, upload.attempts), (StagedUpload.FAILED, 3))
+		self.assertTrue(self.storage.is_staged(name))
+
+		storages = {
+			'default': {'BACKEND': 'uploads.storage.StagedRemoteStorage', 'OPTIONS': self.options},
+			'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+		}
+		with self.settings(STORAGES=storages), self.assertLogs('uploads.storage', 'WARNING'):
+			call_command('transfer_staged_uploads', stdout=StringIO(), stderr=StringIO())
+		self.assertEqual(StagedUpload.objects.get(name=name).status, StagedUpload.DONE)
+		self.assertFalse(self.storage.is_staged(name))
+
+	def test_staged_media_view(self):
+		storages = {
+			'default': {'BACKEND': 'uploads.storage.StagedRemoteStorage', 'OPTIONS': self.options},
+			'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+		}
+		with self.settings(STORAGES=storages):
+			with self.captureOnCommitCallbacks() as callbacks:
+				name = self.storage.save('photo.png', ContentFile(b'pixels'))
+			resp = self.client.get(reverse('staged-media', args=[name]))
+			self.assertEqual(b''.join(resp.streaming_content), b'pixels')
+
+			for callback in callbacks:
+				callback()
+			resp = self.client.get(reverse('staged-media', args=[name]))
+			self.assertRedirects(resp, '/remote/photo.png', fetch_redirect_response=False)
+			self.assertEqual(self.client.get(reverse('staged-media', args=['missing.png'])).status_code, 404)
+
+	def test_delete_before_transfer(self):
+		with self.captureOnCommitCallbacks() as callbacks:
+			name = self.storage.save('photo.png', ContentFile(b'pixels'))
+		self.storage.delete(name)
+		for callback in callbacks:
+			callback()
+		self.assertFalse(self.storage.exists(name))
+		self.assertFalse(StagedUpload.objects.exists())
+		self.assertFalse(self.storage.remote.exists('photo.png'))
+
+	def test_remote_names_batched_and_shared(self):
+		names = [self.save(f'photo-{i}.png', b'pixels') for i in range(3)]
+		with self.assertNumQueries(1):
+			self.assertEqual(self.storage.remote_names(names), {name: name for name in names})
+		# Another process finds them in the Django cache.
+		with self.assertNumQueries(0):
+			self.assertEqual(StagedRemoteStorage(**self.options).url(names[0]), '/remote/photo-0.png')
+
+	def test_remote_name_cache_evicts_least_recently_used(self):
+		names = [self.save(f'photo-{i}.png', b'pixels') for i in range(3)]
+		with mock.patch('uploads.storage.REMOTE_NAME_CACHE_SIZE', 2):
+			for name in (names[0], names[1], names[0], names[2]):
+				self.storage.remote_name(name)
+		self.assertEqual(list(self.storage._remote_names), [names[0], names[2]])
+
+	def test_responsive_image_resolves_remote_names_at_once(self):
+		storages = {
+			'default': {'BACKEND': 'uploads.storage.StagedRemoteStorage', 'OPTIONS': self.options},
+			'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+		}
+		source, *variants = [self.save(f'photo-{i}.png', b'pixels') for i in range(5)]
+		sizes = [(320, 'jpeg'), (640, 'jpeg'), (320, 'webp'), (640, 'webp')]
+		meta = {
+			'source': source,
+			'variants': [
+				{'name': name, 'width': width, 'format': image_format}
+				for name, (width, image_format) in zip(variants, sizes)
+			],
+		}
+		template = Template('{% load responsive_images %}{% responsive_image q.media q.media_meta %}')
+		with self.settings(STORAGES=storages):
+			question = Question(media=source, media_meta=meta)
+			with self.assertNumQueries(1):
+				html = template.render(Context({'q': question}))
+			self.assertIn('src="/remote/photo-0.png"', html)
+			self.assertIn('/remote/photo-4.png 640w', html)
+			with self.assertNumQueries(0):
+				template.render(Context({'q': Question(media=source, media_meta=meta)}))
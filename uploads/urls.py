@@ -0,0 +1,12 @@
+"""
+uploads/urls.py
+
+Routing for uploads served before they reach remote storage.
+"""
+
+from django.urls import path
+from uploads.views import staged_media
+
+urlpatterns = [
+	path('staged/<path:name>', staged_media, name='staged-media'),
+]
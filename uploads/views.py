@@ -0,0 +1,28 @@
+"""
+uploads/views.py
+
+Serves uploads that are still waiting in local staging (see
+StagedRemoteStorage in uploads/storage.py).
+"""
+
+from django.http import FileResponse, Http404
+from django.shortcuts import redirect
+
+from .models import StagedUpload
+from .storage import find_staged_storage
+
+
+def staged_media(request, name):
+	"""
+	Stream a staged file from local disk, or redirect to its remote URL once
+	the transfer has finished (for pages rendered before it did).
+	"""
+	storage = find_staged_storage()
+	if storage is None or not StagedUpload.objects.filter(name=name).exists():
+		raise Http404("No such upload.")
+	if storage.is_staged(name):
+		try:
+			return FileResponse(storage.staging.open(name))
+		except FileNotFoundError:
+			pass  # Transferred just now
+	return redirect(storage.url(name))
@@ -8,6 +8,8 @@ from django.db.models import UniqueConstraint
 from django.db.models.functions import Lower
 from django.contrib.auth.models import Group as AuthGroup
 
+from uploads.derivatives import ImageDerivativesMixin
+
 
 class CustomUser(AbstractUser):
 	email = models.EmailField(
@@ -25,7 +27,7 @@ class CustomUser(AbstractUser):
 			)
 		]
 
-class UserProfile(models.Model):
+class UserProfile(ImageDerivativesMixin, models.Model):
 	"""
 	Extends the user model with additional fields for the profile.
 
@@ -47,6 +49,12 @@ class UserProfile(models.Model):
 		null=True,
 		help_text='Profile avatar image (optional)'
 	)
+	avatar_meta = models.JSONField(
+		default=dict,
+		blank=True,
+		editable=False,
+		help_text="Generated image derivatives; see uploads/derivatives.py."
+	)
 	badges = models.ManyToManyField(
 		'badges.Badge',
 		blank=True,
@@ -54,6 +62,8 @@ class UserProfile(models.Model):
 		help_text="Badges awarded to this user"
 	)
 
+	image_fields = {'avatar': 'avatar_meta'}
+
 	def __str__(self):
 		"""
 		Display as username in Django admin/representation.
@@ -4,6 +4,7 @@ Signal handlers for the users app.
 - Automatically create UserProfile when a user is created.
 - Ensure staff group permissions and mutual exclusivity.
 - Maintain superuser group membership.
+- Register UserProfile for read-through caching (DjangoQandAPlatform/caching.py).
 """
 import os
 
@@ -11,10 +12,14 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
 from django.db.models.signals import post_save, post_migrate, m2m_changed
 from django.dispatch import receiver
+
+from DjangoQandAPlatform import caching
 from .models import UserProfile, UserAppGroup
 
 UserModel = get_user_model()
 
+caching.register(UserProfile)
+
 @receiver(post_save, sender=UserModel)
 def create_user_profile(sender, instance, created, **kwargs):
 	"""
@@ -8,10 +8,14 @@ Includes:
 - AJAX username availability check
 """
 
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.urls import reverse
+from DjangoQandAPlatform.caching import get_cached
+from DjangoQandAPlatform.testing import QueryBudgetMixin
+from badges.models import Badge
 from users.models import UserProfile
 from users.forms import UserRegistrationForm, UserEditForm, UserProfileEditForm
 
@@ -209,3 +213,53 @@ class AjaxUsernameCheckTests(TestCase):
 		resp = self.client.get(url)
 		self.assertEqual(resp.status_code, 400)
 		self.assertJSONEqual(resp.content, {'available': False, 'is_current': False, 'message': 'No username provided.'})
+
+
+class ProfileCacheTest(TestCase):
+	"""
+	Tests for the cached profile lookup of the edit-profile page.
+	"""
+
+	def setUp(self):
+		cache.clear()
+		self.user = UserModel.objects.create_user(username='cached', email='cached@example.com', password='pw12345!')
+		self.client.force_login(self.user)
+
+	def test_lookup_by_user(self):
+		with self.assertNumQueries(1):
+			profile = get_cached(UserProfile, user_id=self.user.pk)
+		with self.assertNumQueries(0):
+			self.assertEqual(get_cached(UserProfile, user_id=self.user.pk), profile)
+
+	def test_edit_shows_saved_bio(self):
+		self.client.get(reverse('edit-profile'))
+		self.client.post(reverse('edit-profile'), {
+			'update_profile': '1', 'username': 'cached', 'email': 'cached@example.com', 'bio': 'Fresh bio',
+		})
+		self.assertContains(self.client.get(reverse('edit-profile')), 'Fresh bio')
+
+
+class UserQueryBudgetTest(QueryBudgetMixin, TestCase):
+	"""
+	Query budgets for the user pages, over growing numbers of badges.
+	"""
+
+	def setUp(self):
+		self.user = UserModel.objects.create_user(username='budgeter', email='budgeter@example.com', password='pw12345!')
+
+	def award_badges(self, size):
+		self.user.profile.badges.add(*[
+			Badge.objects.create(name=f'Budget badge {i}', description='Awarded') for i in range(size)
+		])
+
+	def test_profile_details(self):
+		url = reverse('profile-details', args=[self.user.pk])
+		self.assertQueryBudget(4, lambda: self.client.get(url), self.award_badges)
+
+	def test_edit_profile(self):
+		self.client.force_login(self.user)
+		self.assertQueryBudget(3, lambda: self.client.get(reverse('edit-profile')), self.award_badges)
+
+	def test_register_and_login_forms(self):
+		self.assertQueryBudget(0, lambda: self.client.get(reverse('register')))
+		self.assertQueryBudget(0, lambda: self.client.get(reverse('login')))
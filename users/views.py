@@ -18,6 +18,7 @@ from django.utils.functional import SimpleLazyObject
 from django.views import View
 from django.views.generic import CreateView, DetailView
 
+from DjangoQandAPlatform.caching import get_cached
 from DjangoQandAPlatform.mixins import UserIsAuthorMixin
 from users.forms import UserRegistrationForm, UserEditForm, UserProfileEditForm
 from users.models import UserProfile
@@ -64,7 +65,7 @@ class EditProfileView(LoginRequiredMixin, UserIsAuthorMixin, View):
 	def get(self, request):
 		user = request.user
 		original_username = user.username
-		user_profile = UserProfile.objects.get(user=user)
+		user_profile = get_cached(UserProfile, user_id=user.pk)
 		user_form = UserEditForm(instance=user)
 		profile_form = UserProfileEditForm(instance=user_profile)
 		password_form = PasswordChangeForm(user=user)
@@ -81,6 +82,7 @@ class EditProfileView(LoginRequiredMixin, UserIsAuthorMixin, View):
 	def post(self, request):
 		user = request.user
 		original_username = user.username
+		# Read from the database: the form saves the whole row back.
 		user_profile = UserProfile.objects.get(user=user)
 
 		if 'update_profile' in request.POST: